@@ -0,0 +1,33 @@
+"""Add durable LLM result cache table
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "llm_cache",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("value", JSONB(), nullable=False),
+        sa.Column("model", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("key"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("llm_cache")
@@ -0,0 +1,37 @@
+"""Add generated song story table
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "song_stories",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("song_id", sa.Integer(), nullable=False),
+        sa.Column("target_lang", sa.String(length=16), nullable=False),
+        sa.Column("prompt_version", sa.String(length=16), nullable=False),
+        sa.Column("story", sa.Text(), nullable=False),
+        sa.Column("model", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["song_id"], ["songs.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("song_id", "target_lang", "prompt_version", name="uix_song_stories_song_lang_version"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("song_stories")
@@ -0,0 +1,34 @@
+"""Add precomputed iconic song reason table
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "iconic_reasons",
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("artist", sa.String(length=255), nullable=False),
+        sa.Column("native_lang", sa.String(length=16), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=False),
+        sa.Column("model", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("title", "artist", "native_lang"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("iconic_reasons")
@@ -0,0 +1,34 @@
+"""Add iconic song seeding table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "iconic_seeds",
+        sa.Column("learning_lang", sa.String(length=16), nullable=False),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("artist", sa.String(length=255), nullable=False),
+        sa.Column("song_id", sa.Integer(), nullable=True),
+        sa.Column("checked_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["song_id"], ["songs.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("learning_lang", "title", "artist"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("iconic_seeds")
@@ -0,0 +1,34 @@
+"""Add word translation memory table
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "word_translations",
+        sa.Column("word", sa.String(length=255), nullable=False),
+        sa.Column("source_lang", sa.String(length=10), nullable=False),
+        sa.Column("target_lang", sa.String(length=10), nullable=False),
+        sa.Column("translation", sa.String(length=255), nullable=False),
+        sa.Column("origin", sa.String(length=16), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("word", "source_lang", "target_lang"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("word_translations")
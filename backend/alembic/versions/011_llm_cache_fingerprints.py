@@ -0,0 +1,34 @@
+"""Add prompt/model fingerprint, inputs and hit counts to llm_cache
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("llm_cache", sa.Column("fingerprint", sa.String(length=16), nullable=True))
+    op.add_column("llm_cache", sa.Column("params", JSONB(), nullable=True))
+    op.add_column("llm_cache", sa.Column("hit_count", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("llm_cache", sa.Column("last_hit_at", sa.DateTime(), nullable=True))
+    op.create_index("ix_llm_cache_fingerprint_hits", "llm_cache", ["fingerprint", "hit_count"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_llm_cache_fingerprint_hits", table_name="llm_cache")
+    op.drop_column("llm_cache", "last_hit_at")
+    op.drop_column("llm_cache", "hit_count")
+    op.drop_column("llm_cache", "params")
+    op.drop_column("llm_cache", "fingerprint")
@@ -1,5 +1,7 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 import structlog
 
 from app.schemas.analyze import (
@@ -7,7 +9,11 @@ from app.schemas.analyze import (
     AnalyzeResponse,
     InterlinearRequest,
     InterlinearResponse,
+    SongAnalyzeRequest,
 )
+from app.api.streaming import ndjson_response
+from app.db.session import get_db
+from app.models.song import Song
 from app.services.cerebras import cerebras_service
 from app.core.security import get_current_user_id
 from app.core.limiter import limiter
@@ -37,6 +43,8 @@ async def analyze_line(
         song_id=data.song_id,
         line_index=data.line_index,
     )
+    # song_id/line_index are no longer part of the cache key; keep them for analytics.
+    logger.info("line_analyzed", song_id=data.song_id, line_index=data.line_index, cached=result.get("cached", False))
     return AnalyzeResponse(**result)
 
 @router.post("/interlinear", response_model=InterlinearResponse)
@@ -56,4 +64,48 @@ async def interlinear(
         song_id=data.song_id,
         line_index=data.line_index,
     )
+    logger.info("line_interlinear", song_id=data.song_id, line_index=data.line_index, cached=result.get("cached", False))
     return InterlinearResponse(**result)
+
+
+@router.post("/song/{song_id}")
+@limiter.limit(settings.RATE_LIMIT_ANALYZE_SONG)
+async def analyze_song(
+    request: Request,
+    song_id: int,
+    data: SongAnalyzeRequest,
+    db: AsyncSession = Depends(get_db),
+    _: UUID = Depends(get_current_user_id),
+):
+    """
+    Analyze every lyric line of a stored song in bulk.
+
+    Streams NDJSON: one {"line_index", "translation", "grammar", "vocabulary", "cached"}
+    object per line as results arrive, then {"done": true, "lines": N}.
+    Line indexes match the frontend (non-empty lines only), so later /analyze/line
+    calls for the same line are cache hits.
+    """
+    result = await db.execute(select(Song).where(Song.id == song_id))
+    song = result.scalar_one_or_none()
+    if not song:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Song not found",
+        )
+
+    lines = [line for line in (song.lyrics or "").split("\n") if line.strip()]
+    native_lang = data.native_lang or "en"
+    learning_lang = data.learning_lang or "en"
+
+    async def events():
+        async for item in cerebras_service.analyze_song(
+            song_id=song_id,
+            lines=lines,
+            native_lang=native_lang,
+            learning_lang=learning_lang,
+        ):
+            yield item
+        logger.info("song_analyzed", song_id=song_id, lines=len(lines))
+        yield {"done": True, "lines": len(lines)}
+
+    return ndjson_response(events())
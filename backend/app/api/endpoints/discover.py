@@ -1,22 +1,32 @@
+import asyncio
+import random
+from typing import List, Optional, Tuple
 from uuid import UUID
 from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select
 import structlog
 
+from app.core.config import settings
 from app.core.security import get_current_user_id
 from app.db.session import get_db
 from app.models.song import Song
 from app.models.user import User
 from app.schemas.song import SongResponse
-from app.services.iconic_songs import pick_iconic_song
+from app.services.iconic_pool import iconic_pool, upsert_lrclib_song
+from app.services.iconic_songs import ICONIC_SONGS, IconicSong, pick_iconic_song
 from app.services.lrclib import lrclib_service
-from app.services.cerebras import cerebras_service
+from app.services.negative_cache import NOT_FOUND
+from app.services.iconic_reasons import iconic_reason_store
+from app.services.song_warmup import schedule_song_warmup
 
 logger = structlog.get_logger()
 
 router = APIRouter(prefix="/discover", tags=["discover"])
 
+# (song, catalog entry, (reason, source) when already looked up)
+Picked = Tuple[Song, IconicSong, Optional[Tuple[str, str]]]
+
 
 @router.get("/random-iconic")
 async def random_iconic_song(
@@ -37,83 +47,95 @@ async def random_iconic_song(
     if not native_lang:
         native_lang = (u.native_lang if u else "en") or "en"
 
-    # Try up to 3 songs from target language, then fallback to 2 English songs
-    # With 5s timeout per LRCLIB request, worst case = 5 attempts × 5s = 25s
-    MAX_ATTEMPTS = 3
-    tried_songs = set()
-    lrclib_data = None
-    pick = None
-    
-    # Try target language first
-    for _ in range(MAX_ATTEMPTS):
-        pick = pick_iconic_song(learning_lang)
-        song_key = (pick.title, pick.artist)
-        if song_key in tried_songs:
-            continue
-        tried_songs.add(song_key)
-        
-        lrclib_data = await lrclib_service.get_lyrics(track_name=pick.title, artist_name=pick.artist)
-        if lrclib_data:
-            break
-        logger.info("discover_song_not_found", title=pick.title, artist=pick.artist, lang=learning_lang, attempt=len(tried_songs))
-    
-    # Fallback to English if target language songs not found
-    if not lrclib_data and learning_lang != "en":
+    picked = await _pick(db, learning_lang, native_lang)
+    if not picked and learning_lang != "en":
         logger.info("discover_fallback_to_english", original_lang=learning_lang)
-        tried_songs.clear()
-        for _ in range(2):  # Only 2 English fallback attempts
-            pick = pick_iconic_song("en")
-            song_key = (pick.title, pick.artist)
-            if song_key in tried_songs:
-                continue
-            tried_songs.add(song_key)
-            
-            lrclib_data = await lrclib_service.get_lyrics(track_name=pick.title, artist_name=pick.artist)
-            if lrclib_data:
-                break
-    
-    if not lrclib_data:
+        picked = await _pick(db, "en", native_lang)
+
+    if not picked:
         # Ultimate fallback: return static reason (should rarely happen)
-        return {"song": None, "reason": pick.fallback_reason if pick else "Song not found", "source": "static"}
+        pick = pick_iconic_song(learning_lang)
+        return {"song": None, "reason": pick.fallback_reason, "source": "static"}
 
-    # Upsert song (same logic as /songs/import)
-    title = lrclib_data.get("trackName") or pick.title
-    artist = lrclib_data.get("artistName") or pick.artist
+    song, pick, known = picked
 
-    existing = await db.execute(
-        select(Song).where(func.lower(Song.title) == title.lower(), func.lower(Song.artist) == artist.lower())
-    )
-    song = existing.scalar_one_or_none()
-    if not song:
-        song = Song(
-            title=title,
-            artist=artist,
-            album=lrclib_data.get("albumName"),
-            lyrics=lrclib_data.get("plainLyrics"),
-            synced_lyrics=lrclib_data.get("syncedLyrics"),
-            duration=lrclib_data.get("duration"),
-            lrclib_id=lrclib_data.get("id"),
-        )
-        db.add(song)
-        await db.commit()
-        await db.refresh(song)
-        logger.info("discover_song_imported", song_id=song.id, title=song.title, lang=learning_lang)
-
-    # Reason (try Cerebras, fallback to static)
-    reason = pick.fallback_reason
-    source = "static"
-    try:
-        generated = await cerebras_service.describe_iconic_song(
-            title=song.title,
-            artist=song.artist,
-            target_lang=native_lang or "en",
-        )
-        if generated:
-            reason = generated
-            source = "cerebras"
-    except Exception as e:
-        logger.warning("discover_reason_failed", error=str(e))
+    # Reason: precomputed per (catalog song, native language); curated fallback until filled.
+    # An import already looked it up alongside the upsert.
+    reason, source = known or await iconic_reason_store.get(pick, native_lang or "en")
 
     return {"song": SongResponse.model_validate(song), "reason": reason, "source": source}
 
 
+async def _pick(db: AsyncSession, lang: str, native_lang: str) -> Optional[Picked]:
+    """
+    Uniformly random catalog song of `lang` among the seeded entries and those never looked
+    up. Landing on an unchecked entry imports it (so the pool grows with use); if that finds
+    nothing, a seeded song is picked instead. The reason is only set for imported songs.
+    """
+    seeds = await iconic_pool.seeds(db, lang)
+    catalog = ICONIC_SONGS.get(lang, [])
+    seeded = sum(1 for s in catalog if seeds.get((s.title, s.artist)))
+    unchecked = [s for s in catalog if (s.title, s.artist) not in seeds]
+    if unchecked and random.randrange(seeded + len(unchecked)) >= seeded:
+        picked = await _import_unseeded(db, lang, native_lang, unchecked)
+        if picked:
+            return picked
+    picked = await iconic_pool.pick(db, lang) if seeded else None
+    return (*picked, None) if picked else None
+
+
+async def _import_unseeded(
+    db: AsyncSession, lang: str, native_lang: str, unchecked: List[IconicSong]
+) -> Optional[Picked]:
+    """
+    Query LRCLIB concurrently for up to DISCOVER_CANDIDATES of the `unchecked` catalog entries;
+    the first hit wins and the other lookups are cancelled. Hits and 404s are recorded in the
+    pool; entries whose lookup failed otherwise stay unchecked.
+    """
+    candidates = random.sample(unchecked, min(len(unchecked), max(1, settings.DISCOVER_CANDIDATES)))
+    if not candidates:
+        return None
+
+    pick, lrclib_data, misses = await _first_lyrics(candidates)
+    for miss in misses:
+        logger.info("discover_song_not_found", title=miss.title, artist=miss.artist, lang=lang)
+        await iconic_pool.record(db, lang, miss, None)
+    if pick is None:
+        return None
+
+    # The reason lookup (the first one loads the table) runs while the song is upserted.
+    (song, created), reason = await asyncio.gather(
+        upsert_lrclib_song(db, lrclib_data, pick.title, pick.artist),
+        iconic_reason_store.get(pick, native_lang),
+    )
+    await iconic_pool.record(db, lang, pick, song.id)
+    if created:
+        logger.info("discover_song_imported", song_id=song.id, title=song.title, lang=lang)
+        schedule_song_warmup(song.id, song.lyrics, native_lang=native_lang, learning_lang=lang)
+    return song, pick, reason
+
+
+async def _first_lyrics(candidates: List[IconicSong]) -> Tuple[Optional[IconicSong], Optional[dict], List[IconicSong]]:
+    """
+    Return (winner, lyrics, misses); lookups still running when a winner is found are cancelled.
+    `misses` only holds entries LRCLIB answered 404 for, not lookups that failed or raised.
+    """
+    tasks = {
+        asyncio.create_task(lrclib_service.lookup_lyrics(track_name=c.title, artist_name=c.artist)): c
+        for c in candidates
+    }
+    pending = set(tasks)
+    misses: List[IconicSong] = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                data, failure = (None, None) if task.exception() else task.result()
+                if data:
+                    return tasks[task], data, misses
+                if failure == NOT_FOUND:
+                    misses.append(tasks[task])
+        return None, None, misses
+    finally:
+        for task in pending:
+            task.cancel()
@@ -3,16 +3,17 @@ from fastapi import APIRouter, Depends, Request
 import structlog
 
 from app.schemas.exercise import TranslationCheckRequest, TranslationCheckResponse
-from app.services.cerebras import cerebras_service
+from app.services.translation_check import grade_translation
 from app.core.security import get_current_user_id
 from app.core.limiter import limiter
+from app.core.config import settings
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/exercises", tags=["exercises"])
 
 
 @router.post("/translation-check", response_model=TranslationCheckResponse)
-@limiter.limit("30/minute")
+@limiter.limit(settings.RATE_LIMIT_TRANSLATION_CHECK)
 async def check_translation(
     request: Request,
     data: TranslationCheckRequest,
@@ -21,10 +22,13 @@ async def check_translation(
     """
     Check a user's translation attempt against the original line.
 
-    Uses Cerebras AI to evaluate the translation and provide feedback.
-    Rate limited to 30 requests per minute.
+    Clear-cut answers are graded locally against the line's cached analysis;
+    the rest are evaluated by Cerebras AI (verdicts cached per normalized answer).
+    Rate limited by RATE_LIMIT_TRANSLATION_CHECK.
     """
-    result = await cerebras_service.check_translation(
+    result, graded_by = await grade_translation(
+        song_id=data.song_id,
+        line_index=data.line_index,
         original=data.original,
         user_translation=data.user_translation,
         native_lang=data.native_lang or "en",
@@ -36,6 +40,7 @@ async def check_translation(
         song_id=data.song_id,
         line_index=data.line_index,
         is_correct=result.get("is_correct", False),
+        graded_by=graded_by,
     )
 
     # Cerebras returns "correct_translation" but API contract expects "suggested_translation".
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends
+
+from app.core.security import require_metrics_token
+from app.services.cache_service import cache_service
+from app.services.cerebras import analysis_batcher, flights
+from app.services.line_memory import line_memory
+from app.services.llm_metrics import llm_metrics
+from app.services.lrclib import lyrics_flight
+from app.services.negative_cache import negative_cache
+from app.services.resilience import upstreams_snapshot
+
+# Operator-only: internal counters and cache keys are not for end users.
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[Depends(require_metrics_token)])
+
+
+@router.get("/upstreams")
+async def get_upstreams():
+    """
+    Circuit breaker / concurrency limiter state per upstream, request coalescing counters
+    and the negative cache (failed lookups answered without calling the upstream).
+    """
+    coalescing = {name: flight.stats() for name, flight in sorted(flights.items())}
+    coalescing[lyrics_flight.name] = lyrics_flight.stats()
+    return {
+        "upstreams": upstreams_snapshot(),
+        "coalescing": coalescing,
+        "negative_cache": negative_cache.stats(),
+    }
+
+
+@router.get("/llm")
+async def get_llm_metrics():
+    """Per-operation LLM counters: calls, cache hit rate, errors, parse failures, fallbacks, tokens, latency."""
+    return {
+        "operations": llm_metrics.snapshot(),
+        "batching": {analysis_batcher.name: analysis_batcher.stats()},
+    }
+
+
+@router.get("/cache")
+async def get_cache_metrics():
+    """
+    In-memory LLM cache: capacity, entries, approximate bytes and per-namespace hit/miss/eviction
+    counters, plus the line memory used for near-duplicate lines.
+    """
+    return {**(await cache_service.stats()), "line_memory": line_memory.stats()}
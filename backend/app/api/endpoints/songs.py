@@ -1,4 +1,5 @@
 from typing import List
+from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -6,8 +7,12 @@ import structlog
 
 from app.db.session import get_db
 from app.models.song import Song
+from app.models.user import User
 from app.schemas.song import SongResponse, SongSearchResult, SongImportRequest
+from app.api.streaming import sse_response
 from app.services.lrclib import lrclib_service
+from app.services.song_warmup import schedule_song_warmup
+from app.core.config import settings
 from app.core.security import get_current_user_id
 
 logger = structlog.get_logger()
@@ -32,7 +37,7 @@ async def search_songs(
 async def import_song(
     song_data: SongImportRequest,
     db: AsyncSession = Depends(get_db),
-    _: int = Depends(get_current_user_id),  # Require auth
+    user_id: UUID = Depends(get_current_user_id),
 ):
     """
     Import a song from LRCLIB into the local database.
@@ -80,6 +85,16 @@ async def import_song(
     await db.refresh(song)
 
     logger.info("song_imported", song_id=song.id, title=song.title)
+
+    if settings.SONG_WARMUP_ENABLED:
+        res = await db.execute(select(User).where(User.id == user_id))
+        u = res.scalar_one_or_none()
+        schedule_song_warmup(
+            song.id,
+            song.lyrics,
+            native_lang=(u.native_lang if u else "en") or "en",
+            learning_lang=(u.learning_lang if u else "en") or "en",
+        )
     return song
 
 
@@ -115,7 +130,11 @@ async def get_song_story(
     - Historical/life context of the author
     - How these lyrics ended up with the current artist
     """
-    from app.services.cerebras import cerebras_service
+    from app.services.song_story import song_story_service
+
+    story, fresh = await song_story_service.lookup(song_id, target_lang)
+    if story and fresh:
+        return {"story": story, "song_id": song_id}
 
     result = await db.execute(select(Song).where(Song.id == song_id))
     song = result.scalar_one_or_none()
@@ -126,11 +145,8 @@ async def get_song_story(
             detail="Song not found",
         )
 
-    story = await cerebras_service.generate_song_story(
-        title=song.title,
-        artist=song.artist,
-        target_lang=target_lang,
-    )
+    # An outdated story beats none when regeneration fails.
+    story = await song_story_service.generate(song, target_lang) or story
 
     if not story:
         raise HTTPException(
@@ -139,3 +155,55 @@ async def get_song_story(
         )
 
     return {"story": story, "song_id": song_id}
+
+
+@router.get("/{song_id}/story/stream")
+async def stream_song_story(
+    song_id: int,
+    target_lang: str = Query("en", description="Language for the story"),
+    db: AsyncSession = Depends(get_db),
+    _: int = Depends(get_current_user_id),
+):
+    """
+    Same story as GET /songs/{song_id}/story, relayed as Server-Sent Events while it is generated.
+
+    Events: `chunk` ({"text": ...}) as text arrives (a stored story is one chunk), then
+    `done` ({"song_id": ...}) once the story is complete, or `error` ({"detail": ..., "partial": ...})
+    if nothing could be generated (`partial` false) or generation stopped midway (`partial` true).
+    """
+    from app.services.song_story import song_story_service
+
+    story, fresh = await song_story_service.lookup(song_id, target_lang)
+    if story and fresh:
+        chunks = _single(story)
+    else:
+        result = await db.execute(select(Song).where(Song.id == song_id))
+        song = result.scalar_one_or_none()
+
+        if not song:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Song not found",
+            )
+        chunks = song_story_service.stream(song, target_lang, stale=story)
+
+    async def events():
+        produced = False
+        try:
+            async for text in chunks:
+                produced = True
+                yield "chunk", {"text": text}
+        except Exception:
+            yield "error", {"detail": "Story generation was interrupted.", "partial": True}
+            return
+        if produced:
+            yield "done", {"song_id": song_id}
+        else:
+            detail = "Story generation unavailable. AI service may not be configured."
+            yield "error", {"detail": detail, "partial": False}
+
+    return sse_response(events())
+
+
+async def _single(text: str):
+    yield text
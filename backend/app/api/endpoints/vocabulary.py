@@ -1,6 +1,6 @@
 from typing import List
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 import structlog
@@ -12,9 +12,13 @@ from app.schemas.vocabulary import (
     VocabularyResponse,
     VocabularyTranslateRequest,
     VocabularyTranslateResponse,
+    VocabularyTranslateBatchRequest,
+    VocabularyTranslateBatchResponse,
 )
+from app.core.config import settings
+from app.core.limiter import limiter
 from app.core.security import get_current_user_id
-from app.services.cerebras import cerebras_service
+from app.services.word_memory import word_memory
 
 logger = structlog.get_logger()
 router = APIRouter(prefix="/vocabulary", tags=["vocabulary"])
@@ -40,6 +44,8 @@ async def create_vocabulary(
     await db.commit()
     await db.refresh(vocab)
 
+    # Not copied into the shared word memory: one user's free text would be served to everyone.
+    # The memory takes LLM results and the majority vote of seed_from_vocabulary only.
     logger.info("vocabulary_created", user_id=str(user_id), vocab_id=vocab.id)
     return vocab
 
@@ -51,8 +57,9 @@ async def translate_vocab_word(
 ):
     """
     Translate a word into another target language (does not mutate stored vocab).
+    Served from the shared word translation memory when possible.
     """
-    t = await cerebras_service.translate_word(
+    t = await word_memory.translate(
         word=data.word,
         source_lang=data.source_lang,
         target_lang=data.target_lang,
@@ -62,6 +69,24 @@ async def translate_vocab_word(
     return VocabularyTranslateResponse(translation=t)
 
 
+@router.post("/translate/batch", response_model=VocabularyTranslateBatchResponse)
+@limiter.limit(settings.RATE_LIMIT_VOCAB_BATCH)
+async def translate_vocab_words(
+    request: Request,
+    data: VocabularyTranslateBatchRequest,
+    _: UUID = Depends(get_current_user_id),
+):
+    """
+    Translate a whole word list into another target language (e.g. after native_lang changes).
+    Known words come from the word translation memory; the rest are packed into a few prompts.
+    Rate limited per config (default: 10/minute).
+    """
+    translations = await word_memory.translate_many(data.words, data.source_lang, data.target_lang)
+    missing = [w for w in dict.fromkeys(data.words) if w not in translations]
+    logger.info("vocabulary_batch_translated", words=len(data.words), missing=len(missing))
+    return VocabularyTranslateBatchResponse(translations=translations, missing=missing)
+
+
 @router.get("", response_model=List[VocabularyResponse])
 async def get_vocabulary(
     user_id: UUID = Depends(get_current_user_id),
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import auth, songs, user_songs, analyze, vocabulary, exercises, voice, discover, meta, users
+from app.api.endpoints import auth, songs, user_songs, analyze, vocabulary, exercises, voice, discover, meta, users, metrics
 
 api_router = APIRouter(prefix="/api")
 
@@ -14,3 +14,4 @@ api_router.include_router(voice.router)
 api_router.include_router(discover.router)
 api_router.include_router(meta.router)
 api_router.include_router(users.router)
+api_router.include_router(metrics.router)
@@ -0,0 +1,33 @@
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+# GZipMiddleware buffers streamed bodies until enough bytes accumulate; marking the
+# response as already encoded makes it pass chunks through as they are produced.
+# X-Accel-Buffering disables proxy buffering (nginx, Render).
+STREAM_HEADERS = {
+    "Content-Encoding": "identity",
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def ndjson_response(items: AsyncIterator[Any]) -> StreamingResponse:
+    """Stream one JSON document per line."""
+
+    async def body():
+        async for item in items:
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson", headers=STREAM_HEADERS)
+
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """Stream (event, data) pairs as Server-Sent Events; data is sent as JSON."""
+
+    async def body():
+        async for event, data in events:
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers=STREAM_HEADERS)
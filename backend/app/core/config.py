@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     JWT_EXPIRE_MINUTES: int = 60 * 24 * 7  # Legacy default (7 days) for compatibility
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Shared secret for /metrics/* (sent as X-Metrics-Token); empty = metrics endpoints disabled
+    METRICS_TOKEN: str = ""
 
     # Google OAuth (ID token verification)
     GOOGLE_CLIENT_IDS: List[str] = []
@@ -21,9 +23,116 @@ class Settings(BaseSettings):
     # LRCLIB
     LRCLIB_BASE_URL: str = "https://lrclib.net/api"
     LRCLIB_USER_AGENT: str = "Song2Learn/2.0"
+    LRCLIB_MAX_CONCURRENCY: int = 20
+    LRCLIB_MAX_ATTEMPTS: int = 3
+    LRCLIB_TIMEOUT_SECONDS: float = 5.0  # ceiling of the adaptive per-request timeout
+    LRCLIB_HEDGE_ENABLED: bool = True
 
     # Cerebras API
     CEREBRAS_API_KEY: str = ""
+    # Part of every LLM cache key: changing it starts a fresh keyspace (see app.services.cache_reanalysis)
+    CEREBRAS_MODEL: str = "llama-3.3-70b"
+    CEREBRAS_MAX_CONCURRENCY: int = 16  # in-flight requests per worker, background work included
+    CEREBRAS_QUEUE_TIMEOUT_SECONDS: float = 1.0  # wait for a free slot before failing fast
+    CEREBRAS_BREAKER_FAILURES: int = 5  # consecutive failures that open the circuit
+    CEREBRAS_BREAKER_RESET_SECONDS: float = 30.0  # open -> half-open probe delay
+    CEREBRAS_MAX_ATTEMPTS: int = 2
+    CEREBRAS_TIMEOUT_SECONDS: float = 5.0  # ceiling of the adaptive per-operation timeout
+
+    # Shared upstream retry/timeout policy (Cerebras + LRCLIB)
+    RETRY_BASE_DELAY_SECONDS: float = 0.2
+    RETRY_MAX_DELAY_SECONDS: float = 2.0
+    UPSTREAM_TIMEOUT_MIN_SECONDS: float = 1.0
+
+    # In-memory LLM result cache: entries hard-expire after CACHE_TTL_SECONDS; past the soft TTL
+    # they are served stale while one background refresh runs (0 = no stale-while-revalidate)
+    CACHE_TTL_SECONDS: int = 3600
+    CACHE_SOFT_TTL_SECONDS: int = 2700
+    # Cache storage: "memory" (per worker), "sqlite" (one WAL file shared by the host's workers)
+    # or "redis" (any Redis-protocol server via the optional redis package; keep it close)
+    CACHE_BACKEND: str = "memory"
+    CACHE_SQLITE_PATH: str = "/tmp/song2learn-cache.sqlite3"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_TIMEOUT_SECONDS: float = 0.25
+    # Memory budget of the in-memory cache per worker (entry sizes are measured, see /metrics/cache)
+    CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    # Keep values serialized ("json" or "msgpack", if installed) and zlib-compress those of at
+    # least CACHE_COMPRESS_MIN_BYTES (-1 = never); decoded on every read
+    CACHE_STORE_ENCODED: bool = True
+    CACHE_SERIALIZER: str = "json"
+    CACHE_COMPRESS_MIN_BYTES: int = 256
+    # Admission policy: "tinylfu" (frequency sketch in front of each namespace's LRU) or "lru"
+    CACHE_ADMISSION: str = "tinylfu"
+    CACHE_WINDOW_RATIO: float = 0.01
+    # Share of CACHE_MAX_BYTES per key namespace; unlisted namespaces share the remainder
+    CACHE_NAMESPACE_QUOTAS: Dict[str, float] = {"analysis": 0.55, "interlinear": 0.25, "check": 0.1, "story": 0.05}
+    # Interval of the periodic `cache_stats` log event (0 = off); counters are also on /metrics/cache
+    CACHE_STATS_LOG_INTERVAL_SECONDS: int = 300
+
+    # LLM result cache (durable tier under the in-memory cache)
+    LLM_CACHE_DB_ENABLED: bool = True
+    # Key line analyses by (line hash, languages, prompt version) instead of (song, line position)
+    CACHE_CONTENT_ADDRESSED: bool = True
+    # Hits on durable-tier keys are counted in memory and written to llm_cache every interval (0 = off)
+    LLM_CACHE_HIT_FLUSH_SECONDS: int = 60
+    # Re-analysis ahead of a prompt/model cutover: hottest previous-fingerprint keys per namespace
+    LLM_CACHE_REANALYZE_LIMIT: int = 2000
+    LLM_CACHE_REANALYZE_CONCURRENCY: int = 3
+    # The re-analysis job then deletes other-fingerprint entries unread for this many days (0 = keep)
+    LLM_CACHE_PRUNE_AFTER_DAYS: int = 14
+    # Negative cache: failed lookups are answered with the fallback until their TTL runs out (0 = off)
+    NEGATIVE_CACHE_PARSE_TTL_SECONDS: float = 300.0
+    NEGATIVE_CACHE_NOT_FOUND_TTL_SECONDS: float = 3600.0
+    NEGATIVE_CACHE_ERROR_TTL_SECONDS: float = 15.0
+    NEGATIVE_CACHE_SIZE: int = 10000
+
+    # Whole-song analysis (POST /analyze/song/{song_id})
+    ANALYZE_SONG_BATCH_LINES: int = 8
+    ANALYZE_SONG_CONCURRENCY: int = 3
+    ANALYZE_SONG_TIMEOUT_SECONDS: float = 30.0
+
+    # Translation memory of analyzed lines (per worker): lines equal after dropping punctuation, case and
+    # fillers reuse an analysis; lines at least LINE_MEMORY_ADAPT_SIMILARITY alike (trigram Jaccard) get a
+    # short prompt adapting the similar line's analysis (1.0 = reuse only, no adapt prompts).
+    # Entries hold the line and its cache key, not the analysis: about 2 KB each, ~10 MB at the default size
+    LINE_MEMORY_ENABLED: bool = True
+    LINE_MEMORY_SIZE: int = 5000
+    LINE_MEMORY_ADAPT_SIMILARITY: float = 0.55
+    LINE_MEMORY_SEED_ON_STARTUP: bool = False
+
+    # Micro-batching of concurrent /analyze/line cache misses (opt-in)
+    ANALYZE_MICROBATCH_ENABLED: bool = False
+    ANALYZE_MICROBATCH_WINDOW_MS: int = 20
+    ANALYZE_MICROBATCH_MAX_LINES: int = 8
+
+    # Background pre-analysis of newly imported songs (opt-in)
+    SONG_WARMUP_ENABLED: bool = False
+    SONG_WARMUP_LINES: int = 8
+    SONG_WARMUP_CONCURRENCY: int = 2
+
+    # Generated song stories (song_stories table); 0 = keep forever, otherwise regenerate when older
+    SONG_STORY_MAX_AGE_DAYS: int = 0
+
+    # Iconic song reasons for discover (iconic_reasons table)
+    ICONIC_REASONS_LAZY_FILL: bool = True
+    ICONIC_REASONS_PRECOMPUTE_ON_STARTUP: bool = False
+    ICONIC_REASONS_CONCURRENCY: int = 4
+    # Import the iconic catalog into songs ahead of discover (iconic_seeds table)
+    ICONIC_SEED_ON_STARTUP: bool = False
+    ICONIC_SEED_CONCURRENCY: int = 4
+    # Translation checks: accept answers equal to the cached line translation (up to case,
+    # punctuation and articles) without the LLM; everything else is graded by the LLM
+    TRANSLATION_CHECK_LOCAL_GRADER: bool = True
+
+    # Word translation memory (word_translations table + in-process LRU)
+    WORD_MEMORY_LRU_SIZE: int = 50000
+    WORD_MEMORY_SEED_ON_STARTUP: bool = False
+    # POST /vocabulary/translate/batch: words per prompt, prompts in flight
+    WORD_BATCH_SIZE: int = 50
+    WORD_BATCH_CONCURRENCY: int = 3
+
+    # Unseeded catalog entries discover looks up on LRCLIB concurrently (first hit wins)
+    DISCOVER_CANDIDATES: int = 3
 
     # ElevenLabs API
     ELEVENLABS_API_KEY: str = ""
@@ -45,7 +154,10 @@ class Settings(BaseSettings):
 
     # Rate limits (increased for hover UX)
     RATE_LIMIT_ANALYZE: str = "60/minute"
+    RATE_LIMIT_ANALYZE_SONG: str = "10/minute"
     RATE_LIMIT_VOICE: str = "20/minute"
+    RATE_LIMIT_TRANSLATION_CHECK: str = "60/minute"
+    RATE_LIMIT_VOCAB_BATCH: str = "10/minute"
 
     # Trusted proxy IPs (for X-Forwarded-For validation)
     TRUSTED_PROXIES: List[str] = ["127.0.0.1", "10.0.0.0/8", "172.16.0.0/12"]
@@ -6,7 +6,7 @@ import hmac
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.config import settings
@@ -97,3 +97,14 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
     return UUID(user_id)
+
+
+async def require_metrics_token(x_metrics_token: Optional[str] = Header(None)) -> None:
+    """
+    Guard for operator-only endpoints: the X-Metrics-Token header must match METRICS_TOKEN.
+    With no token configured the endpoints don't exist (404).
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_metrics_token or not hmac.compare_digest(x_metrics_token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid metrics token")
@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -123,7 +124,30 @@ async def lifespan(app: FastAPI):
         await cleanup_expired_tts()
     except Exception as e:
         logger.warning("tts_cleanup_failed", error=str(e))
+    background = []
+    if settings.ICONIC_SEED_ON_STARTUP:
+        from app.services.iconic_pool import seed_iconic_songs
+        background.append(asyncio.create_task(seed_iconic_songs()))
+    if settings.WORD_MEMORY_SEED_ON_STARTUP:
+        from app.services.word_memory import word_memory
+        background.append(asyncio.create_task(word_memory.seed_from_vocabulary()))
+    if settings.LINE_MEMORY_ENABLED and settings.LINE_MEMORY_SEED_ON_STARTUP:
+        from app.services.line_memory import line_memory
+        background.append(asyncio.create_task(line_memory.seed()))
+    if settings.ICONIC_REASONS_PRECOMPUTE_ON_STARTUP:
+        from app.services.iconic_reasons import precompute_iconic_reasons
+        background.append(asyncio.create_task(precompute_iconic_reasons()))
+    if settings.CACHE_STATS_LOG_INTERVAL_SECONDS > 0:
+        from app.services.cache_service import log_cache_stats
+        background.append(asyncio.create_task(log_cache_stats(settings.CACHE_STATS_LOG_INTERVAL_SECONDS)))
+    if settings.LLM_CACHE_DB_ENABLED and settings.LLM_CACHE_HIT_FLUSH_SECONDS > 0:
+        from app.services.persistent_cache import flush_cache_hits
+        background.append(asyncio.create_task(flush_cache_hits(settings.LLM_CACHE_HIT_FLUSH_SECONDS)))
     yield
+    for task in background:
+        task.cancel()
+    from app.services.persistent_cache import persistent_cache
+    await persistent_cache.flush_hits()
     # Shutdown
     logger.info("application_shutdown")
     await close_http_client()
@@ -4,5 +4,10 @@ from app.models.user_song import UserSong
 from app.models.vocabulary import Vocabulary
 from app.models.session import Session
 from app.models.tts_audio import TTSAudio
+from app.models.llm_cache import LLMCacheEntry
+from app.models.song_story import SongStory
+from app.models.iconic_reason import IconicReason
+from app.models.iconic_seed import IconicSeed
+from app.models.word_translation import WordTranslation
 
-__all__ = ["User", "Song", "UserSong", "Vocabulary", "Session", "TTSAudio"]
+__all__ = ["User", "Song", "UserSong", "Vocabulary", "Session", "TTSAudio", "LLMCacheEntry", "SongStory", "IconicReason", "IconicSeed", "WordTranslation"]
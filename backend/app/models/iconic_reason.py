@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime
+from app.db.session import Base
+
+
+class IconicReason(Base):
+    """Why a curated iconic song matters, per learner native language (see services/iconic_songs.py)."""
+
+    __tablename__ = "iconic_reasons"
+
+    title = Column(String(255), primary_key=True)
+    artist = Column(String(255), primary_key=True)
+    native_lang = Column(String(16), primary_key=True)
+    reason = Column(Text, nullable=False)
+    model = Column(String(64), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
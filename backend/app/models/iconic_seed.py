@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from app.db.session import Base
+
+
+class IconicSeed(Base):
+    """
+    Import status of a curated iconic song (see services/iconic_songs.py) for one learning language.
+    song_id is NULL when LRCLIB had no lyrics for the entry.
+    """
+
+    __tablename__ = "iconic_seeds"
+
+    learning_lang = Column(String(16), primary_key=True)
+    title = Column(String(255), primary_key=True)
+    artist = Column(String(255), primary_key=True)
+    song_id = Column(Integer, ForeignKey("songs.id", ondelete="SET NULL"), nullable=True)
+    checked_at = Column(DateTime, default=datetime.utcnow)
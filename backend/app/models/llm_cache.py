@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from app.db.session import Base
+
+
+class LLMCacheEntry(Base):
+    """Durable tier under the in-memory cache for LLM results (analysis, interlinear)."""
+
+    __tablename__ = "llm_cache"
+    __table_args__ = (Index("ix_llm_cache_fingerprint_hits", "fingerprint", "hit_count"),)
+
+    key = Column(String(255), primary_key=True)
+    value = Column(JSONB, nullable=False)
+    model = Column(String(64), nullable=True)
+    # Prompt/model fingerprint the key was built with, and the inputs needed to recompute it
+    fingerprint = Column(String(16), nullable=True)
+    params = Column(JSONB, nullable=True)
+    hit_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_hit_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
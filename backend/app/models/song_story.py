@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from app.db.session import Base
+
+
+class SongStory(Base):
+    """Generated story behind a song, one row per (song, language, prompt version)."""
+
+    __tablename__ = "song_stories"
+    __table_args__ = (
+        UniqueConstraint("song_id", "target_lang", "prompt_version", name="uix_song_stories_song_lang_version"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    song_id = Column(Integer, ForeignKey("songs.id", ondelete="CASCADE"), nullable=False)
+    target_lang = Column(String(16), nullable=False)
+    prompt_version = Column(String(16), nullable=False)
+    story = Column(Text, nullable=False)
+    model = Column(String(64), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
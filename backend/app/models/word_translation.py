@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime
+from app.db.session import Base
+
+
+class WordTranslation(Base):
+    """Shared word translation memory: casefolded word + language pair -> translation."""
+
+    __tablename__ = "word_translations"
+
+    word = Column(String(255), primary_key=True)  # casefolded, whitespace-collapsed
+    source_lang = Column(String(10), primary_key=True)
+    target_lang = Column(String(10), primary_key=True)
+    translation = Column(String(255), nullable=False)
+    origin = Column(String(16), nullable=True)  # "llm" or "vocabulary"
+    created_at = Column(DateTime, default=datetime.utcnow)
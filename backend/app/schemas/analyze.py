@@ -16,6 +16,11 @@ class AnalyzeResponse(BaseModel):
     vocabulary: list[dict]
 
 
+class SongAnalyzeRequest(BaseModel):
+    native_lang: Optional[str] = "en"
+    learning_lang: Optional[str] = "en"
+
+
 class SpeakRequest(BaseModel):
     text: str
     voice_id: Optional[str] = None
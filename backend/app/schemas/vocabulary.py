@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 
 
 class VocabularyCreate(BaseModel):
@@ -34,3 +34,14 @@ class VocabularyTranslateRequest(BaseModel):
 
 class VocabularyTranslateResponse(BaseModel):
     translation: str
+
+
+class VocabularyTranslateBatchRequest(BaseModel):
+    words: List[str] = Field(min_length=1, max_length=500)
+    source_lang: str
+    target_lang: str
+
+
+class VocabularyTranslateBatchResponse(BaseModel):
+    translations: Dict[str, str]  # requested word -> translation
+    missing: List[str]  # words that could not be translated
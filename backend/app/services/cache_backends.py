@@ -0,0 +1,437 @@
+import asyncio
+import json
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+import structlog
+
+try:
+    import redis.asyncio as redis_asyncio
+    from redis.exceptions import RedisError
+except ImportError:  # optional; CACHE_BACKEND=redis falls back to memory without it
+    redis_asyncio = None
+    RedisError = OSError
+
+from app.core.config import settings
+from app.services.cache_store import TinyLFUCache, decode_value, encode_value, namespace_of
+
+logger = structlog.get_logger()
+
+# (value, soft deadline as a time.time() timestamp)
+Entry = Tuple[Any, float]
+
+# Per-namespace counters a backend reports; lookups (hits/misses) are counted by CacheService.
+STORAGE_COUNTERS = ("sets", "evictions", "rejections", "expirations", "entries", "bytes")
+
+# Rough per-entry bookkeeping cost (index dicts, tuples, key object) counted against the budget.
+ENTRY_OVERHEAD_BYTES = 240
+
+
+def approximate_size(key: str, value: Any) -> int:
+    """Bytes of the key plus the value's JSON encoding; a stable estimate, not the heap footprint."""
+    try:
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+    except (TypeError, ValueError):
+        payload = repr(value)
+    return len(key.encode()) + len(payload.encode())
+
+
+def _encode(value: Any) -> bytes:
+    return encode_value(value, settings.CACHE_SERIALIZER, settings.CACHE_COMPRESS_MIN_BYTES)
+
+
+# What a Redis call raises when the server is unreachable, slow or answers with an error.
+REDIS_ERRORS = (RedisError, OSError, asyncio.TimeoutError)
+
+# What a truncated, foreign or otherwise corrupt stored value raises while being decoded.
+DECODE_ERRORS = (zlib.error, struct.error, ValueError, TypeError)
+
+
+class CacheBackend:
+    """
+    Storage under cache_service: get/set/get_many/set_many/delete of entries with a hard TTL.
+
+    Implementations are best-effort: storage errors are logged and behave as misses, so
+    a broken backend degrades to recomputing values, never to failing requests. Methods may
+    be coroutines (RedisBackend's are); synchronous backends that do disk I/O set `blocking`
+    and CacheService calls them off the event loop.
+    """
+
+    name = "base"
+    blocking = False
+
+    def get(self, key: str) -> Optional[Entry]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Entry]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, soft_deadline: float, ttl: float) -> None:
+        self.set_many({key: (value, soft_deadline)}, ttl)
+
+    def set_many(self, entries: Dict[str, Entry], ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    def namespace_stats(self) -> Dict[str, Dict[str, int]]:
+        return {}
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process TinyLFU store; values are kept encoded and compressed when CACHE_STORE_ENCODED is on."""
+
+    name = "memory"
+
+    def __init__(self, store: TinyLFUCache, encoded: bool = True):
+        self.store = store
+        self.encoded = encoded
+        self._lock = threading.Lock()
+
+    def _pack(self, key: str, value: Any) -> Tuple[Any, int]:
+        """Stored form of a value and the bytes it is charged against the budget."""
+        if self.encoded:
+            try:
+                blob = _encode(value)
+                return blob, len(key) + len(blob) + ENTRY_OVERHEAD_BYTES
+            except (TypeError, ValueError):
+                pass  # not serializable: keep the object itself
+        return value, approximate_size(key, value) + ENTRY_OVERHEAD_BYTES
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Entry]:
+        found: Dict[str, Tuple[Any, float]] = {}
+        with self._lock:
+            for key in keys:
+                entry = self.store.get(key)
+                if entry is not None:
+                    found[key] = entry
+        # Decoded outside the lock; every reader gets its own copy of an encoded value.
+        return {
+            key: (decode_value(stored) if isinstance(stored, bytes) else stored, soft_deadline)
+            for key, (stored, soft_deadline) in found.items()
+        }
+
+    def set_many(self, entries: Dict[str, Entry], ttl: float) -> None:
+        packed = {key: (self._pack(key, value), soft_deadline) for key, (value, soft_deadline) in entries.items()}
+        with self._lock:
+            for key, ((stored, size), soft_deadline) in packed.items():
+                self.store.put(key, (stored, soft_deadline), size, ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self.store.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self.store.expire()
+            return {
+                "backend": self.name,
+                "max_bytes": self.store.max_bytes,
+                "encoded": self.encoded,
+                "admission": settings.CACHE_ADMISSION,
+                "quotas": self.store.quotas(),
+                "entries": len(self.store),
+                "bytes": sum(ns.bytes for ns in self.store.namespaces.values()),
+            }
+
+    def namespace_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {counter: getattr(stats, counter) for counter in STORAGE_COUNTERS}
+                for name, stats in self.store.namespaces.items()
+            }
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    One SQLite file in WAL mode shared by every worker on the host, so `--workers N` share a
+    single warm cache. Expired entries are purged and the byte budget enforced (soonest
+    expiring first) every PRUNE_EVERY sets. Values are stored encoded and compressed.
+    sets/evictions/expirations are counted per process; entries and bytes are the file's.
+    """
+
+    name = "sqlite"
+    blocking = True
+    PRUNE_EVERY = 200
+    CHUNK = 500
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Counter] = {}
+        self._since_prune = 0
+        self._conn = sqlite3.connect(path, timeout=2.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " key TEXT PRIMARY KEY, namespace TEXT NOT NULL, value BLOB NOT NULL,"
+                " soft_deadline REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at)")
+
+    def _count(self, namespace: str, counter: str, n: int = 1) -> None:
+        self._counters.setdefault(namespace, Counter())[counter] += n
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Entry]:
+        keys = list(dict.fromkeys(keys))
+        rows: List[Tuple[str, bytes, float]] = []
+        now = time.time()
+        try:
+            with self._lock:
+                for i in range(0, len(keys), self.CHUNK):
+                    chunk = keys[i:i + self.CHUNK]
+                    rows += self._conn.execute(
+                        f"SELECT key, value, soft_deadline FROM cache_entries"
+                        f" WHERE key IN ({','.join('?' * len(chunk))}) AND expires_at > ?",
+                        [*chunk, now],
+                    ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("cache_backend_error", backend=self.name, op="get", error=str(e))
+            return {}
+        found: Dict[str, Entry] = {}
+        for key, value, soft_deadline in rows:
+            try:
+                found[key] = (decode_value(value), soft_deadline)
+            except DECODE_ERRORS as e:
+                logger.warning("cache_backend_corrupt_entry", backend=self.name, key=key, error=str(e))
+        return found
+
+    def set_many(self, entries: Dict[str, Entry], ttl: float) -> None:
+        expires_at = time.time() + ttl
+        try:
+            rows = [
+                (key, namespace_of(key), _encode(value), soft_deadline, expires_at)
+                for key, (value, soft_deadline) in entries.items()
+            ]
+        except (TypeError, ValueError) as e:
+            logger.warning("cache_backend_encode_failed", backend=self.name, error=str(e))
+            return
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany("INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)", rows)
+                for row in rows:
+                    self._count(row[1], "sets")
+                self._since_prune += len(rows)
+                if self._since_prune >= self.PRUNE_EVERY:
+                    self._since_prune = 0
+                    self._prune()
+        except sqlite3.Error as e:
+            logger.warning("cache_backend_error", backend=self.name, op="set", error=str(e))
+
+    def _prune(self) -> None:
+        """Purge expired rows, then drop the soonest-expiring rows until the file fits its budget."""
+        now = time.time()
+        with self._conn:
+            for namespace, count in self._conn.execute(
+                "SELECT namespace, COUNT(*) FROM cache_entries WHERE expires_at <= ? GROUP BY namespace", (now,)
+            ).fetchall():
+                self._count(namespace, "expirations", count)
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (now,))
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(length(key) + length(value)), 0) FROM cache_entries"
+            ).fetchone()[0]
+            excess = total - self.max_bytes
+            if excess <= 0:
+                return
+            # Free 10% extra so the next few sets don't prune again.
+            excess += self.max_bytes // 10
+            victims = []
+            for key, namespace, size in self._conn.execute(
+                "SELECT key, namespace, length(key) + length(value) FROM cache_entries ORDER BY expires_at"
+            ):
+                if excess <= 0:
+                    break
+                victims.append((key,))
+                excess -= size
+                self._count(namespace, "evictions")
+            self._conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+
+    def delete(self, key: str) -> None:
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            logger.warning("cache_backend_error", backend=self.name, op="delete", error=str(e))
+
+    def _usage(self) -> Dict[str, Tuple[int, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(length(key) + length(value)), 0)"
+                " FROM cache_entries WHERE expires_at > ? GROUP BY namespace",
+                (time.time(),),
+            ).fetchall()
+        return {namespace: (entries, size) for namespace, entries, size in rows}
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            usage = self._usage()
+        except sqlite3.Error as e:
+            logger.warning("cache_backend_error", backend=self.name, op="stats", error=str(e))
+            usage = {}
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "max_bytes": self.max_bytes,
+            "entries": sum(entries for entries, _ in usage.values()),
+            "bytes": sum(size for _, size in usage.values()),
+        }
+
+    def namespace_stats(self) -> Dict[str, Dict[str, int]]:
+        try:
+            usage = self._usage()
+        except sqlite3.Error:
+            usage = {}
+        out: Dict[str, Dict[str, int]] = {}
+        for namespace in set(usage) | set(self._counters):
+            counters = self._counters.get(namespace, Counter())
+            entries, size = usage.get(namespace, (0, 0))
+            out[namespace] = {
+                "sets": counters["sets"],
+                "evictions": counters["evictions"],
+                "expirations": counters["expirations"],
+                "entries": entries,
+                "bytes": size,
+            }
+        return out
+
+
+class RedisBackend(CacheBackend):
+    """
+    Entries in a Redis-compatible server shared by every worker (and host) using it, through
+    the async `redis` client (optional dependency; redis:// and rediss:// URLs). Values are
+    stored encoded with the soft deadline in front; the hard TTL is the key's PX expiry.
+    After a connection error the backend is skipped for RETRY_AFTER seconds (misses).
+    """
+
+    name = "redis"
+    RETRY_AFTER = 5.0
+    _HEADER = struct.Struct(">d")
+
+    def __init__(self, client: Any, prefix: str = "song2learn:"):
+        self.client = client
+        self.prefix = prefix
+        self._down_until = 0.0
+        self.errors = 0
+        self._sets: Counter = Counter()
+
+    @property
+    def address(self) -> str:
+        kwargs = self.client.connection_pool.connection_kwargs
+        return f"{kwargs.get('host', 'localhost')}:{kwargs.get('port', 6379)}/{kwargs.get('db', 0)}"
+
+    async def _call(self, op: str, command: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return await command()
+        except REDIS_ERRORS as e:
+            self.errors += 1
+            self._down_until = time.monotonic() + self.RETRY_AFTER
+            logger.warning("cache_backend_error", backend=self.name, op=op, error=str(e))
+            return None
+
+    async def get(self, key: str) -> Optional[Entry]:
+        return (await self.get_many([key])).get(key)
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Entry]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        replies = await self._call("get", lambda: self.client.mget([self.prefix + key for key in keys]))
+        if not isinstance(replies, list):
+            return {}
+        found: Dict[str, Entry] = {}
+        for key, raw in zip(keys, replies):
+            if not isinstance(raw, bytes):
+                continue
+            try:
+                (soft_deadline,) = self._HEADER.unpack_from(raw)
+                found[key] = (decode_value(raw[self._HEADER.size:]), soft_deadline)
+            except DECODE_ERRORS as e:
+                logger.warning("cache_backend_corrupt_entry", backend=self.name, key=key, error=str(e))
+        return found
+
+    async def set(self, key: str, value: Any, soft_deadline: float, ttl: float) -> None:
+        await self.set_many({key: (value, soft_deadline)}, ttl)
+
+    async def set_many(self, entries: Dict[str, Entry], ttl: float) -> None:
+        try:
+            rows = [
+                (self.prefix + key, self._HEADER.pack(soft_deadline) + _encode(value))
+                for key, (value, soft_deadline) in entries.items()
+            ]
+        except (TypeError, ValueError) as e:
+            logger.warning("cache_backend_encode_failed", backend=self.name, error=str(e))
+            return
+        if not rows:
+            return
+
+        async def write() -> bool:
+            pipe = self.client.pipeline(transaction=False)
+            for key, blob in rows:
+                pipe.set(key, blob, px=int(ttl * 1000))
+            await pipe.execute()
+            return True
+
+        if await self._call("set", write):
+            for key in entries:
+                self._sets[namespace_of(key)] += 1
+
+    async def delete(self, key: str) -> None:
+        await self._call("delete", lambda: self.client.delete(self.prefix + key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "address": self.address,
+            "errors": self.errors,
+            "available": time.monotonic() >= self._down_until,
+        }
+
+    def namespace_stats(self) -> Dict[str, Dict[str, int]]:
+        return {namespace: {"sets": count} for namespace, count in self._sets.items()}
+
+
+def memory_backend() -> MemoryBackend:
+    store = TinyLFUCache(
+        max_bytes=settings.CACHE_MAX_BYTES,
+        ttl=settings.CACHE_TTL_SECONDS,
+        quotas=settings.CACHE_NAMESPACE_QUOTAS,
+        window_ratio=settings.CACHE_WINDOW_RATIO,
+        admission=settings.CACHE_ADMISSION == "tinylfu",
+        expected_entries=settings.CACHE_MAX_BYTES // 512,
+    )
+    return MemoryBackend(store, encoded=settings.CACHE_STORE_ENCODED)
+
+
+def make_backend() -> CacheBackend:
+    """The backend named by CACHE_BACKEND; falls back to memory if a shared one can't be opened."""
+    if settings.CACHE_BACKEND == "sqlite":
+        try:
+            return SQLiteBackend(settings.CACHE_SQLITE_PATH, settings.CACHE_MAX_BYTES)
+        except sqlite3.Error as e:
+            logger.warning("cache_backend_unavailable", backend="sqlite", error=str(e))
+    elif settings.CACHE_BACKEND == "redis":
+        if redis_asyncio is None:
+            logger.warning("cache_backend_unavailable", backend="redis", error="the redis package is not installed")
+        else:
+            return RedisBackend(
+                redis_asyncio.from_url(
+                    settings.CACHE_REDIS_URL,
+                    socket_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+                    socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT_SECONDS,
+                )
+            )
+    return memory_backend()
@@ -0,0 +1,188 @@
+"""
+Re-analysis ahead of a prompt/model cutover.
+
+LLM cache keys end in a fingerprint of the namespace's prompt version and the model
+(see cache_service.fingerprint), so a release that changes either starts with an empty
+keyspace. Run this job from the new release before it takes traffic:
+
+    python -m app.services.cache_reanalysis
+
+It reads the hottest durable-tier entries written under any other fingerprint (by
+hit_count, then recency), recomputes them with the current prompt and model, and stores
+the results under the new keys. Entries written before their inputs were recorded
+(params IS NULL) cannot be recomputed and are left to fill on demand.
+
+Then it deletes entries of other fingerprints that nothing has read for
+LLM_CACHE_PRUNE_AFTER_DAYS: the new keys never reach them, and the window leaves the
+previous release's entries in place while it is still serving or might be rolled back to.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import structlog
+from sqlalchemy import delete, func, or_, select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.llm_cache import LLMCacheEntry
+from app.services.cache_service import PROMPT_VERSIONS, fingerprint, make_analysis_key, make_interlinear_key
+from app.services.cerebras import cerebras_service
+from app.services.persistent_cache import persistent_cache
+
+logger = structlog.get_logger()
+
+# Namespaces whose entries can be recomputed from their stored inputs.
+NAMESPACES = ("analysis", "interlinear")
+
+_KEY_BUILDERS = {"analysis": make_analysis_key, "interlinear": make_interlinear_key}
+
+
+def _new_key(namespace: str, params: Dict[str, Any]) -> str:
+    return _KEY_BUILDERS[namespace](
+        params.get("song_id", 0),
+        params.get("line_index", 0),
+        params["line"],
+        params["native_lang"],
+        params["learning_lang"],
+    )
+
+
+async def _hot_inputs(namespace: str, limit: int) -> Dict[str, Dict[str, Any]]:
+    """new key -> inputs for the hottest entries of previous fingerprints (one per new key)."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(LLMCacheEntry.params)
+            .where(
+                LLMCacheEntry.key.like(f"{namespace}:%"),
+                LLMCacheEntry.fingerprint.isnot(None),
+                LLMCacheEntry.fingerprint != fingerprint(namespace),
+                LLMCacheEntry.params.isnot(None),
+            )
+            .order_by(LLMCacheEntry.hit_count.desc(), LLMCacheEntry.last_hit_at.desc().nullslast())
+            .limit(limit)
+        )
+        rows = result.scalars().all()
+    inputs: Dict[str, Dict[str, Any]] = {}
+    for params in rows:
+        try:
+            inputs.setdefault(_new_key(namespace, params), params)
+        except (KeyError, TypeError):
+            continue
+    return inputs
+
+
+async def _recompute_analyses(items: List[Tuple[str, Dict[str, Any]]]) -> None:
+    if not settings.CACHE_CONTENT_ADDRESSED:
+        # Positional keys carry song and line; recompute line by line.
+        await _recompute_lines("analysis", items)
+        return
+    # Content-addressed: analyze_song packs each language pair's lines several per prompt.
+    pairs: Dict[Tuple[str, str], List[str]] = {}
+    for _, params in items:
+        pairs.setdefault((params["native_lang"], params["learning_lang"]), []).append(params["line"])
+    for (native_lang, learning_lang), lines in pairs.items():
+        async for _ in cerebras_service.analyze_song(0, lines, native_lang, learning_lang):
+            pass
+
+
+async def _recompute_lines(namespace: str, items: List[Tuple[str, Dict[str, Any]]]) -> None:
+    method = cerebras_service.analyze_line if namespace == "analysis" else cerebras_service.interlinear_line
+    slots = asyncio.Semaphore(max(1, settings.LLM_CACHE_REANALYZE_CONCURRENCY))
+
+    async def run(params: Dict[str, Any]) -> None:
+        async with slots:
+            await method(
+                params["line"],
+                params["native_lang"],
+                params["learning_lang"],
+                params.get("song_id", 0),
+                params.get("line_index", 0),
+            )
+
+    await asyncio.gather(*(run(params) for _, params in items))
+
+
+async def reanalyze_hot_keys(limit: int = 0) -> Dict[str, Dict[str, int]]:
+    """
+    Recompute the hottest `limit` (default LLM_CACHE_REANALYZE_LIMIT) previous-fingerprint
+    entries per namespace. Returns per-namespace counts of candidates, entries that were
+    already current, and entries written.
+    """
+    limit = limit or settings.LLM_CACHE_REANALYZE_LIMIT
+    report: Dict[str, Dict[str, int]] = {}
+    for namespace in NAMESPACES:
+        try:
+            inputs = await _hot_inputs(namespace, limit)
+        except Exception as e:
+            logger.warning("cache_reanalysis_query_failed", namespace=namespace, error=str(e))
+            continue
+        current = await persistent_cache.get_many(list(inputs))
+        todo = [(key, params) for key, params in inputs.items() if key not in current]
+        if todo:
+            if namespace == "analysis":
+                await _recompute_analyses(todo)
+            else:
+                await _recompute_lines(namespace, todo)
+        written = await persistent_cache.get_many([key for key, _ in todo])
+        report[namespace] = {"candidates": len(inputs), "current": len(current), "written": len(written)}
+        logger.info(
+            "cache_reanalysis_done",
+            namespace=namespace,
+            fingerprint=fingerprint(namespace),
+            **report[namespace],
+        )
+    return report
+
+
+async def prune_stale_fingerprints(days: int = -1) -> Dict[str, int]:
+    """
+    Delete entries of any other fingerprint (or none) whose last hit, or creation when never
+    hit, is older than `days` (default LLM_CACHE_PRUNE_AFTER_DAYS; 0 keeps them forever).
+    Returns per-namespace counts of deleted rows.
+    """
+    days = settings.LLM_CACHE_PRUNE_AFTER_DAYS if days < 0 else days
+    if days <= 0:
+        return {}
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    pruned: Dict[str, int] = {}
+    for namespace in PROMPT_VERSIONS:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    delete(LLMCacheEntry).where(
+                        LLMCacheEntry.key.like(f"{namespace}:%"),
+                        or_(LLMCacheEntry.fingerprint.is_(None), LLMCacheEntry.fingerprint != fingerprint(namespace)),
+                        func.coalesce(LLMCacheEntry.last_hit_at, LLMCacheEntry.created_at) < cutoff,
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning("cache_prune_failed", namespace=namespace, error=str(e))
+            continue
+        pruned[namespace] = result.rowcount or 0
+    logger.info("cache_prune_done", days=days, **pruned)
+    return pruned
+
+
+async def run_reanalysis() -> None:
+    """CLI entry point; no-op unless AI and the durable tier are configured."""
+    if not settings.CEREBRAS_API_KEY or not persistent_cache.enabled():
+        logger.info("cache_reanalysis_skipped")
+        return
+    await reanalyze_hot_keys()
+    await prune_stale_fingerprints()
+
+
+if __name__ == "__main__":
+    from app.services.http_client import init_http_client, close_http_client
+
+    async def _main() -> None:
+        await init_http_client()
+        try:
+            await run_reanalysis()
+        finally:
+            await close_http_client()
+
+    asyncio.run(_main())
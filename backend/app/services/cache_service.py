@@ -1,32 +1,207 @@
-from typing import Optional, Any
-from cachetools import TTLCache
-import threading
+from typing import Optional, Any, Awaitable, Callable, Dict, Iterable, Set, Tuple
+import asyncio
 import hashlib
+import inspect
+import time
+import structlog
 
-_cache = TTLCache(maxsize=1000, ttl=3600)
-_lock = threading.Lock()
+from app.core.config import settings
+from app.services.cache_backends import STORAGE_COUNTERS, CacheBackend, make_backend
+from app.services.cache_store import NamespaceStats, namespace_of
+
+logger = structlog.get_logger()
+
+
+# Chosen by CACHE_BACKEND: per-process memory (default), a SQLite file shared by the
+# host's workers, or a Redis-compatible server.
+_backend: CacheBackend = make_backend()
+
+
+# Bump a namespace's version whenever its prompt or parser changes. Together with the
+# model it forms the fingerprint at the end of every LLM cache key, so a new prompt or
+# model never reads results of the old one (and durable entries need no TTL).
+PROMPT_VERSIONS: Dict[str, str] = {"analysis": "v1", "interlinear": "v1", "check": "v1"}
+
+
+def fingerprint(namespace: str, model: Optional[str] = None) -> str:
+    """8-char hash of (namespace, prompt version, model); `model` defaults to CEREBRAS_MODEL."""
+    raw = f"{namespace}|{PROMPT_VERSIONS[namespace]}|{model or settings.CEREBRAS_MODEL}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:8]
+
+
+def _line_hash(line: str) -> str:
+    """16-char sha256 hash of the normalized line to minimize collision risk."""
+    return hashlib.sha256(line.lower().strip().encode()).hexdigest()[:16]
+
+
+def _make_line_key(namespace: str, song_id: int, line_index: int, line: str, native_lang: str, learning_lang: str) -> str:
+    version = fingerprint(namespace)
+    if settings.CACHE_CONTENT_ADDRESSED:
+        # Same text + language pair = same entry, whichever song or position it came from.
+        return f"{namespace}:{_line_hash(line)}:{learning_lang}:{native_lang}:{version}"
+    return f"{namespace}:{song_id}:{line_index}:{_line_hash(line)}:{learning_lang}:{native_lang}:{version}"
 
 
 def make_analysis_key(song_id: int, line_index: int, line: str, native_lang: str, learning_lang: str) -> str:
-    """Cache key with 16-char sha256 hash to minimize collision risk."""
-    line_hash = hashlib.sha256(line.lower().strip().encode()).hexdigest()[:16]
-    return f"analysis:{song_id}:{line_index}:{line_hash}:{learning_lang}:{native_lang}"
+    """Cache key for line analyses (song_id/line_index only used when CACHE_CONTENT_ADDRESSED is off)."""
+    return _make_line_key("analysis", song_id, line_index, line, native_lang, learning_lang)
 
 
 def make_interlinear_key(song_id: int, line_index: int, line: str, native_lang: str, learning_lang: str) -> str:
     """Cache key for interlinear word-by-word translations."""
-    line_hash = hashlib.sha256(line.lower().strip().encode()).hexdigest()[:16]
-    return f"interlinear:{song_id}:{line_index}:{line_hash}:{learning_lang}:{native_lang}"
+    return _make_line_key("interlinear", song_id, line_index, line, native_lang, learning_lang)
+
+
+def make_check_key(original: str, user_translation: str, native_lang: str, learning_lang: str) -> str:
+    """Cache key for a graded (original line, learner answer) pair."""
+    answer = _line_hash(" ".join(user_translation.split()))
+    return f"check:{_line_hash(original)}:{answer}:{learning_lang}:{native_lang}:{fingerprint('check')}"
+
+
+def make_story_key(song_id: int, target_lang: str, prompt_version: str) -> str:
+    """Cache key for a song's generated story in one language."""
+    return f"story:{song_id}:{target_lang}:{prompt_version}"
+
+
+def _soft_deadline() -> float:
+    soft = settings.CACHE_SOFT_TTL_SECONDS
+    if soft <= 0 or soft >= settings.CACHE_TTL_SECONDS:
+        return float("inf")  # stale-while-revalidate off: entries stay fresh until they expire
+    # Wall clock: shared backends compare deadlines written by other processes.
+    return time.time() + soft
 
 
 class CacheService:
-    def get(self, key: str) -> Optional[Any]:
-        with _lock:
-            return _cache.get(key)
+    """
+    LLM result cache with soft and hard expiry over a pluggable backend. Past
+    CACHE_SOFT_TTL_SECONDS an entry is stale: it is still served, and `revalidate`
+    refreshes it in the background (once per key and process) so hot entries are
+    replaced before they hard-expire at CACHE_TTL_SECONDS.
+
+    Lookups and writes are coroutines: the SQLite backend is called in a worker thread so its
+    disk I/O never stalls the event loop, the Redis backend is async itself, and the memory
+    backend is called inline.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        # Lookup counters per namespace; storage counters come from the backend.
+        self.namespaces: Dict[str, NamespaceStats] = {}
+        self._refreshing: Set[str] = set()
+        # Strong references so fire-and-forget refreshes are not garbage collected mid-flight.
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _count(self, key: str, entry: Optional[Tuple[Any, float]]) -> bool:
+        """Record a lookup; returns whether the entry is stale."""
+        namespace = namespace_of(key)
+        stats = self.namespaces.get(namespace)
+        if stats is None:
+            stats = self.namespaces[namespace] = NamespaceStats()
+        if entry is None:
+            stats.misses += 1
+            return False
+        stale = time.time() >= entry[1]
+        stats.hits += 1
+        stats.stale_hits += stale
+        return stale
+
+    async def _io(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        result = fn(*args)
+        return await result if inspect.isawaitable(result) else result
+
+    async def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Return (value, is_stale); (None, False) on a miss."""
+        entry = await self._io(self.backend.get, key)
+        stale = self._count(key, entry)
+        return (entry[0], stale) if entry is not None else (None, False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return (await self.lookup(key))[0]
+
+    async def lookup_many(self, keys: Iterable[str]) -> Dict[str, Tuple[Any, bool]]:
+        """key -> (value, is_stale) for the keys found, in one backend round trip."""
+        keys = list(dict.fromkeys(keys))
+        found = await self._io(self.backend.get_many, keys) if keys else {}
+        results: Dict[str, Tuple[Any, bool]] = {}
+        for key in keys:
+            entry = found.get(key)
+            stale = self._count(key, entry)
+            if entry is not None:
+                results[key] = (entry[0], stale)
+        return results
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        return {key: value for key, (value, _) in (await self.lookup_many(keys)).items()}
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._io(self.backend.set, key, value, _soft_deadline(), settings.CACHE_TTL_SECONDS)
+
+    async def set_many(self, entries: Dict[str, Any]) -> None:
+        if entries:
+            soft_deadline = _soft_deadline()
+            await self._io(
+                self.backend.set_many,
+                {key: (value, soft_deadline) for key, value in entries.items()},
+                settings.CACHE_TTL_SECONDS,
+            )
+
+    async def delete(self, key: str) -> None:
+        await self._io(self.backend.delete, key)
+
+    def revalidate(self, key: str, refresh: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Run `refresh` (which re-computes and `set`s the entry) in the background unless a
+        refresh for `key` is already running. Returns whether one was scheduled.
+        """
+        if key in self._refreshing:
+            return False
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._revalidate(key, refresh))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _revalidate(self, key: str, refresh: Callable[[], Awaitable[None]]) -> None:
+        try:
+            await refresh()
+        except Exception as e:
+            logger.warning("cache_revalidate_failed", key=key, error=str(e))
+        finally:
+            self._refreshing.discard(key)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Backend capacity/usage plus per-namespace lookup and storage counters."""
+        storage = await self._io(self.backend.namespace_stats)
+        backend = await self._io(self.backend.stats)
+        namespaces = {}
+        for name in sorted(set(self.namespaces) | set(storage)):
+            snapshot = (self.namespaces.get(name) or NamespaceStats()).snapshot()
+            snapshot.update({k: v for k, v in storage.get(name, {}).items() if k in STORAGE_COUNTERS})
+            namespaces[name] = snapshot
+        return {
+            **backend,
+            "ttl_seconds": settings.CACHE_TTL_SECONDS,
+            "soft_ttl_seconds": settings.CACHE_SOFT_TTL_SECONDS,
+            "refreshing": len(self._refreshing),
+            "namespaces": namespaces,
+        }
+
 
-    def set(self, key: str, value: Any) -> None:
-        with _lock:
-            _cache[key] = value
+cache_service = CacheService(_backend)
 
 
-cache_service = CacheService()
+async def log_cache_stats(interval: float) -> None:
+    """Emit a `cache_stats` event every `interval` seconds (started from the app lifespan)."""
+    while True:
+        await asyncio.sleep(interval)
+        stats = await cache_service.stats()
+        logger.info(
+            "cache_stats",
+            backend=stats["backend"],
+            entries=stats.get("entries"),
+            max_bytes=stats.get("max_bytes"),
+            bytes=stats.get("bytes"),
+            namespaces=stats["namespaces"],
+        )
@@ -0,0 +1,304 @@
+import heapq
+import json
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # optional; CACHE_SERIALIZER=msgpack falls back to JSON without it
+    msgpack = None
+
+# Quota key shared by namespaces without a quota of their own.
+OTHER = "*"
+
+# First byte of an encoded value: serializer, upper case when the payload is zlib-compressed.
+_JSON, _MSGPACK = b"j", b"m"
+
+
+def encode_value(value: Any, serializer: str = "json", compress_min_bytes: int = 256) -> bytes:
+    """Serialize (JSON or msgpack) and zlib-compress payloads of at least `compress_min_bytes`."""
+    if serializer == "msgpack" and msgpack is not None:
+        tag, payload = _MSGPACK, msgpack.packb(value, use_bin_type=True)
+    else:
+        tag, payload = _JSON, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+    if 0 <= compress_min_bytes <= len(payload):
+        packed = zlib.compress(payload, 6)
+        if len(packed) < len(payload):
+            return tag.upper() + packed
+    return tag + payload
+
+
+def decode_value(blob: bytes) -> Any:
+    tag, payload = blob[:1], blob[1:]
+    if tag.isupper():
+        tag, payload = tag.lower(), zlib.decompress(payload)
+    if tag == _MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack-encoded cache value but msgpack is not installed")
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
+
+
+def namespace_of(key: str) -> str:
+    """Key prefix before the first ':' (analysis, interlinear, check, story, ...)."""
+    return key.split(":", 1)[0]
+
+
+class NamespaceStats:
+    """Counters for one key namespace; `entries` and `bytes` describe what is held right now."""
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.expirations = 0
+        self.entries = 0
+        self.bytes = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "rejections": self.rejections,
+            "expirations": self.expirations,
+            "entries": self.entries,
+            "bytes": self.bytes,
+        }
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent access frequency (4 rows of 4-bit counters, capped at 15).
+    Every counter is halved once `sample_size` increments have been recorded, so the
+    sketch follows the current popularity of keys rather than their all-time totals.
+    """
+
+    DEPTH = 4
+
+    def __init__(self, capacity: int):
+        width = 64
+        while width < capacity * 4:
+            width *= 2
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in range(self.DEPTH)]
+        self.sample_size = max(10, capacity * 10)
+        self._additions = 0
+
+    def _slots(self, key: str):
+        for seed, row in enumerate(self._rows):
+            yield row, hash((seed, key)) & self._mask
+
+    def increment(self, key: str) -> None:
+        added = False
+        for row, i in self._slots(key):
+            if row[i] < 15:
+                row[i] += 1
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self.sample_size:
+                self._age()
+
+    def estimate(self, key: str) -> int:
+        return min(row[i] for row, i in self._slots(key))
+
+    def _age(self) -> None:
+        self._rows = [bytearray(c >> 1 for c in row) for row in self._rows]
+        self._additions //= 2
+
+
+class _Segment:
+    """One namespace quota (bytes): a small LRU admission window in front of the main LRU."""
+
+    def __init__(self, capacity: int, window_ratio: float, admission: bool):
+        self.capacity = max(1, capacity)
+        self.window_capacity = max(1, int(self.capacity * window_ratio)) if admission else self.capacity
+        # key -> entry size, in LRU order
+        self.window: "OrderedDict[str, int]" = OrderedDict()
+        self.main: "OrderedDict[str, int]" = OrderedDict()
+        self.window_size = 0
+        self.main_size = 0
+
+    @property
+    def main_capacity(self) -> int:
+        return max(0, self.capacity - self.window_capacity)
+
+    def touch(self, key: str) -> None:
+        (self.window if key in self.window else self.main).move_to_end(key)
+
+    def resize(self, key: str, size: int) -> None:
+        if key in self.window:
+            self.window_size += size - self.window[key]
+            self.window[key] = size
+        elif key in self.main:
+            self.main_size += size - self.main[key]
+            self.main[key] = size
+
+    def discard(self, key: str) -> None:
+        if key in self.window:
+            self.window_size -= self.window.pop(key)
+        elif key in self.main:
+            self.main_size -= self.main.pop(key)
+
+    def __len__(self) -> int:
+        return len(self.window) + len(self.main)
+
+
+class TinyLFUCache:
+    """
+    Byte-budgeted entry store with W-TinyLFU admission and a quota per key namespace.
+
+    New entries enter their namespace's admission window (LRU). When the window overflows,
+    its oldest entry competes with the main segment's LRU victims it would displace and is
+    only admitted if the frequency sketch has seen it more often than each of them, so
+    one-off keys cannot flush keys that are hit all the time. Capacity is counted in the
+    sizes callers pass to `put`; quotas are fractions of `max_bytes` and namespaces without
+    one share the rest. With `admission=False` every segment is a plain LRU.
+
+    Entries hard-expire `ttl` seconds (or the TTL given to `put`) after they were last set.
+    Not thread-safe; callers lock.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        quotas: Optional[Dict[str, float]] = None,
+        window_ratio: float = 0.01,
+        admission: bool = True,
+        timer: Callable[[], float] = time.monotonic,
+        expected_entries: Optional[int] = None,
+    ):
+        self.max_bytes = max(1, max_bytes)
+        self.ttl = ttl
+        self.timer = timer
+        self.sketch = FrequencySketch(expected_entries or self.max_bytes)
+        quotas = dict(quotas or {})
+        shares = {name: max(0.0, share) for name, share in quotas.items() if name != OTHER}
+        shares[OTHER] = max(0.0, 1.0 - sum(shares.values()))
+        self.segments: Dict[str, _Segment] = {
+            name: _Segment(int(self.max_bytes * share), window_ratio, admission) for name, share in shares.items()
+        }
+        self.namespaces: Dict[str, NamespaceStats] = {}
+        # key -> (value, expires_at, size); _expiry is a heap of (expires_at, key), entries of
+        # overwritten or removed keys are skipped when they surface.
+        self._data: Dict[str, Tuple[Any, float, int]] = {}
+        self._expiry: List[Tuple[float, str]] = []
+
+    def stats_for(self, key: str) -> NamespaceStats:
+        namespace = namespace_of(key)
+        stats = self.namespaces.get(namespace)
+        if stats is None:
+            stats = self.namespaces[namespace] = NamespaceStats()
+        return stats
+
+    def _segment(self, key: str) -> _Segment:
+        segment = self.segments.get(namespace_of(key))
+        return segment if segment is not None else self.segments[OTHER]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str) -> Optional[Any]:
+        self.sketch.increment(key)
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= self.timer():
+            self._remove(key, "expirations")
+            return None
+        self._segment(key).touch(key)
+        return entry[0]
+
+    def put(self, key: str, value: Any, size: int, ttl: Optional[float] = None) -> None:
+        self.expire()
+        self.sketch.increment(key)
+        stats = self.stats_for(key)
+        stats.sets += 1
+        segment = self._segment(key)
+        if size > segment.capacity:
+            # Could never fit; drop any older version rather than keep a stale value.
+            stats.rejections += 1
+            self._remove(key, "evictions")
+            return
+        previous = self._data.get(key)
+        expires_at = self.timer() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at, size)
+        heapq.heappush(self._expiry, (expires_at, key))
+        if previous is not None:
+            stats.bytes += size - previous[2]
+            segment.resize(key, size)
+            segment.touch(key)
+        else:
+            stats.entries += 1
+            stats.bytes += size
+            segment.window[key] = size
+            segment.window_size += size
+        self._admit(segment)
+
+    def _admit(self, segment: _Segment) -> None:
+        while segment.window_size > segment.window_capacity and segment.window:
+            candidate, size = segment.window.popitem(last=False)
+            segment.window_size -= size
+            # LRU victims that would have to go to make room for the candidate.
+            victims, freed = [], segment.main_capacity - segment.main_size
+            for victim in segment.main:
+                if freed >= size:
+                    break
+                victims.append(victim)
+                freed += segment.main[victim]
+            if freed < size:
+                self._remove(candidate, "evictions")
+                continue
+            frequency = self.sketch.estimate(candidate)
+            if victims and any(self.sketch.estimate(v) >= frequency for v in victims):
+                self.stats_for(candidate).rejections += 1
+                self._remove(candidate, "evictions")
+                continue
+            for victim in victims:
+                self._remove(victim, "evictions")
+            segment.main[candidate] = size
+            segment.main_size += size
+        # Resizing an entry in the main segment can push it over its share as well.
+        while segment.main_size > segment.main_capacity and segment.main:
+            self._remove(next(iter(segment.main)), "evictions")
+
+    def delete(self, key: str) -> None:
+        self._remove(key, None)
+
+    def _remove(self, key: str, reason: Optional[str]) -> None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        self._segment(key).discard(key)
+        stats = self.stats_for(key)
+        if reason:
+            setattr(stats, reason, getattr(stats, reason) + 1)
+        stats.entries -= 1
+        stats.bytes -= entry[2]
+
+    def expire(self) -> None:
+        """Drop every entry past its hard expiry."""
+        now = self.timer()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._data.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key, "expirations")
+
+    def quotas(self) -> Dict[str, int]:
+        """Byte budget per quota."""
+        return {name: segment.capacity for name, segment in sorted(self.segments.items())}
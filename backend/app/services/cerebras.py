@@ -1,27 +1,101 @@
 import json
 import time
-from typing import Optional, Dict, Any, Tuple
+import asyncio
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Dict, Any, Tuple, List, AsyncIterator, Awaitable, Callable
+import httpx
 import structlog
 
 from app.core.config import settings
-from app.services.http_client import get_http_client
-from app.services.cache_service import cache_service, make_analysis_key, make_interlinear_key
+from app.services.cache_service import (
+    cache_service,
+    fingerprint,
+    make_analysis_key,
+    make_check_key,
+    make_interlinear_key,
+)
+from app.services.cache_store import namespace_of
+from app.services.line_memory import canonical_line, jaccard, line_memory, shingles
+from app.services.llm_metrics import llm_metrics
+from app.services.microbatch import MicroBatcher
+from app.services.negative_cache import PARSE_FAILURE, UPSTREAM_ERROR, negative_cache
+from app.services.persistent_cache import persistent_cache
+from app.services.resilience import AIMDLimiter, CircuitBreaker, RetryPolicy, TimeoutPolicy, Upstream
+from app.services.singleflight import SingleFlight
 
 logger = structlog.get_logger()
 
 CEREBRAS_URL = "https://api.cerebras.ai/v1/chat/completions"
-MODEL = "llama-3.3-70b"
+MODEL = settings.CEREBRAS_MODEL
 
 MAX_LINE_LENGTH = 500
 MAX_RESPONSE_LENGTH = 300
+MAX_STORY_LENGTH = 3000
 
+ANALYSIS_FALLBACK = {"translation": "Analysis unavailable", "grammar": "", "vocabulary": []}
 
-def _parse_json(content: str) -> Tuple[Optional[Dict[str, Any]], bool]:
-    """Return (result, is_valid_for_caching)."""
-    try:
-        result = json.loads(content)
-    except json.JSONDecodeError as e:
-        logger.error("cerebras_json_parse_error", error=str(e), content=content[:200])
+# Breaker + adaptive concurrency limit shared by interactive and background calls.
+# When Cerebras degrades, calls fail fast into the fallback payloads instead of
+# each waiting out the full HTTP timeout.
+cerebras_upstream = Upstream(
+    "cerebras",
+    breaker=CircuitBreaker(
+        "cerebras",
+        failure_threshold=settings.CEREBRAS_BREAKER_FAILURES,
+        reset_timeout=settings.CEREBRAS_BREAKER_RESET_SECONDS,
+    ),
+    limiter=AIMDLimiter(
+        "cerebras",
+        max_limit=settings.CEREBRAS_MAX_CONCURRENCY,
+        max_wait=settings.CEREBRAS_QUEUE_TIMEOUT_SECONDS,
+    ),
+    retry=RetryPolicy(
+        max_attempts=settings.CEREBRAS_MAX_ATTEMPTS,
+        base_delay=settings.RETRY_BASE_DELAY_SECONDS,
+        max_delay=settings.RETRY_MAX_DELAY_SECONDS,
+    ),
+    timeouts=TimeoutPolicy(
+        maximum=settings.CEREBRAS_TIMEOUT_SECONDS,
+        minimum=settings.UPSTREAM_TIMEOUT_MIN_SECONDS,
+    ),
+)
+
+# Concurrent cache misses for the same key share one upstream call (one registry per cached op).
+flights: Dict[str, SingleFlight] = {}
+
+
+def flight_for(op: "LLMOperation") -> SingleFlight:
+    flight = flights.get(op.name)
+    if flight is None:
+        flight = flights[op.name] = SingleFlight(op.name)
+    return flight
+
+
+@dataclass(frozen=True)
+class LLMOperation:
+    """
+    One kind of prompt: request limits, how to read the model's JSON, and caching policy.
+
+    `parse` receives the decoded JSON object and returns (value, is_valid_for_caching);
+    a None value means the response is unusable and the caller's fallback is returned.
+    `cached` ops go through the in-memory cache, single-flight and the durable tier,
+    keyed by the cache_key the caller supplies.
+    """
+
+    name: str
+    system: str
+    max_tokens: int
+    temperature: float
+    parse: Optional[Callable[[Any], Tuple[Optional[Any], bool]]] = None
+    fallback: Any = None
+    cached: bool = False
+    timeout: Optional[float] = None
+
+
+def _normalize_analysis(result: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Clamp an analysis object to the response shape. Return (result, is_valid_for_caching)."""
+    if not isinstance(result, dict):
         return None, False
 
     translation = str(result.get("translation", "")).strip()
@@ -41,6 +115,188 @@ def _parse_json(content: str) -> Tuple[Optional[Dict[str, Any]], bool]:
     return out, True
 
 
+def _parse_analysis_batch(data: Any, count: int) -> Tuple[Optional[List[Optional[Dict[str, Any]]]], bool]:
+    """Parse {"results":[{"i":0,...}]} into a list aligned with the prompt lines (None = missing/invalid)."""
+    items = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return None, False
+    out: List[Optional[Dict[str, Any]]] = [None] * count
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        i = item.get("i")
+        if not isinstance(i, int) or not 0 <= i < count:
+            continue
+        result, is_valid = _normalize_analysis(item)
+        if is_valid:
+            out[i] = result
+    return out, True
+
+
+def _parse_check(data: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Clamp a verdict to {is_correct, score, correct_translation, feedback}; invalid without a bool verdict and feedback."""
+    if not isinstance(data, dict):
+        return None, False
+    is_correct, feedback = data.get("is_correct"), data.get("feedback")
+    if not isinstance(is_correct, bool) or not isinstance(feedback, str) or not feedback.strip():
+        return None, False
+    score = data.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float)):
+        score = 1.0 if is_correct else 0.0
+    correct_translation = data.get("correct_translation")
+    return {
+        "is_correct": is_correct,
+        "score": min(1.0, max(0.0, float(score))),
+        "correct_translation": str(correct_translation or "")[:MAX_RESPONSE_LENGTH],
+        "feedback": feedback.strip()[:MAX_RESPONSE_LENGTH],
+    }, True
+
+
+def _parse_tokens(data: Any) -> Tuple[Optional[Dict[str, Any]], bool]:
+    tokens = data.get("tokens") if isinstance(data, dict) else None
+    if not isinstance(tokens, list) or not tokens:
+        return None, False
+    return {"tokens": tokens}, True
+
+
+def _parse_word_batch(data: Any, count: int) -> Tuple[Optional[List[str]], bool]:
+    """Parse {"translations":[{"i":0,"translation":"..."}]} into a list aligned with the prompt words ("" = missing)."""
+    items = data.get("translations") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        return None, False
+    out = [""] * count
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        i = item.get("i")
+        if isinstance(i, int) and 0 <= i < count:
+            out[i] = str(item.get("translation", "")).strip()[:200]
+    return out, True
+
+
+def _text_field(field: str, limit: int) -> Callable[[Any], Tuple[Optional[str], bool]]:
+    def parse(data: Any) -> Tuple[Optional[str], bool]:
+        if not isinstance(data, dict):
+            return None, False
+        text = str(data.get(field, "")).strip()[:limit]
+        return text, bool(text)
+
+    return parse
+
+
+ANALYZE = LLMOperation(
+    name="analyze",
+    system="Language tutor. Valid JSON only.",
+    max_tokens=200,
+    temperature=0.3,
+    parse=_normalize_analysis,
+    fallback=ANALYSIS_FALLBACK,
+    cached=True,
+)
+ANALYZE_BATCH = LLMOperation(
+    name="analyze_batch",
+    system="Language tutor. Valid JSON only.",
+    max_tokens=200,  # per line; the parser is bound per call to the line count
+    temperature=0.3,
+    # Several analyses per response take longer than the adaptive single-call timeout.
+    timeout=settings.ANALYZE_SONG_TIMEOUT_SECONDS,
+)
+# Short prompt for lines close to an analyzed one: translate, and explain only the new words.
+ANALYZE_ADAPT = LLMOperation(
+    name="analyze_adapt",
+    system="Language tutor. Valid JSON only.",
+    max_tokens=120,  # per line; the parser is bound per call to the line count
+    temperature=0.3,
+    timeout=settings.ANALYZE_SONG_TIMEOUT_SECONDS,
+)
+CHECK_TRANSLATION = LLMOperation(
+    name="check_translation",
+    system="Fair language teacher. Valid JSON only.",
+    max_tokens=300,
+    temperature=0.3,
+    parse=_parse_check,
+    fallback={"is_correct": False, "score": 0.0, "correct_translation": "", "feedback": "Check unavailable"},
+    cached=True,
+)
+DESCRIBE_ICONIC = LLMOperation(
+    name="describe_iconic",
+    system="Music critic. Valid JSON only.",
+    max_tokens=180,
+    temperature=0.4,
+    parse=_text_field("reason", 400),
+    fallback="",
+)
+INTERLINEAR = LLMOperation(
+    name="interlinear",
+    system="Translator. Valid JSON only.",
+    max_tokens=260,
+    temperature=0.2,
+    parse=_parse_tokens,
+    cached=True,
+)
+TRANSLATE_WORD = LLMOperation(
+    name="translate_word",
+    system="Translator. Valid JSON only.",
+    max_tokens=60,
+    temperature=0.2,
+    parse=_text_field("translation", 200),
+    fallback="",
+)
+TRANSLATE_WORDS = LLMOperation(
+    name="translate_words",
+    system="Translator. Valid JSON only.",
+    max_tokens=30,  # per word; the parser is bound per call to the word count
+    temperature=0.2,
+)
+SONG_STORY = LLMOperation(
+    name="song_story",
+    system="Music historian and storyteller. Valid JSON only.",
+    max_tokens=800,
+    temperature=0.5,
+    parse=_text_field("story", MAX_STORY_LENGTH),
+    fallback="",
+)
+# Plain-text variant relayed token by token; the JSON wrapper would leak into the stream.
+SONG_STORY_STREAM = LLMOperation(
+    name="song_story_stream",
+    system="Music historian and storyteller. Plain text only, no markdown.",
+    max_tokens=800,
+    temperature=0.5,
+)
+
+
+def _merge_adapted(line: str, reference: Dict[str, Any], adapted: Dict[str, Any]) -> Dict[str, Any]:
+    """Adapted analysis plus the reference's vocabulary entries whose word still occurs in `line`."""
+    padded = f" {canonical_line(line)} "
+    vocabulary = [
+        entry
+        for entry in reference.get("vocabulary") or []
+        if isinstance(entry, dict) and f" {canonical_line(str(entry.get('word', '')))} " in padded
+    ]
+    seen = {canonical_line(str(entry.get("word", ""))) for entry in vocabulary}
+    vocabulary += [
+        entry
+        for entry in adapted["vocabulary"]
+        if not isinstance(entry, dict) or canonical_line(str(entry.get("word", ""))) not in seen
+    ]
+    return {
+        "translation": adapted["translation"],
+        "grammar": adapted["grammar"] or str(reference.get("grammar") or "")[:MAX_RESPONSE_LENGTH],
+        "vocabulary": vocabulary,
+    }
+
+
+def _line_params(line: str, native_lang: str, learning_lang: str, song_id: int, line_index: int) -> Dict[str, Any]:
+    """Inputs stored with a line's durable entry (see app.services.cache_reanalysis)."""
+    return {
+        "line": line,
+        "native_lang": native_lang,
+        "learning_lang": learning_lang,
+        "song_id": song_id,
+        "line_index": line_index,
+    }
+
+
 class CerebrasService:
     """Service for interacting with Cerebras API for language analysis."""
 
@@ -50,6 +306,201 @@ class CerebrasService:
     def _headers(self) -> Dict[str, str]:
         return {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
 
+    async def _post(self, op: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> httpx.Response:
+        """
+        Every Cerebras call goes through here: circuit breaker, shared concurrency limit,
+        retries on 429/5xx (honoring Retry-After) and a per-operation adaptive timeout.
+        Raises UpstreamUnavailable when rejected.
+        """
+        return await cerebras_upstream.request(
+            "POST",
+            CEREBRAS_URL,
+            op=op,
+            headers=self._headers(),
+            json=payload,
+            timeout=timeout,
+        )
+
+    async def _run(
+        self,
+        op: LLMOperation,
+        prompt: str,
+        cache_key: Optional[str] = None,
+        fallback: Any = None,
+        upstream: Optional[Callable[[], Awaitable[Tuple[Optional[Any], bool]]]] = None,
+        params: Optional[Dict[str, Any]] = None,
+        nearby: Optional[Callable[[], Awaitable[Tuple[Optional[Any], bool]]]] = None,
+    ) -> Tuple[Any, bool]:
+        """
+        Execute an operation: memory cache -> negative cache -> single-flight -> durable
+        tier -> LLM for cached ops, a plain LLM call otherwise. Stale memory hits are served
+        while one background refresh runs. Returns (value, served_from_cache);
+        on any failure the value is `fallback` (or the op's default fallback).
+        `upstream` replaces the single-prompt LLM call (same (value, cacheable) contract).
+        `params` are the inputs stored with the durable entry so it can be recomputed.
+        `nearby` is tried between the durable tier and `upstream` (not by background refreshes).
+        """
+        if upstream is None:
+            upstream = partial(self._call, op, prompt, negative_key=cache_key if op.cached else None)
+        stats = llm_metrics.op(op.name)
+        stats.calls += 1
+        if fallback is None:
+            fallback = op.fallback
+
+        if op.cached and cache_key:
+            hit, stale = await cache_service.lookup(cache_key)
+            if hit:
+                stats.cache_hits += 1
+                persistent_cache.record_hits([cache_key])
+                if stale and not negative_cache.get(cache_key):
+                    # Serve the stale value now; one background call replaces it.
+                    refresh = partial(self._refresh, op, cache_key, upstream, params)
+                    if cache_service.revalidate(cache_key, refresh):
+                        stats.refreshes += 1
+                return hit, True
+            if negative_cache.get(cache_key):
+                # Failed recently: answer with the fallback instead of prompting again.
+                stats.negative_hits += 1
+                stats.fallbacks += 1
+                return fallback, False
+            value, from_cache = await flight_for(op).do(
+                cache_key, lambda: self._durable_or_upstream(op, cache_key, upstream, params, nearby)
+            )
+            if from_cache:
+                persistent_cache.record_hits([cache_key])
+        else:
+            value, _ = await upstream()
+            from_cache = False
+
+        if value is None:
+            stats.fallbacks += 1
+            return fallback, False
+        return value, from_cache
+
+    async def _durable_or_upstream(
+        self,
+        op: LLMOperation,
+        cache_key: str,
+        upstream: Callable[[], Awaitable[Tuple[Optional[Any], bool]]],
+        params: Optional[Dict[str, Any]] = None,
+        nearby: Optional[Callable[[], Awaitable[Tuple[Optional[Any], bool]]]] = None,
+    ) -> Tuple[Any, bool]:
+        """Memory has already missed: try the durable tier (promoting hits), then the LLM."""
+        stored = await persistent_cache.get(cache_key)
+        if stored:
+            llm_metrics.op(op.name).cache_hits += 1
+            await cache_service.set(cache_key, stored)
+            self._remember(cache_key, params)
+            return stored, True
+        value, cacheable = await nearby() if nearby else (None, False)
+        if value is None:
+            value, cacheable = await upstream()
+        if value is not None and cacheable:
+            await self._store(cache_key, value, params)
+        return value, False
+
+    async def _refresh(
+        self,
+        op: LLMOperation,
+        cache_key: str,
+        upstream: Callable[[], Awaitable[Tuple[Optional[Any], bool]]],
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Replace a stale memory entry: reload it from the durable tier, and only re-run the
+        upstream call when no current row exists. The stale value stays until one replaces it.
+        """
+        if await self._reload([cache_key], params):
+            return
+        value, cacheable = await flight_for(op).do(cache_key, upstream)
+        if value is not None and cacheable:
+            await self._store(cache_key, value, params)
+
+    async def _reload(self, keys: List[str], params: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        Refill memory entries from the durable row of `keys[0]` if it was written under the
+        current prompt/model fingerprint. Durable results are kept, not regenerated: a fresh
+        soft deadline costs one indexed lookup instead of a new, different LLM answer.
+        """
+        stored = await persistent_cache.get(keys[0], fingerprint=fingerprint(namespace_of(keys[0])))
+        if not stored:
+            return False
+        await cache_service.set_many({key: stored for key in keys})
+        self._remember(keys[0], params)
+        return True
+
+    async def _call(
+        self,
+        op: LLMOperation,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        parse: Optional[Callable[[Any], Tuple[Optional[Any], bool]]] = None,
+        negative_key: Optional[str] = None,
+    ) -> Tuple[Optional[Any], bool]:
+        """
+        One upstream round trip: POST, token/latency accounting, JSON decode, op parser.
+        Failures are remembered under `negative_key`, if given, for their kind's TTL.
+        """
+        stats = llm_metrics.op(op.name)
+        stats.upstream_calls += 1
+        started = time.monotonic()
+        try:
+            resp = await self._post(
+                op=op.name,
+                payload={
+                    "model": MODEL,
+                    "messages": [
+                        {"role": "system", "content": op.system},
+                        {"role": "user", "content": prompt},
+                    ],
+                    "response_format": {"type": "json_object"},
+                    "max_tokens": max_tokens or op.max_tokens,
+                    "temperature": op.temperature,
+                },
+                timeout=op.timeout,
+            )
+            resp.raise_for_status()
+            body = resp.json()
+            stats.record_usage(body.get("usage"))
+            content = body["choices"][0]["message"]["content"]
+        except Exception as e:
+            stats.errors += 1
+            logger.error("cerebras_call_error", op=op.name, error=str(e))
+            if negative_key:
+                negative_cache.add(negative_key, UPSTREAM_ERROR)
+            return None, False
+        finally:
+            stats.latency_ms.observe((time.monotonic() - started) * 1000)
+
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            stats.parse_failures += 1
+            logger.error("cerebras_json_parse_error", op=op.name, error=str(e), content=content[:200])
+            if negative_key:
+                negative_cache.add(negative_key, PARSE_FAILURE)
+            return None, False
+
+        value, is_valid = (parse or op.parse)(data)
+        if not is_valid:
+            stats.parse_failures += 1
+            if negative_key:
+                negative_cache.add(negative_key, PARSE_FAILURE)
+        return value, is_valid
+
+    async def _store(self, cache_key: str, value: Any, params: Optional[Dict[str, Any]] = None) -> None:
+        await cache_service.set(cache_key, value)
+        await persistent_cache.set(
+            cache_key, value, model=MODEL, fingerprint=fingerprint(namespace_of(cache_key)), params=params
+        )
+        self._remember(cache_key, params)
+
+    @staticmethod
+    def _remember(cache_key: str, params: Optional[Dict[str, Any]]) -> None:
+        """Remember which key holds a line analysis so near-duplicate lines can reuse it."""
+        if settings.LINE_MEMORY_ENABLED and params and namespace_of(cache_key) == "analysis":
+            line_memory.add(params["line"], params["learning_lang"], params["native_lang"], cache_key)
+
     async def analyze_line(
         self,
         line: str,
@@ -62,10 +513,6 @@ class CerebrasService:
         line = (line or "")[:MAX_LINE_LENGTH]
 
         cache_key = make_analysis_key(song_id, line_index, line, native_lang, learning_lang)
-        cached = cache_service.get(cache_key)
-        if cached:
-            return {**cached, "cached": True, "latency_ms": int((time.time() - start) * 1000)}
-
         prompt = f"""Analyze lyric for a language learner.
 Input language: {learning_lang}
 Learner's native language: {native_lang}
@@ -76,40 +523,289 @@ IMPORTANT: Write ALL output (translation, grammar, vocabulary meanings) in {nati
 JSON only:
 {{"translation":"...(in {native_lang})","grammar":"short grammar note in {native_lang}","vocabulary":[{{"word":"...(original word)","meaning":"...(in {native_lang})","part_of_speech":"...(in {native_lang})"}}]}}
 """
+        upstream = None
+        if settings.ANALYZE_MICROBATCH_ENABLED:
+            upstream = partial(self._analyze_line_batched, line, native_lang, learning_lang, cache_key)
+        params = _line_params(line, native_lang, learning_lang, song_id, line_index)
+        nearby = None
+        if settings.LINE_MEMORY_ENABLED:
+            nearby = partial(self._analyze_line_nearby, line, native_lang, learning_lang)
+        result, cached = await self._run(
+            ANALYZE, prompt, cache_key=cache_key, upstream=upstream, params=params, nearby=nearby
+        )
+        return {**result, "cached": cached, "latency_ms": int((time.time() - start) * 1000)}
 
-        fallback = {"translation": "Analysis unavailable", "grammar": "", "vocabulary": []}
+    async def _analyze_line_nearby(
+        self, line: str, native_lang: str, learning_lang: str
+    ) -> Tuple[Optional[dict], bool]:
+        """Reuse or adapt a near-duplicate line's analysis; (None, False) when there is none."""
+        match = await line_memory.lookup(line, learning_lang, native_lang, settings.LINE_MEMORY_ADAPT_SIMILARITY)
+        if match is None:
+            return None, False
+        score, ref_line, ref = match
+        stats = llm_metrics.op(ANALYZE.name)
+        if score >= 1.0:
+            stats.memory_hits += 1
+            return ref, True
+        adapted = (await self._adapt_lines_upstream([(line, ref_line, ref)], native_lang, learning_lang))[0]
+        if adapted is None:
+            return None, False
+        stats.adapted += 1
+        return adapted, True
 
-        try:
-            client = get_http_client()
-            resp = await client.post(
-                CEREBRAS_URL,
-                headers=self._headers(),
-                json={
-                    "model": MODEL,
-                    "messages": [
-                        {"role": "system", "content": "Language tutor. Valid JSON only."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "response_format": {"type": "json_object"},
-                    "max_tokens": 200,
-                    "temperature": 0.3,
-                },
-            )
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
+    async def _analyze_line_batched(
+        self, line: str, native_lang: str, learning_lang: str, cache_key: str
+    ) -> Tuple[Optional[dict], bool]:
+        """Join the current micro-batch for this language pair (one multi-line prompt)."""
+        result = await analysis_batcher.submit((native_lang, learning_lang), line)
+        if result is None:
+            # A batch can't tell a failed call from a missing entry; remember it for the shorter TTL.
+            negative_cache.add(cache_key, UPSTREAM_ERROR)
+        return result, result is not None
 
-            result, is_valid = _parse_json(content)
-            if result is None:
-                return {**fallback, "cached": False, "latency_ms": int((time.time() - start) * 1000)}
+    async def analyze_song(
+        self,
+        song_id: int,
+        lines: List[str],
+        native_lang: str = "en",
+        learning_lang: str = "en",
+    ) -> AsyncIterator[dict]:
+        """
+        Analyze every line of a song, yielding per-line results as they become available.
 
-            if is_valid:
-                cache_service.set(cache_key, result)
+        Repeated lines (choruses) are analyzed once, cache misses are packed several lines
+        per prompt, and every result is written under the same per-line keys /analyze/line uses.
+        With the line memory on, lines that differ only in punctuation, case or fillers count
+        as repeats, and lines close to an analyzed one (from the memory, or earlier in this
+        song) get the shorter adapt prompt instead of a full analysis.
+        """
+        stats = llm_metrics.op(ANALYZE_BATCH.name)
+        use_memory = settings.LINE_MEMORY_ENABLED
+        threshold = settings.LINE_MEMORY_ADAPT_SIMILARITY
+        cleaned = [(raw or "")[:MAX_LINE_LENGTH] for raw in lines]
+        groups: Dict[str, List[int]] = {}
+        texts: Dict[str, str] = {}
+        for idx, line in enumerate(cleaned):
+            norm = canonical_line(line) if use_memory else line.lower().strip()
+            groups.setdefault(norm, []).append(idx)
+            texts.setdefault(norm, line)
+        stats.calls += len(groups)
 
-            return {**result, "cached": False, "latency_ms": int((time.time() - start) * 1000)}
+        def keys_for(norm: str) -> List[str]:
+            # With content-addressed keys every repeat of a line maps to one key.
+            keys = [make_analysis_key(song_id, i, cleaned[i], native_lang, learning_lang) for i in groups[norm]]
+            return list(dict.fromkeys(keys))
 
-        except Exception as e:
-            logger.error("cerebras_analyze_error", error=str(e))
-            return {**fallback, "cached": False, "latency_ms": int((time.time() - start) * 1000)}
+        def params_for(norm: str) -> Dict[str, Any]:
+            return _line_params(texts[norm], native_lang, learning_lang, song_id, groups[norm][0])
+
+        found: Dict[str, dict] = {}
+        # One backend round trip for every key of the song.
+        hits = await cache_service.lookup_many(key for norm in groups for key in keys_for(norm))
+        for norm in groups:
+            for key in keys_for(norm):
+                hit, stale = hits.get(key, (None, False))
+                if hit:
+                    found[norm] = hit
+                    # A line that failed recently keeps its stale value until the failure expires.
+                    if stale and not negative_cache.get(keys_for(norm)[0]):
+                        refresh = partial(self._refresh_line, keys_for(norm), params_for(norm))
+                        if cache_service.revalidate(key, refresh):
+                            stats.refreshes += 1
+                    break
+
+        persistent_cache.record_hits(keys_for(norm)[0] for norm in found)
+        missing = [norm for norm in groups if norm not in found]
+        if missing:
+            first_keys = {keys_for(norm)[0]: norm for norm in missing}
+            stored = await persistent_cache.get_many(list(first_keys))
+            for key, value in stored.items():
+                found[first_keys[key]] = value
+            persistent_cache.record_hits(stored)
+            missing = [norm for norm in missing if norm not in found]
+
+        # Lines that failed recently get the fallback without being prompted again.
+        failed = [norm for norm in missing if negative_cache.get(keys_for(norm)[0])]
+        if failed:
+            stats.negative_hits += len(failed)
+            stats.fallbacks += len(failed)
+            missing = [norm for norm in missing if norm not in failed]
+            for norm in failed:
+                for idx in groups[norm]:
+                    yield {"line_index": idx, **ANALYSIS_FALLBACK, "cached": False}
+
+        stats.cache_hits += len(found)
+        # Fill sibling keys (positional keys) and promote durable-tier hits.
+        await cache_service.set_many(
+            {key: result for norm, result in found.items() for key in keys_for(norm) if key not in hits}
+        )
+        for norm, result in found.items():
+            self._remember(keys_for(norm)[0], params_for(norm))
+            for idx in groups[norm]:
+                yield {"line_index": idx, **result, "cached": True}
+
+        # norm -> (similar line, its analysis) for the adapt prompt
+        references: Dict[str, Tuple[str, dict]] = {}
+        # norm -> earlier missing line of this song to adapt from once it is analyzed
+        deferred: Dict[str, str] = {}
+        if use_memory and missing:
+            for norm in list(missing):
+                match = await line_memory.lookup(texts[norm], learning_lang, native_lang, threshold)
+                if match is None:
+                    continue
+                score, ref_line, ref = match
+                missing.remove(norm)
+                if score < 1.0:
+                    references[norm] = (ref_line, ref)
+                    continue
+                stats.memory_hits += 1
+                for key in keys_for(norm):
+                    await self._store(key, ref, params_for(norm))
+                for idx in groups[norm]:
+                    yield {"line_index": idx, **ref, "cached": True}
+            if threshold < 1.0:
+                grams = {norm: shingles(norm) for norm in missing}
+                leaders: List[str] = []
+                for norm in missing:
+                    scores = [(jaccard(grams[norm], grams[leader]), leader) for leader in leaders]
+                    best = max(scores, default=None)
+                    if best is not None and best[0] >= threshold:
+                        deferred[norm] = best[1]
+                    else:
+                        leaders.append(norm)
+                missing = leaders
+
+        if not missing and not references:
+            return
+
+        size = max(1, settings.ANALYZE_SONG_BATCH_LINES)
+        slots = asyncio.Semaphore(max(1, settings.ANALYZE_SONG_CONCURRENCY))
+
+        def chunked(norms: List[str]) -> List[List[str]]:
+            return [norms[i:i + size] for i in range(0, len(norms), size)]
+
+        async def run(
+            chunk: List[str], refs: Optional[Dict[str, Tuple[str, dict]]] = None
+        ) -> Tuple[List[str], List[Optional[dict]]]:
+            async with slots:
+                if refs:
+                    items = [(texts[n], *refs[n]) for n in chunk]
+                    results = await self._adapt_lines_upstream(items, native_lang, learning_lang)
+                    stats.adapted += sum(r is not None for r in results)
+                    # Lines the adapt prompt missed get a full analysis.
+                    retry = [n for n, r in zip(chunk, results) if r is None]
+                    if retry:
+                        full = await self._analyze_lines_upstream(
+                            [texts[n] for n in retry], native_lang, learning_lang
+                        )
+                        retried = dict(zip(retry, full))
+                        results = [r if r is not None else retried[n] for n, r in zip(chunk, results)]
+                else:
+                    results = await self._analyze_lines_upstream([texts[n] for n in chunk], native_lang, learning_lang)
+            # Store here rather than in the consumer so a disconnected client still warms the cache.
+            for norm, result in zip(chunk, results):
+                if result is not None:
+                    for key in keys_for(norm):
+                        await self._store(key, result, params_for(norm))
+                else:
+                    stats.fallbacks += 1
+                    negative_cache.add(keys_for(norm)[0], UPSTREAM_ERROR)
+            return chunk, results
+
+        analyzed: Dict[str, Optional[dict]] = {}
+        wave = [run(chunk) for chunk in chunked(missing)] + [run(c, references) for c in chunked(list(references))]
+        while wave:
+            for finished in asyncio.as_completed(wave):
+                chunk, results = await finished
+                for norm, result in zip(chunk, results):
+                    analyzed[norm] = result
+                    for idx in groups[norm]:
+                        yield {"line_index": idx, **(result or ANALYSIS_FALLBACK), "cached": False}
+            # Deferred lines are adapted from their now analyzed lead (fully analyzed if it failed).
+            refs = {n: (texts[lead], analyzed[lead]) for n, lead in deferred.items() if analyzed.get(lead)}
+            rest = [n for n in deferred if n not in refs]
+            wave = [run(chunk, refs) for chunk in chunked(list(refs))] + [run(c) for c in chunked(rest)]
+            deferred = {}
+
+    async def _refresh_line(self, keys: List[str], params: Dict[str, Any]) -> None:
+        """
+        Background refresh of one stale song line: from the durable tier when it holds a current
+        row, otherwise through the LLM (concurrent refreshes share micro-batches).
+        """
+        if await self._reload(keys, params):
+            return
+        result, cacheable = await self._analyze_line_batched(
+            params["line"], params["native_lang"], params["learning_lang"], keys[0]
+        )
+        if result is not None and cacheable:
+            for key in keys:
+                await self._store(key, result, params)
+
+    async def _analyze_lines_upstream(
+        self, lines: List[str], native_lang: str, learning_lang: str
+    ) -> List[Optional[dict]]:
+        """One prompt for several lines. Missing or invalid entries come back as None."""
+        numbered = "\n".join(f"{i}. {json.dumps(line, ensure_ascii=False)}" for i, line in enumerate(lines))
+        prompt = f"""Analyze each numbered lyric line for a language learner.
+Input language: {learning_lang}
+Learner's native language: {native_lang}
+Lines:
+{numbered}
+
+IMPORTANT: Write ALL output (translation, grammar, vocabulary meanings) in {native_lang}.
+Return exactly one result per line, with the line number as "i".
+
+JSON only:
+{{"results":[{{"i":0,"translation":"...(in {native_lang})","grammar":"short grammar note in {native_lang}","vocabulary":[{{"word":"...(original word)","meaning":"...(in {native_lang})","part_of_speech":"...(in {native_lang})"}}]}}]}}
+"""
+        results, _ = await self._call(
+            ANALYZE_BATCH,
+            prompt,
+            max_tokens=ANALYZE_BATCH.max_tokens * len(lines),
+            parse=partial(_parse_analysis_batch, count=len(lines)),
+        )
+        return results if results is not None else [None] * len(lines)
+
+    async def _adapt_lines_upstream(
+        self, items: List[Tuple[str, str, dict]], native_lang: str, learning_lang: str
+    ) -> List[Optional[dict]]:
+        """
+        One prompt adapting (line, similar line, similar line's analysis) items. The model
+        translates each line and explains only its new words; vocabulary of the similar line
+        that still occurs is carried over. Missing or invalid entries come back as None.
+        """
+        numbered = "\n".join(
+            f"{i}. " + json.dumps(
+                {"line": line, "similar": ref_line, "similar_translation": ref.get("translation", "")},
+                ensure_ascii=False,
+            )
+            for i, (line, ref_line, ref) in enumerate(items)
+        )
+        prompt = f"""Each numbered lyric line is close to a line already analyzed for a language learner.
+Input language: {learning_lang}
+Learner's native language: {native_lang}
+Lines:
+{numbered}
+
+Translate each "line" in full (use "similar_translation" as a guide). In vocabulary, list only words of "line" that are not in "similar".
+IMPORTANT: Write ALL output (translation, grammar, vocabulary meanings) in {native_lang}.
+Return exactly one result per line, with the line number as "i".
+
+JSON only:
+{{"results":[{{"i":0,"translation":"...(in {native_lang})","grammar":"short grammar note in {native_lang}, or empty","vocabulary":[{{"word":"...(original word)","meaning":"...(in {native_lang})","part_of_speech":"...(in {native_lang})"}}]}}]}}
+"""
+        results, _ = await self._call(
+            ANALYZE_ADAPT,
+            prompt,
+            max_tokens=ANALYZE_ADAPT.max_tokens * len(items),
+            parse=partial(_parse_analysis_batch, count=len(items)),
+        )
+        if results is None:
+            return [None] * len(items)
+        return [
+            _merge_adapted(line, ref, result) if result is not None else None
+            for (line, _, ref), result in zip(items, results)
+        ]
 
     async def check_translation(
         self,
@@ -118,6 +814,15 @@ JSON only:
         native_lang: str = "en",
         learning_lang: str = "en",
     ) -> dict:
+        if not self.api_key:
+            # Graceful fallback (so frontend doesn't crash)
+            return {
+                "is_correct": False,
+                "score": 0.0,
+                "correct_translation": "",
+                "feedback": "Check unavailable (AI not configured)",
+            }
+
         prompt = f"""Evaluate:
 Original ({learning_lang}): "{(original or '')[:300]}"
 User ({native_lang}): "{(user_translation or '')[:300]}"
@@ -125,40 +830,9 @@ User ({native_lang}): "{(user_translation or '')[:300]}"
 JSON only:
 {{"is_correct": true, "score": 0.0, "correct_translation": "...", "feedback": "..."}}
 """
-
-        try:
-            if not self.api_key:
-                # Graceful fallback (so frontend doesn't crash)
-                return {
-                    "is_correct": False,
-                    "score": 0.0,
-                    "correct_translation": "",
-                    "feedback": "Check unavailable (AI not configured)",
-                }
-            client = get_http_client()
-            resp = await client.post(
-                CEREBRAS_URL,
-                headers=self._headers(),
-                json={
-                    "model": MODEL,
-                    "messages": [
-                        {"role": "system", "content": "Fair language teacher. Valid JSON only."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "response_format": {"type": "json_object"},
-                    "max_tokens": 300,
-                    "temperature": 0.3,
-                },
-            )
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                return {"is_correct": False, "score": 0.0, "correct_translation": "", "feedback": "Check unavailable"}
-        except Exception as e:
-            logger.error("cerebras_check_error", error=str(e))
-            return {"is_correct": False, "score": 0.0, "correct_translation": "", "feedback": "Check unavailable"}
+        cache_key = make_check_key(original or "", user_translation or "", native_lang, learning_lang)
+        result, _ = await self._run(CHECK_TRANSLATION, prompt, cache_key=cache_key)
+        return result
 
     async def describe_iconic_song(self, title: str, artist: str, target_lang: str = "en") -> str:
         """
@@ -174,30 +848,8 @@ Write in language: {target_lang}
 JSON only:
 {{"reason":"..."}}
 """
-        try:
-            client = get_http_client()
-            resp = await client.post(
-                CEREBRAS_URL,
-                headers=self._headers(),
-                json={
-                    "model": MODEL,
-                    "messages": [
-                        {"role": "system", "content": "Music critic. Valid JSON only."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "response_format": {"type": "json_object"},
-                    "max_tokens": 180,
-                    "temperature": 0.4,
-                },
-            )
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            data = json.loads(content)
-            reason = str(data.get("reason", "")).strip()
-            return reason[:400]
-        except Exception as e:
-            logger.error("cerebras_iconic_error", error=str(e))
-            return ""
+        reason, _ = await self._run(DESCRIBE_ICONIC, prompt)
+        return reason
 
     async def interlinear_line(
         self,
@@ -215,11 +867,11 @@ JSON only:
         line = (line or "")[:MAX_LINE_LENGTH]
 
         cache_key = make_interlinear_key(song_id, line_index, line, native_lang, learning_lang)
-        cached = cache_service.get(cache_key)
-        if cached:
-            return {**cached, "cached": True, "latency_ms": int((time.time() - start) * 1000)}
 
         if not self.api_key:
+            cached = await cache_service.get(cache_key)
+            if cached:
+                return {**cached, "cached": True, "latency_ms": int((time.time() - start) * 1000)}
             # No AI configured; best-effort fallback: split words without translation.
             tokens = [{"orig": t, "trans": ""} for t in line.split()]
             return {"tokens": tokens, "cached": False, "latency_ms": int((time.time() - start) * 1000)}
@@ -238,36 +890,9 @@ JSON only:
 {{"tokens":[{{"orig":"...","trans":"..."}}, ...]}}
 """
         fallback = {"tokens": [{"orig": line, "trans": ""}]}
-
-        try:
-            client = get_http_client()
-            resp = await client.post(
-                CEREBRAS_URL,
-                headers=self._headers(),
-                json={
-                    "model": MODEL,
-                    "messages": [
-                        {"role": "system", "content": "Translator. Valid JSON only."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "response_format": {"type": "json_object"},
-                    "max_tokens": 260,
-                    "temperature": 0.2,
-                },
-            )
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            data = json.loads(content)
-            tokens = data.get("tokens") or []
-            if not isinstance(tokens, list) or not tokens:
-                return {**fallback, "cached": False, "latency_ms": int((time.time() - start) * 1000)}
-
-            out = {"tokens": tokens}
-            cache_service.set(cache_key, out)
-            return {**out, "cached": False, "latency_ms": int((time.time() - start) * 1000)}
-        except Exception as e:
-            logger.error("cerebras_interlinear_error", error=str(e))
-            return {**fallback, "cached": False, "latency_ms": int((time.time() - start) * 1000)}
+        params = _line_params(line, native_lang, learning_lang, song_id, line_index)
+        result, cached = await self._run(INTERLINEAR, prompt, cache_key=cache_key, fallback=fallback, params=params)
+        return {**result, "cached": cached, "latency_ms": int((time.time() - start) * 1000)}
 
     async def translate_word(self, word: str, source_lang: str, target_lang: str) -> str:
         """
@@ -283,29 +908,37 @@ Text: "{w}"
 JSON only:
 {{"translation":"..."}}
 """
-        try:
-            client = get_http_client()
-            resp = await client.post(
-                CEREBRAS_URL,
-                headers=self._headers(),
-                json={
-                    "model": MODEL,
-                    "messages": [
-                        {"role": "system", "content": "Translator. Valid JSON only."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "response_format": {"type": "json_object"},
-                    "max_tokens": 60,
-                    "temperature": 0.2,
-                },
-            )
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            data = json.loads(content)
-            return str(data.get("translation", "")).strip()[:200]
-        except Exception as e:
-            logger.error("cerebras_translate_word_error", error=str(e))
-            return ""
+        translation, _ = await self._run(TRANSLATE_WORD, prompt)
+        return translation
+
+    async def translate_words(self, words: List[str], source_lang: str, target_lang: str) -> List[str]:
+        """
+        Translate several words/short phrases in one prompt.
+        Returns translations aligned with `words` ("" where missing or on failure).
+        """
+        if not self.api_key or not words:
+            return [""] * len(words)
+        numbered = "\n".join(f"{i}. {json.dumps((w or '')[:120], ensure_ascii=False)}" for i, w in enumerate(words))
+        prompt = f"""Translate each numbered word or phrase from {source_lang} to {target_lang}.
+{numbered}
+
+Return exactly one translation per item, with the item number as "i".
+
+JSON only:
+{{"translations":[{{"i":0,"translation":"..."}}]}}
+"""
+        stats = llm_metrics.op(TRANSLATE_WORDS.name)
+        stats.calls += len(words)
+        translations, _ = await self._call(
+            TRANSLATE_WORDS,
+            prompt,
+            max_tokens=TRANSLATE_WORDS.max_tokens * len(words) + 20,
+            parse=partial(_parse_word_batch, count=len(words)),
+        )
+        if translations is None:
+            translations = [""] * len(words)
+        stats.fallbacks += sum(1 for t in translations if not t)
+        return translations
 
     async def generate_song_story(
         self,
@@ -319,51 +952,106 @@ JSON only:
         - Historical/life context of the author
         - How these lyrics ended up with the current band/artist
 
-        Returns the story text in target_lang.
+        Returns the story text in target_lang. Not cached here; see song_story_service.
         """
         if not self.api_key:
             return ""
 
-        title = (title or "")[:150]
-        artist = (artist or "")[:150]
-
-        prompt = f"""Tell the story behind this song in {target_lang}.
-Song: "{title}" by {artist}
-
-Include:
-1. Who wrote the lyrics (original author if different from performer)
-2. What period of their life they wrote it and what inspired it
-3. How the song ended up with the current artist/band
-
-Keep it engaging, 3-5 paragraphs. If you're not certain about facts, note that.
-
+        prompt = _song_story_prompt(title, artist, target_lang) + """
 JSON only:
-{{"story":"..."}}
+{"story":"..."}
 """
+        story, _ = await self._run(SONG_STORY, prompt)
+        return story
+
+    async def stream_song_story(self, title: str, artist: str, target_lang: str = "en") -> AsyncIterator[str]:
+        """
+        Yield the song story as text chunks while Cerebras generates it (`stream: true`).
+        Yields nothing when AI is not configured. Upstream errors are logged and re-raised,
+        possibly after some chunks, so callers can tell a complete story from a cut-off one.
+        """
+        if not self.api_key:
+            return
+
+        stats = llm_metrics.op(SONG_STORY_STREAM.name)
+        stats.calls += 1
+        stats.upstream_calls += 1
+        size = 0
+        started = time.monotonic()
         try:
-            client = get_http_client()
-            resp = await client.post(
+            async with cerebras_upstream.stream(
+                "POST",
                 CEREBRAS_URL,
+                op=SONG_STORY_STREAM.name,
                 headers=self._headers(),
                 json={
                     "model": MODEL,
                     "messages": [
-                        {"role": "system", "content": "Music historian and storyteller. Valid JSON only."},
-                        {"role": "user", "content": prompt},
+                        {"role": "system", "content": SONG_STORY_STREAM.system},
+                        {"role": "user", "content": _song_story_prompt(title, artist, target_lang)},
                     ],
-                    "response_format": {"type": "json_object"},
-                    "max_tokens": 800,
-                    "temperature": 0.5,
+                    "max_tokens": SONG_STORY_STREAM.max_tokens,
+                    "temperature": SONG_STORY_STREAM.temperature,
+                    "stream": True,
                 },
-            )
-            resp.raise_for_status()
-            content = resp.json()["choices"][0]["message"]["content"]
-            data = json.loads(content)
-            story = str(data.get("story", "")).strip()
-            return story[:3000]
+            ) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    stats.record_usage(chunk.get("usage"))
+                    choices = chunk.get("choices") or [{}]
+                    text = (choices[0].get("delta") or {}).get("content") or ""
+                    text = text[:MAX_STORY_LENGTH - size]
+                    if text:
+                        size += len(text)
+                        yield text
         except Exception as e:
-            logger.error("cerebras_song_story_error", error=str(e))
-            return ""
+            stats.errors += 1
+            logger.error("cerebras_call_error", op=SONG_STORY_STREAM.name, error=str(e))
+            raise
+        finally:
+            stats.latency_ms.observe((time.monotonic() - started) * 1000)
+        if not size:
+            stats.fallbacks += 1
+
+
+# Bump when the story prompt changes; stored stories are keyed by it.
+STORY_PROMPT_VERSION = "v1"
+
+
+def _song_story_prompt(title: str, artist: str, target_lang: str) -> str:
+    title = (title or "")[:150]
+    artist = (artist or "")[:150]
+    return f"""Tell the story behind this song in {target_lang}.
+Song: "{title}" by {artist}
+
+Include:
+1. Who wrote the lyrics (original author if different from performer)
+2. What period of their life they wrote it and what inspired it
+3. How the song ended up with the current artist/band
+
+Keep it engaging, 3-5 paragraphs. If you're not certain about facts, note that.
+"""
 
 
 cerebras_service = CerebrasService()
+
+
+async def _analyze_batch(group: Tuple[str, str], lines: List[str]) -> List[Optional[dict]]:
+    native_lang, learning_lang = group
+    return await cerebras_service._analyze_lines_upstream(lines, native_lang, learning_lang)
+
+
+# Opt-in (ANALYZE_MICROBATCH_ENABLED): concurrent /analyze/line misses for the same language
+# pair share one multi-line prompt, trading up to one window of latency for throughput.
+analysis_batcher = MicroBatcher(
+    "analysis",
+    _analyze_batch,
+    window=settings.ANALYZE_MICROBATCH_WINDOW_MS / 1000,
+    max_items=settings.ANALYZE_MICROBATCH_MAX_LINES,
+)
@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import structlog
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.iconic_seed import IconicSeed
+from app.models.song import Song
+from app.services.iconic_songs import ICONIC_SONGS, IconicSong, find_iconic_song
+from app.services.lrclib import lrclib_service
+from app.services.negative_cache import NOT_FOUND
+
+logger = structlog.get_logger()
+
+
+async def upsert_lrclib_song(db: AsyncSession, data: dict, title: str, artist: str) -> Tuple[Song, bool]:
+    """
+    Find or create the song for an LRCLIB result, matching on (lower(title), lower(artist)).
+    Returns (song, created).
+    """
+    title = data.get("trackName") or title
+    artist = data.get("artistName") or artist
+
+    async def existing() -> Optional[Song]:
+        result = await db.execute(
+            select(Song).where(func.lower(Song.title) == title.lower(), func.lower(Song.artist) == artist.lower())
+        )
+        return result.scalar_one_or_none()
+
+    song = await existing()
+    if song:
+        return song, False
+    song = Song(
+        title=title,
+        artist=artist,
+        album=data.get("albumName"),
+        lyrics=data.get("plainLyrics"),
+        synced_lyrics=data.get("syncedLyrics"),
+        duration=data.get("duration"),
+        lrclib_id=data.get("id"),
+    )
+    db.add(song)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Imported concurrently (another request or the seeding job).
+        await db.rollback()
+        song = await existing()
+        if song is None:
+            raise
+        return song, False
+    await db.refresh(song)
+    return song, True
+
+
+class IconicPool:
+    """
+    Catalog songs already imported into `songs`, per learning language (iconic_seeds).
+    Discover picks from the pool with one query on the seeds primary key; LRCLIB is only
+    consulted for catalog entries that have never been checked. An entry is recorded as
+    checked-but-missing only when LRCLIB answered 404, never after a transient failure.
+    """
+
+    async def pick(
+        self, db: AsyncSession, lang: str, entries: Optional[List[IconicSong]] = None
+    ) -> Optional[Tuple[Song, IconicSong]]:
+        """
+        Uniformly random resolved song for `lang` among `entries` (default: the whole current
+        catalog), or None if none of them is seeded. Seeds of entries removed from the catalog
+        since they were recorded are filtered out in the query.
+        """
+        entries = ICONIC_SONGS.get(lang, []) if entries is None else entries
+        if not entries:
+            return None
+        result = await db.execute(
+            select(Song, IconicSeed.title, IconicSeed.artist)
+            .join(IconicSeed, IconicSeed.song_id == Song.id)
+            .where(
+                IconicSeed.learning_lang == lang,
+                tuple_(IconicSeed.title, IconicSeed.artist).in_([(e.title, e.artist) for e in entries]),
+            )
+            .order_by(func.random())
+            .limit(1)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        song, title, artist = row
+        return song, find_iconic_song(lang, title, artist)
+
+    async def seeds(self, db: AsyncSession, lang: str) -> Dict[Tuple[str, str], Optional[int]]:
+        """(title, artist) -> song_id of every catalog entry already looked up for `lang` (None = not on LRCLIB)."""
+        result = await db.execute(
+            select(IconicSeed.title, IconicSeed.artist, IconicSeed.song_id).where(IconicSeed.learning_lang == lang)
+        )
+        return {(title, artist): song_id for title, artist, song_id in result.all()}
+
+    async def record(self, db: AsyncSession, lang: str, entry: IconicSong, song_id: Optional[int]) -> None:
+        stmt = insert(IconicSeed).values(
+            learning_lang=lang,
+            title=entry.title,
+            artist=entry.artist,
+            song_id=song_id,
+            checked_at=datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[IconicSeed.learning_lang, IconicSeed.title, IconicSeed.artist],
+            set_={"song_id": stmt.excluded.song_id, "checked_at": stmt.excluded.checked_at},
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    async def seed(self, langs: Optional[Iterable[str]] = None) -> Tuple[int, int]:
+        """
+        Import every catalog entry not yet resolved (unresolved ones are retried).
+        Returns (resolved, unresolved) counts for the entries processed; only entries LRCLIB
+        answered 404 for are recorded as unresolved.
+        """
+        langs = list(langs or ICONIC_SONGS)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(IconicSeed.learning_lang, IconicSeed.title, IconicSeed.artist).where(
+                    IconicSeed.song_id.isnot(None)
+                )
+            )
+            done = {tuple(row) for row in result.all()}
+        todo = [
+            (lang, entry)
+            for lang in langs
+            for entry in ICONIC_SONGS.get(lang, [])
+            if (lang, entry.title, entry.artist) not in done
+        ]
+        slots = asyncio.Semaphore(max(1, settings.ICONIC_SEED_CONCURRENCY))
+
+        async def seed_one(lang: str, entry: IconicSong) -> bool:
+            async with slots:
+                data, failure = await lrclib_service.lookup_lyrics(track_name=entry.title, artist_name=entry.artist)
+                if not data and failure != NOT_FOUND:
+                    return False  # transient: retried by the next run, not recorded
+                async with AsyncSessionLocal() as db:
+                    song_id = None
+                    if data:
+                        song, _ = await upsert_lrclib_song(db, data, entry.title, entry.artist)
+                        song_id = song.id
+                    await self.record(db, lang, entry, song_id)
+                return song_id is not None
+
+        results = await asyncio.gather(*(seed_one(lang, entry) for lang, entry in todo), return_exceptions=True)
+        for r in results:
+            if isinstance(r, Exception):
+                logger.warning("iconic_seed_failed", error=str(r))
+        resolved = sum(1 for r in results if r is True)
+        unresolved = len(results) - resolved
+        logger.info("iconic_seed_done", processed=len(todo), resolved=resolved, unresolved=unresolved)
+        return resolved, unresolved
+
+
+iconic_pool = IconicPool()
+
+
+async def seed_iconic_songs() -> None:
+    """Startup hook / CLI entry point."""
+    await iconic_pool.seed()
+
+
+if __name__ == "__main__":
+    # python -m app.services.iconic_pool
+    from app.services.http_client import init_http_client, close_http_client
+
+    async def _main() -> None:
+        await init_http_client()
+        try:
+            await seed_iconic_songs()
+        finally:
+            await close_http_client()
+
+    asyncio.run(_main())
@@ -0,0 +1,170 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Set, Tuple
+import structlog
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.iconic_reason import IconicReason
+from app.services.cerebras import MODEL, cerebras_service
+from app.services.iconic_songs import ICONIC_SONGS, IconicSong
+
+logger = structlog.get_logger()
+
+ReasonKey = Tuple[str, str, str]  # (title, artist, native_lang)
+
+# The catalog languages are also the app's native languages.
+REASON_LANGS = tuple(ICONIC_SONGS)
+
+
+def _catalog() -> Iterable[IconicSong]:
+    seen: Set[Tuple[str, str]] = set()
+    for songs in ICONIC_SONGS.values():
+        for song in songs:
+            if (song.title, song.artist) not in seen:
+                seen.add((song.title, song.artist))
+                yield song
+
+
+class IconicReasonStore:
+    """
+    (title, artist, native_lang) -> reason for the curated catalog: a fixed set of about
+    1000 answers, filled by the precompute job or lazily in the background on first use.
+
+    The whole table is loaded into memory on first lookup; requests never wait on the LLM.
+    Database errors are logged and treated as misses.
+    """
+
+    def __init__(self):
+        self._reasons: Dict[ReasonKey, str] = {}
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._pending: Set[ReasonKey] = set()
+        # Strong references so fire-and-forget tasks are not garbage collected mid-flight.
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                async with AsyncSessionLocal() as db:
+                    result = await db.execute(
+                        select(IconicReason.title, IconicReason.artist, IconicReason.native_lang, IconicReason.reason)
+                    )
+                    for title, artist, lang, reason in result.all():
+                        self._reasons[(title, artist, lang)] = reason
+                self._loaded = True
+                logger.info("iconic_reasons_loaded", count=len(self._reasons))
+            except Exception as e:
+                logger.warning("iconic_reasons_load_failed", error=str(e))
+
+    async def get(self, song: IconicSong, native_lang: str) -> Tuple[str, str]:
+        """
+        Return (reason, source): the stored reason ("cerebras"), or the curated
+        fallback_reason ("static") while a background fill is scheduled. Only languages in
+        REASON_LANGS are ever filled; any other `native_lang` always gets the fallback.
+        """
+        await self._ensure_loaded()
+        key = (song.title, song.artist, native_lang)
+        reason = self._reasons.get(key)
+        if reason:
+            return reason, "cerebras"
+        self._schedule_fill(song, native_lang)
+        return song.fallback_reason, "static"
+
+    def _schedule_fill(self, song: IconicSong, native_lang: str) -> None:
+        key = (song.title, song.artist, native_lang)
+        if not settings.ICONIC_REASONS_LAZY_FILL or not settings.CEREBRAS_API_KEY or key in self._pending:
+            return
+        if native_lang not in REASON_LANGS:
+            # Unbounded input (a query parameter): never one LLM call and one row per made-up value.
+            return
+        self._pending.add(key)
+        task = asyncio.create_task(self._fill(song, native_lang))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        task.add_done_callback(lambda _: self._pending.discard(key))
+
+    async def _fill(self, song: IconicSong, native_lang: str) -> bool:
+        """Generate and store one reason (another worker may already have stored it)."""
+        key = (song.title, song.artist, native_lang)
+        try:
+            async with AsyncSessionLocal() as db:
+                existing = await db.execute(
+                    select(IconicReason.reason).where(
+                        IconicReason.title == song.title,
+                        IconicReason.artist == song.artist,
+                        IconicReason.native_lang == native_lang,
+                    )
+                )
+                reason = existing.scalar_one_or_none()
+            if reason:
+                self._reasons[key] = reason
+                return False
+
+            # No connection is held while the LLM call runs.
+            reason = await cerebras_service.describe_iconic_song(song.title, song.artist, target_lang=native_lang)
+            if not reason:
+                return False
+            async with AsyncSessionLocal() as db:
+                stmt = insert(IconicReason).values(
+                    title=song.title, artist=song.artist, native_lang=native_lang, reason=reason, model=MODEL
+                )
+                await db.execute(stmt.on_conflict_do_nothing())
+                await db.commit()
+        except Exception as e:
+            logger.warning("iconic_reason_fill_failed", title=song.title, lang=native_lang, error=str(e))
+            return False
+        self._reasons[key] = reason
+        return True
+
+    async def precompute(self, langs: Iterable[str] = REASON_LANGS) -> int:
+        """Fill every missing (catalog song, language) pair. Returns the number of reasons generated."""
+        await self._ensure_loaded()
+        missing = [
+            (song, lang)
+            for song in _catalog()
+            for lang in langs
+            if (song.title, song.artist, lang) not in self._reasons
+        ]
+        slots = asyncio.Semaphore(max(1, settings.ICONIC_REASONS_CONCURRENCY))
+
+        async def fill(song: IconicSong, lang: str) -> bool:
+            async with slots:
+                return await self._fill(song, lang)
+
+        results = await asyncio.gather(*(fill(song, lang) for song, lang in missing))
+        generated = sum(results)
+        logger.info("iconic_reasons_precomputed", missing=len(missing), generated=generated)
+        return generated
+
+
+iconic_reason_store = IconicReasonStore()
+
+
+async def precompute_iconic_reasons() -> None:
+    """Startup hook / CLI entry point; no-op unless AI is configured."""
+    if not settings.CEREBRAS_API_KEY:
+        logger.info("iconic_reasons_precompute_skipped")
+        return
+    await iconic_reason_store.precompute()
+
+
+if __name__ == "__main__":
+    # python -m app.services.iconic_reasons
+    from app.services.http_client import init_http_client, close_http_client
+
+    async def _main() -> None:
+        await init_http_client()
+        try:
+            await precompute_iconic_reasons()
+        finally:
+            await close_http_client()
+
+    asyncio.run(_main())
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 @dataclass(frozen=True)
@@ -143,3 +143,10 @@ def pick_iconic_song(lang: str) -> IconicSong:
     key = (lang or "en").lower()
     songs = ICONIC_SONGS.get(key) or ICONIC_SONGS["en"]
     return random.choice(songs)
+
+
+def find_iconic_song(lang: str, title: str, artist: str) -> Optional[IconicSong]:
+    for song in ICONIC_SONGS.get(lang, []):
+        if song.title == title and song.artist == artist:
+            return song
+    return None
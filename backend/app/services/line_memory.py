@@ -0,0 +1,249 @@
+import random
+import re
+import unicodedata
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+import structlog
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.llm_cache import LLMCacheEntry
+from app.services.cache_service import cache_service, fingerprint
+from app.services.persistent_cache import persistent_cache
+
+logger = structlog.get_logger()
+
+Pair = Tuple[str, str]  # (learning_lang, native_lang)
+# (similarity, reference line, cache key of the reference analysis)
+Match = Tuple[float, str, str]
+
+# Interjections that pad sung lines without changing their meaning.
+FILLERS = frozenset(
+    {"oh", "ohh", "ooh", "oooh", "ah", "ahh", "yeah", "yeh", "hey", "uh", "woah", "whoa", "mm", "mmm", "hmm"}
+)
+
+_MERSENNE = (1 << 61) - 1
+_SPACE = re.compile(r"\s+")
+
+
+def canonical_line(line: str) -> str:
+    """Casefolded words without punctuation or fillers: lines equal here share one analysis."""
+    text = "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in (line or "").casefold())
+    words = _SPACE.split(text.strip())
+    kept = [w for w in words if w not in FILLERS]
+    return " ".join(kept or words)
+
+
+def shingles(canonical: str) -> FrozenSet[str]:
+    """Character trigrams of a canonical line (padded so short words count too)."""
+    padded = f" {canonical} "
+    if len(padded) < 3:
+        return frozenset({padded})
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures over trigram sets, cut into LSH bands of `rows` values each."""
+
+    def __init__(self, bands: int = 16, rows: int = 2, seed: int = 1):
+        rng = random.Random(seed)
+        self.bands, self.rows = bands, rows
+        self._coefficients = [
+            (rng.randrange(1, _MERSENNE), rng.randrange(0, _MERSENNE)) for _ in range(bands * rows)
+        ]
+
+    def band_keys(self, grams: FrozenSet[str]) -> List[Tuple[int, Tuple[int, ...]]]:
+        values = [zlib.crc32(g.encode()) for g in grams]
+        signature = [min((a * v + b) % _MERSENNE for v in values) for a, b in self._coefficients]
+        return [
+            (band, tuple(signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)
+        ]
+
+
+class LineMemory:
+    """
+    Translation memory of analyzed lyric lines per language pair, for near-duplicates the
+    exact cache keys miss: the same line with other punctuation, case or fillers, or with a
+    word changed in a repeated verse.
+
+    `match` returns the most similar remembered line (trigram Jaccard similarity, candidates
+    found through MinHash LSH) and the cache key its analysis is stored under; `lookup` also
+    reads that analysis back from cache_service or the durable tier. A similarity of 1.0 means
+    the canonical forms are equal and the analysis can be reused as is; lower scores are for
+    the caller to adapt.
+
+    Only the line, its cache key and its LSH bucket hashes are kept (about 2 KB per entry
+    with the bucket index), never the analyses themselves. Entries are kept per process in
+    LRU order, up to `maxsize`.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hasher = MinHasher()
+        # (pair, canonical) -> (line, analysis cache key, bucket hashes), in LRU order
+        self._entries: "OrderedDict[Tuple[Pair, str], Tuple[str, str, array]]" = OrderedDict()
+        # bucket hash -> canonical line, or a set of them once several share the bucket
+        self._buckets: Dict[int, Union[str, Set[str]]] = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _bucket_hashes(self, pair: Pair, grams: FrozenSet[str]) -> array:
+        return array("q", (hash((pair, band)) for band in self.hasher.band_keys(grams)))
+
+    def add(self, line: str, learning_lang: str, native_lang: str, cache_key: str) -> None:
+        canonical = canonical_line(line)
+        if not canonical or self.maxsize <= 0:
+            return
+        pair = (learning_lang, native_lang)
+        key = (pair, canonical)
+        if key in self._entries:
+            line_, _, buckets = self._entries[key]
+            self._entries[key] = (line_, cache_key, buckets)
+            self._entries.move_to_end(key)
+            return
+        buckets = self._bucket_hashes(pair, shingles(canonical))
+        self._entries[key] = (line, cache_key, buckets)
+        for bucket in buckets:
+            members = self._buckets.get(bucket)
+            if members is None:
+                self._buckets[bucket] = canonical
+            elif isinstance(members, str):
+                self._buckets[bucket] = {members, canonical}
+            else:
+                members.add(canonical)
+        while len(self._entries) > self.maxsize:
+            self._evict()
+
+    def _evict(self) -> None:
+        self._discard(*self._entries.popitem(last=False))
+
+    def _discard(self, key: Tuple[Pair, str], entry: Tuple[str, str, array]) -> None:
+        canonical = key[1]
+        for bucket in entry[2]:
+            members = self._buckets.get(bucket)
+            if members == canonical:
+                del self._buckets[bucket]
+            elif isinstance(members, set):
+                members.discard(canonical)
+                if len(members) == 1:
+                    self._buckets[bucket] = members.pop()
+
+    def forget(self, line: str, learning_lang: str, native_lang: str) -> None:
+        """Drop a remembered line (its analysis is no longer stored anywhere)."""
+        key = ((learning_lang, native_lang), canonical_line(line))
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._discard(key, entry)
+
+    def match(self, line: str, learning_lang: str, native_lang: str, threshold: float) -> Optional[Match]:
+        """Best remembered line with similarity >= threshold as (score, line, cache key), or None."""
+        canonical = canonical_line(line)
+        if not canonical or not self._entries:
+            self.misses += 1
+            return None
+        pair = (learning_lang, native_lang)
+        entry = self._entries.get((pair, canonical))
+        if entry is not None:
+            self._entries.move_to_end((pair, canonical))
+            self.exact_hits += 1
+            return 1.0, entry[0], entry[1]
+        if threshold >= 1.0:
+            self.misses += 1
+            return None
+        grams = shingles(canonical)
+        candidates: Set[str] = set()
+        for bucket in self._bucket_hashes(pair, grams):
+            members = self._buckets.get(bucket)
+            if isinstance(members, str):
+                candidates.add(members)
+            elif members:
+                candidates |= members
+        best: Optional[Tuple[float, str]] = None
+        for candidate in candidates:
+            if (pair, candidate) not in self._entries:
+                continue  # another language pair hashed into the same bucket
+            score = jaccard(grams, shingles(candidate))
+            if score >= threshold and (best is None or score > best[0]):
+                best = (score, candidate)
+        if best is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((pair, best[1]))
+        self.similar_hits += 1
+        ref_line, cache_key, _ = self._entries[(pair, best[1])]
+        return best[0], ref_line, cache_key
+
+    async def lookup(
+        self, line: str, learning_lang: str, native_lang: str, threshold: float
+    ) -> Optional[Tuple[float, str, Dict[str, Any]]]:
+        """Like `match`, with the remembered line's analysis read back: (score, line, analysis)."""
+        match = self.match(line, learning_lang, native_lang, threshold)
+        if match is None:
+            return None
+        score, ref_line, cache_key = match
+        analysis = await cache_service.get(cache_key) or await persistent_cache.get(cache_key)
+        if not analysis:
+            # Evicted from every tier: the memory can't serve it any more.
+            self.forget(ref_line, learning_lang, native_lang)
+            return None
+        return score, ref_line, analysis
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+        }
+
+    def add_many(self, rows: Iterable[Tuple[str, Dict[str, Any]]]) -> int:
+        """Remember (cache key, params) pairs as stored in llm_cache. Returns the number added."""
+        added = 0
+        for cache_key, params in rows:
+            try:
+                self.add(params["line"], params["learning_lang"], params["native_lang"], cache_key)
+                added += 1
+            except (KeyError, TypeError):
+                continue
+        return added
+
+    async def seed(self) -> int:
+        """Load the hottest current-fingerprint analyses from llm_cache (up to maxsize)."""
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(LLMCacheEntry.key, LLMCacheEntry.params)
+                    .where(
+                        LLMCacheEntry.key.like("analysis:%"),
+                        LLMCacheEntry.fingerprint == fingerprint("analysis"),
+                        LLMCacheEntry.params.isnot(None),
+                    )
+                    .order_by(LLMCacheEntry.hit_count.desc())
+                    .limit(self.maxsize)
+                )
+                rows = result.all()
+        except Exception as e:
+            logger.warning("line_memory_seed_failed", error=str(e))
+            return 0
+        # Coldest first so the hottest lines end up most recently used.
+        added = self.add_many(reversed(rows))
+        logger.info("line_memory_seeded", lines=added)
+        return added
+
+
+line_memory = LineMemory(settings.LINE_MEMORY_SIZE)
@@ -0,0 +1,99 @@
+from bisect import bisect_left
+from typing import Any, Dict, List
+
+# Upper bounds (ms) of latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS: List[int] = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+
+
+class Histogram:
+    def __init__(self, buckets: List[int] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{b}" for b in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 1) if self.count else None,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class OperationStats:
+    """
+    Counters for one LLM operation.
+
+    calls: requests served (cache hits included); upstream_calls: prompts sent;
+    fallbacks: calls answered with the fallback payload;
+    negative_hits: fallbacks served from the negative cache without an upstream call;
+    refreshes: background refreshes started for stale cache hits;
+    memory_hits: lines answered with a near-duplicate line's analysis (line memory);
+    adapted: lines answered by the short prompt adapting a similar line's analysis.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.cache_hits = 0
+        self.upstream_calls = 0
+        self.errors = 0
+        self.parse_failures = 0
+        self.fallbacks = 0
+        self.negative_hits = 0
+        self.refreshes = 0
+        self.memory_hits = 0
+        self.adapted = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency_ms = Histogram()
+
+    def record_usage(self, usage: Any) -> None:
+        if not isinstance(usage, dict):
+            return
+        self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+        self.completion_tokens += int(usage.get("completion_tokens") or 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        def rate(n: int) -> float:
+            return round(n / self.calls, 4) if self.calls else 0.0
+
+        return {
+            "calls": self.calls,
+            "cache_hits": self.cache_hits,
+            "cache_hit_rate": rate(self.cache_hits),
+            "upstream_calls": self.upstream_calls,
+            "errors": self.errors,
+            "parse_failures": self.parse_failures,
+            "fallbacks": self.fallbacks,
+            "fallback_rate": rate(self.fallbacks),
+            "negative_hits": self.negative_hits,
+            "refreshes": self.refreshes,
+            "memory_hits": self.memory_hits,
+            "adapted": self.adapted,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_ms": self.latency_ms.snapshot(),
+        }
+
+
+class LLMMetrics:
+    def __init__(self):
+        self._ops: Dict[str, OperationStats] = {}
+
+    def op(self, name: str) -> OperationStats:
+        stats = self._ops.get(name)
+        if stats is None:
+            stats = self._ops[name] = OperationStats()
+        return stats
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.snapshot() for name, stats in sorted(self._ops.items())}
+
+
+llm_metrics = LLMMetrics()
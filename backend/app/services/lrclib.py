@@ -1,11 +1,39 @@
-from typing import Optional, List
+from typing import Optional, List, Tuple
 import structlog
 
 from app.core.config import settings
-from app.services.http_client import get_http_client
+from app.services.negative_cache import NOT_FOUND, UPSTREAM_ERROR, negative_cache
+from app.services.resilience import AIMDLimiter, CircuitBreaker, RetryPolicy, TimeoutPolicy, Upstream
+from app.services.singleflight import SingleFlight
 
 logger = structlog.get_logger()
 
+# GETs are idempotent: retried on 429/5xx/transport errors and hedged past p95 latency.
+lrclib_upstream = Upstream(
+    "lrclib",
+    breaker=CircuitBreaker("lrclib"),
+    limiter=AIMDLimiter("lrclib", max_limit=settings.LRCLIB_MAX_CONCURRENCY),
+    retry=RetryPolicy(
+        max_attempts=settings.LRCLIB_MAX_ATTEMPTS,
+        base_delay=settings.RETRY_BASE_DELAY_SECONDS,
+        max_delay=settings.RETRY_MAX_DELAY_SECONDS,
+    ),
+    timeouts=TimeoutPolicy(
+        maximum=settings.LRCLIB_TIMEOUT_SECONDS,
+        minimum=settings.UPSTREAM_TIMEOUT_MIN_SECONDS,
+    ),
+    hedge=settings.LRCLIB_HEDGE_ENABLED,
+)
+
+# Concurrent lookups of the same song share one GET; misses and errors are remembered
+# in the negative cache, so a popular song LRCLIB doesn't have can't cause a stampede.
+# Discover races several lookups and drops the losers; their GETs should stop too.
+lyrics_flight = SingleFlight("lrclib_get", cancel_abandoned=True)
+
+
+def _lookup_key(*parts) -> str:
+    return "lrclib:" + "|".join("" if p is None else " ".join(str(p).casefold().split()) for p in parts)
+
 
 class LRCLibService:
     """Service for interacting with LRCLIB API."""
@@ -26,10 +54,11 @@ class LRCLibService:
         Returns:
             List of search results with id, trackName, artistName, etc.
         """
-        client = get_http_client()
         try:
-            response = await client.get(
+            response = await lrclib_upstream.request(
+                "GET",
                 f"{self.base_url}/search",
+                op="search",
                 params={"q": query},
                 headers=self.headers,
             )
@@ -58,7 +87,20 @@ class LRCLibService:
         Returns:
             Lyrics data including plainLyrics, syncedLyrics, etc.
         """
-        client = get_http_client()
+        data, _ = await self.lookup_lyrics(track_name, artist_name, album_name, duration)
+        return data
+
+    async def lookup_lyrics(
+        self,
+        track_name: str,
+        artist_name: str,
+        album_name: Optional[str] = None,
+        duration: Optional[int] = None,
+    ) -> Tuple[Optional[dict], Optional[str]]:
+        """
+        Like `get_lyrics`, but also says why there is no result: (data, None) on success,
+        (None, NOT_FOUND) when LRCLIB answered 404, (None, UPSTREAM_ERROR) on any other failure.
+        """
         params = {
             "track_name": track_name,
             "artist_name": artist_name,
@@ -68,20 +110,33 @@ class LRCLibService:
         if duration:
             params["duration"] = duration
 
+        key = _lookup_key("get", track_name, artist_name, album_name, duration)
+        kind = negative_cache.get(key)
+        if kind:
+            return None, kind
+        return await lyrics_flight.do(key, lambda: self._get(key, params, track_name, artist_name))
+
+    async def _get(
+        self, key: str, params: dict, track_name: str, artist_name: str
+    ) -> Tuple[Optional[dict], Optional[str]]:
         try:
-            response = await client.get(
+            response = await lrclib_upstream.request(
+                "GET",
                 f"{self.base_url}/get",
+                op="get",
                 params=params,
                 headers=self.headers,
             )
             if response.status_code == 404:
                 logger.info("lrclib_lyrics_not_found", track=track_name, artist=artist_name)
-                return None
+                negative_cache.add(key, NOT_FOUND)
+                return None, NOT_FOUND
             response.raise_for_status()
-            return response.json()
+            return response.json(), None
         except Exception as e:
             logger.error("lrclib_get_error", track=track_name, artist=artist_name, error=str(e))
-            return None
+            negative_cache.add(key, UPSTREAM_ERROR)
+            return None, UPSTREAM_ERROR
 
     async def get_by_id(self, lrclib_id: int) -> Optional[dict]:
         """
@@ -93,18 +148,27 @@ class LRCLibService:
         Returns:
             Lyrics data including plainLyrics, syncedLyrics, etc.
         """
-        client = get_http_client()
+        key = _lookup_key("get_by_id", lrclib_id)
+        if negative_cache.get(key):
+            return None
+        return await lyrics_flight.do(key, lambda: self._get_by_id(key, lrclib_id))
+
+    async def _get_by_id(self, key: str, lrclib_id: int) -> Optional[dict]:
         try:
-            response = await client.get(
+            response = await lrclib_upstream.request(
+                "GET",
                 f"{self.base_url}/get/{lrclib_id}",
+                op="get_by_id",
                 headers=self.headers,
             )
             if response.status_code == 404:
+                negative_cache.add(key, NOT_FOUND)
                 return None
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error("lrclib_get_by_id_error", lrclib_id=lrclib_id, error=str(e))
+            negative_cache.add(key, UPSTREAM_ERROR)
             return None
 
 
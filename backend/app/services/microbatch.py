@@ -0,0 +1,95 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+class MicroBatcher:
+    """
+    Collect concurrent calls that share a group key for up to `window` seconds (or until
+    `max_items` are queued) and run them as one batch. `run(group, items)` returns results
+    aligned with `items`; an exception is delivered to every caller in the batch, and a
+    cancelled batch cancels every caller's wait. Every caller is resolved one way or another.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+        window: float,
+        max_items: int,
+    ):
+        self.name = name
+        self._run = run
+        self.window = window
+        self.max_items = max(1, max_items)
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        # Strong references so flushed batches are not garbage collected mid-flight.
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, group: Hashable, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(group, [])
+        batch.append((item, future))
+        if len(batch) >= self.max_items:
+            self._flush(group)
+        elif len(batch) == 1:
+            self._timers[group] = loop.call_later(self.window, self._flush, group)
+        # shield: a caller going away must not cancel the result for the rest of the batch
+        return await asyncio.shield(future)
+
+    def _flush(self, group: Hashable) -> None:
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(group, None)
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.create_task(self._execute(group, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, group: Hashable, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = list(await self._run(group, [item for item, _ in batch]))
+        except BaseException as e:
+            self._fail(batch, e)
+            if not isinstance(e, Exception):
+                raise  # cancellation / interpreter exit: resolved the callers, keep unwinding
+            return
+        if len(results) != len(batch):
+            logger.warning("microbatch_result_mismatch", batcher=self.name, items=len(batch), results=len(results))
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        self._fail(
+            batch[len(results):],
+            RuntimeError(f"{self.name}: batch returned {len(results)} results for {len(batch)} items"),
+        )
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Any, asyncio.Future]], error: BaseException) -> None:
+        for _, future in batch:
+            if future.done():
+                continue
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(error)
+                # Mark as retrieved when every waiter went away.
+                future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "queued": sum(len(b) for b in self._pending.values()),
+        }
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+from cachetools import TLRUCache
+
+from app.core.config import settings
+
+# Failure kinds; each is remembered for its own TTL.
+PARSE_FAILURE = "parse_failure"
+NOT_FOUND = "not_found"
+UPSTREAM_ERROR = "upstream_error"
+
+
+class NegativeCache:
+    """
+    Short-lived memory of failed lookups (key -> failure kind), next to the positive caches.
+
+    A live entry means "the upstream already failed for this key, don't ask again yet":
+    callers answer with their fallback instead of re-sending a known-bad prompt or
+    re-fetching a song LRCLIB does not have. A kind with a TTL of 0 is never remembered.
+    """
+
+    def __init__(self, ttls: Dict[str, float], maxsize: int):
+        self.ttls = ttls
+        self._entries: TLRUCache = TLRUCache(
+            maxsize=max(1, maxsize),
+            ttu=lambda _key, kind, now: now + self.ttls[kind],
+            timer=time.monotonic,
+        )
+        self._lock = threading.Lock()
+        self.hits: Counter = Counter()
+        self.stored: Counter = Counter()
+
+    def get(self, key: str) -> Optional[str]:
+        """The failure kind remembered for `key`, or None."""
+        with self._lock:
+            kind = self._entries.get(key)
+        if kind is not None:
+            self.hits[kind] += 1
+        return kind
+
+    def add(self, key: str, kind: str) -> None:
+        if self.ttls.get(kind, 0) <= 0:
+            return
+        with self._lock:
+            self._entries[key] = kind
+        self.stored[kind] += 1
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._entries.expire()
+            size = len(self._entries)
+        return {
+            "size": size,
+            "hits": dict(self.hits),
+            "stored": dict(self.stored),
+            "ttl_seconds": self.ttls,
+        }
+
+
+negative_cache = NegativeCache(
+    ttls={
+        PARSE_FAILURE: settings.NEGATIVE_CACHE_PARSE_TTL_SECONDS,
+        NOT_FOUND: settings.NEGATIVE_CACHE_NOT_FOUND_TTL_SECONDS,
+        UPSTREAM_ERROR: settings.NEGATIVE_CACHE_ERROR_TTL_SECONDS,
+    },
+    maxsize=settings.NEGATIVE_CACHE_SIZE,
+)
@@ -0,0 +1,121 @@
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Any, Dict, Iterable, List
+import asyncio
+import structlog
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.llm_cache import LLMCacheEntry
+
+logger = structlog.get_logger()
+
+
+class PersistentCache:
+    """
+    Postgres-backed tier under cache_service, shared by all workers and restarts.
+    Best-effort: a database error is logged and treated as a miss.
+
+    Hits are counted in memory (`record_hits`) and added to the rows' hit_count by
+    `flush_hits`, so the re-analysis job can find the hottest keys without a write per hit.
+    """
+
+    def __init__(self):
+        self._hits: Counter = Counter()
+
+    def enabled(self) -> bool:
+        return settings.LLM_CACHE_DB_ENABLED
+
+    async def get(self, key: str, fingerprint: Optional[str] = None) -> Optional[Any]:
+        """The stored value; with `fingerprint`, only if the row was written under that fingerprint."""
+        if not self.enabled():
+            return None
+        stmt = select(LLMCacheEntry.value).where(LLMCacheEntry.key == key)
+        if fingerprint is not None:
+            stmt = stmt.where(LLMCacheEntry.fingerprint == fingerprint)
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(stmt)
+                return result.scalar_one_or_none()
+        except Exception as e:
+            logger.warning("llm_cache_db_get_failed", error=str(e))
+            return None
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        if not self.enabled() or not keys:
+            return {}
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(LLMCacheEntry.key, LLMCacheEntry.value).where(LLMCacheEntry.key.in_(keys))
+                )
+                return {k: v for k, v in result.all()}
+        except Exception as e:
+            logger.warning("llm_cache_db_get_failed", error=str(e))
+            return {}
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        model: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if not self.enabled():
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                stmt = insert(LLMCacheEntry).values(
+                    key=key, value=value, model=model, fingerprint=fingerprint, params=params
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[LLMCacheEntry.key],
+                    set_={
+                        "value": stmt.excluded.value,
+                        "model": stmt.excluded.model,
+                        "fingerprint": stmt.excluded.fingerprint,
+                        "params": stmt.excluded.params,
+                    },
+                )
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            logger.warning("llm_cache_db_set_failed", error=str(e))
+
+    def record_hits(self, keys: Iterable[str]) -> None:
+        """Count cache hits (memory or durable) on durable-tier keys; written by `flush_hits`."""
+        if self.enabled() and settings.LLM_CACHE_HIT_FLUSH_SECONDS > 0:
+            self._hits.update(keys)
+
+    async def flush_hits(self) -> int:
+        """Add the counted hits to hit_count/last_hit_at in one batch. Returns the keys written."""
+        if not self._hits:
+            return 0
+        hits, self._hits = self._hits, Counter()
+        table = LLMCacheEntry.__table__
+        stmt = (
+            update(table)
+            .where(table.c.key == bindparam("hit_key"))
+            .values(hit_count=table.c.hit_count + bindparam("hits"), last_hit_at=datetime.utcnow())
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt, [{"hit_key": k, "hits": n} for k, n in hits.items()])
+                await db.commit()
+        except Exception as e:
+            logger.warning("llm_cache_hit_flush_failed", keys=len(hits), error=str(e))
+            return 0
+        return len(hits)
+
+
+persistent_cache = PersistentCache()
+
+
+async def flush_cache_hits(interval: float) -> None:
+    """Write counted hits every `interval` seconds (started from the app lifespan)."""
+    while True:
+        await asyncio.sleep(interval)
+        await persistent_cache.flush_hits()
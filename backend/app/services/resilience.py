@@ -0,0 +1,492 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+import structlog
+
+from app.services.http_client import get_http_client
+
+logger = structlog.get_logger()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling an upstream that is known to be unhealthy or saturated."""
+
+    def __init__(self, upstream: str, reason: str):
+        super().__init__(f"{upstream} unavailable: {reason}")
+        self.upstream = upstream
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `reset_timeout` seconds, then lets `half_open_max_calls` probes through;
+    one successful probe closes it again, a failed probe re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probes = 0
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if self._clock() - (self.opened_at or 0.0) < self.reset_timeout:
+                self.rejected += 1
+                return False
+            self._transition(HALF_OPEN)
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self._probes += 1
+        return True
+
+    def abandon(self) -> None:
+        """An allowed call ended without an outcome (cancelled / never sent)."""
+        if self.state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self._transition(OPEN)
+            self.opened_at = self._clock()
+
+    def _transition(self, state: str) -> None:
+        logger.warning("circuit_breaker_state", upstream=self.name, old=self.state, new=state)
+        self.state = state
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == OPEN and self.opened_at is not None:
+            retry_in = round(max(0.0, self.reset_timeout - (self._clock() - self.opened_at)), 2)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": retry_in,
+            "rejected": self.rejected,
+        }
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit: +1/limit per success (about +1 per round of calls),
+    multiplied by `backoff` on overload (at most once per `cooldown` seconds).
+    Callers beyond the limit wait up to `max_wait` seconds, then are rejected.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        backoff: float = 0.5,
+        cooldown: float = 1.0,
+        max_wait: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(initial_limit or self.max_limit)
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self.inflight = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        deadline = self._clock() + self.max_wait
+        while self.inflight >= int(self.limit):
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                self.rejected += 1
+                raise UpstreamUnavailable(self.name, "concurrency_limit")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.inflight += 1
+
+    def release(self) -> None:
+        self.inflight = max(0, self.inflight - 1)
+        self._wake()
+
+    def on_success(self) -> None:
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / max(1.0, self.limit))
+        self._wake()
+
+    def on_overload(self) -> None:
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.inflight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "inflight": self.inflight,
+            "queued": len(self._waiters),
+            "rejected": self.rejected,
+        }
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies (seconds)."""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[idx]
+
+    def snapshot(self) -> Dict[str, Any]:
+        def ms(p: float) -> Optional[int]:
+            value = self.percentile(p)
+            return None if value is None else int(value * 1000)
+
+        return {"samples": len(self), "p50_ms": ms(0.5), "p95_ms": ms(0.95), "p99_ms": ms(0.99)}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Jittered exponential backoff; honors Retry-After up to `max_retry_after`."""
+
+    max_attempts: int = 1
+    base_delay: float = 0.2
+    max_delay: float = 2.0
+    max_retry_after: float = 5.0
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads synchronized retries from many workers.
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+@dataclass(frozen=True)
+class TimeoutPolicy:
+    """
+    Per-request timeout derived from observed latency: p99 * multiplier, clamped to
+    [minimum, maximum]. `maximum` is used until `min_samples` successes were seen.
+    """
+
+    maximum: float = 5.0
+    minimum: float = 1.0
+    multiplier: float = 3.0
+    min_samples: int = 20
+    connect: float = 3.0
+
+    def compute(self, tracker: LatencyTracker) -> float:
+        if len(tracker) < self.min_samples:
+            return self.maximum
+        p99 = tracker.percentile(0.99) or self.maximum
+        return max(self.minimum, min(self.maximum, p99 * self.multiplier))
+
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def _is_overload(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_after_seconds(resp: httpx.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class Upstream:
+    """
+    Breaker + concurrency limiter guarding one external service, plus the shared
+    request path (retries, hedging, adaptive timeouts) used by the service clients.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker,
+        limiter: AIMDLimiter,
+        retry: Optional[RetryPolicy] = None,
+        timeouts: Optional[TimeoutPolicy] = None,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.limiter = limiter
+        self.retry = retry or RetryPolicy()
+        self.timeouts = timeouts or TimeoutPolicy()
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self._latency: Dict[str, LatencyTracker] = {}
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        _registry[name] = self
+
+    def latency(self, op: str) -> LatencyTracker:
+        tracker = self._latency.get(op)
+        if tracker is None:
+            tracker = self._latency[op] = LatencyTracker()
+        return tracker
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        op: str = "default",
+        idempotent: Optional[bool] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Send a request through the shared HTTP client with retries on 429/5xx and
+        transport errors. Non-idempotent requests are only retried when the request
+        was never sent (connect errors) or the upstream answered with a retryable
+        status. Idempotent requests are hedged once p95 latency has passed.
+        `timeout` overrides the adaptive per-operation timeout.
+        Raises UpstreamUnavailable (never retried) when the breaker/limiter reject.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD")
+        client = get_http_client()
+        tracker = self.latency(op)
+        seconds = timeout if timeout is not None else self.timeouts.compute(tracker)
+        http_timeout = httpx.Timeout(seconds, connect=min(seconds, self.timeouts.connect))
+
+        async def send() -> httpx.Response:
+            return await self.call(lambda: client.request(method, url, timeout=http_timeout, **kwargs))
+
+        hedge_after = None
+        if self.hedge and idempotent and len(tracker) >= self.timeouts.min_samples:
+            hedge_after = tracker.percentile(self.hedge_percentile)
+
+        attempts = max(1, self.retry.max_attempts)
+        for attempt in range(attempts):
+            last = attempt == attempts - 1
+            started = time.monotonic()
+            try:
+                resp = await (self._hedged(send, hedge_after) if hedge_after else send())
+            except UpstreamUnavailable:
+                raise
+            except httpx.TransportError as e:
+                retry_safe = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                if last or not retry_safe:
+                    raise
+                delay = self.retry.backoff(attempt)
+                logger.info("upstream_retry", upstream=self.name, op=op, attempt=attempt + 1, error=type(e).__name__)
+            else:
+                if resp.status_code not in RETRYABLE_STATUS:
+                    if not _is_overload(resp.status_code):
+                        tracker.record(time.monotonic() - started)
+                    return resp
+                if last:
+                    return resp
+                retry_after = _retry_after_seconds(resp)
+                if retry_after is not None and retry_after > self.retry.max_retry_after:
+                    # Upstream asked for a longer pause than a user request can afford.
+                    return resp
+                delay = retry_after if retry_after is not None else self.retry.backoff(attempt)
+                logger.info("upstream_retry", upstream=self.name, op=op, attempt=attempt + 1, status=resp.status_code)
+            self.retries += 1
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: str,
+        *,
+        op: str = "default",
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streamed response under the breaker and limiter; the concurrency slot is
+        held until the body is consumed. Nothing is retried or hedged, since part of the
+        body may already have been relayed. The adaptive timeout bounds time-to-first-byte
+        and each gap between chunks. Raises UpstreamUnavailable when rejected.
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(self.name, "circuit_open")
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        client = get_http_client()
+        tracker = self.latency(op)
+        seconds = timeout if timeout is not None else self.timeouts.compute(tracker)
+        http_timeout = httpx.Timeout(seconds, connect=min(seconds, self.timeouts.connect))
+        started = time.monotonic()
+        try:
+            async with client.stream(method, url, timeout=http_timeout, **kwargs) as resp:
+                overloaded = _is_overload(resp.status_code)
+                if not overloaded:
+                    tracker.record(time.monotonic() - started)
+                yield resp
+            self._record(not overloaded)
+        except (asyncio.CancelledError, GeneratorExit):
+            self.breaker.abandon()
+            raise
+        except Exception:
+            self._record(False)
+            raise
+        finally:
+            self.limiter.release()
+
+    async def _hedged(self, send: Callable[[], Awaitable[httpx.Response]], hedge_after: float) -> httpx.Response:
+        """Send once; if no answer after `hedge_after` seconds, send a duplicate and take the first."""
+        primary = asyncio.ensure_future(send())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(send()))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call(self, fn: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Run one request. Raises UpstreamUnavailable without touching the network when the
+        breaker is open or the limiter is saturated. Transport errors, 429 and 5xx count as
+        failures; any other response (including 404) counts as healthy.
+        """
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(self.name, "circuit_open")
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.abandon()
+            raise
+        try:
+            resp = await fn()
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception:
+            self._record(False)
+            raise
+        else:
+            self._record(not _is_overload(resp.status_code))
+            return resp
+        finally:
+            self.limiter.release()
+
+    def _record(self, ok: bool) -> None:
+        if ok:
+            self.breaker.record_success()
+            self.limiter.on_success()
+        else:
+            self.breaker.record_failure()
+            self.limiter.on_overload()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.snapshot(),
+            "limiter": self.limiter.snapshot(),
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "latency": {op: tracker.snapshot() for op, tracker in self._latency.items()},
+            "timeouts_seconds": {op: round(self.timeouts.compute(t), 2) for op, t in self._latency.items()},
+        }
+
+
+_registry: Dict[str, Upstream] = {}
+
+
+def upstreams_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: upstream.snapshot() for name, upstream in _registry.items()}
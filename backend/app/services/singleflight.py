@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one upstream call.
+
+    The first caller for a key starts the call as a task; callers arriving while
+    it is in flight await the same task. Nothing is remembered once the call
+    finishes (that is the cache's job).
+
+    By default the call outlives its callers so the result still lands in the
+    cache. With `cancel_abandoned=True` the call is cancelled once its last
+    waiter is cancelled, for probes whose result nobody needs any more.
+    """
+
+    def __init__(self, name: str, cancel_abandoned: bool = False):
+        self.name = name
+        self.cancel_abandoned = cancel_abandoned
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.originated = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.originated += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # shield: one caller disconnecting must not cancel the call for everyone else
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self.cancel_abandoned and self._waiters[task] == 1:
+                task.cancel()
+            raise
+        finally:
+            left = self._waiters.pop(task) - 1
+            if left:
+                self._waiters[task] = left
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark exceptions as retrieved when every waiter went away.
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "originated": self.originated,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Tuple
+import structlog
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.song import Song
+from app.models.song_story import SongStory
+from app.services.cache_service import cache_service, make_story_key
+from app.services.cerebras import MODEL, STORY_PROMPT_VERSION, cerebras_service
+from app.services.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+story_flight = SingleFlight("song_story")
+
+
+class SongStoryService:
+    """
+    Stories are static per (song, language, prompt version): memory -> song_stories row
+    (one read on the unique index) -> generate and store. Storage is best-effort; a
+    database error is logged and treated as a miss.
+    """
+
+    def _is_fresh(self, created_at: Optional[datetime]) -> bool:
+        if settings.SONG_STORY_MAX_AGE_DAYS <= 0 or created_at is None:
+            return True
+        return datetime.utcnow() - created_at < timedelta(days=settings.SONG_STORY_MAX_AGE_DAYS)
+
+    async def lookup(self, song_id: int, target_lang: str) -> Tuple[Optional[str], bool]:
+        """Return (story, is_fresh); story is None when nothing is stored."""
+        key = make_story_key(song_id, target_lang, STORY_PROMPT_VERSION)
+        story = await cache_service.get(key)
+        if story:
+            return story, True
+        if not settings.LLM_CACHE_DB_ENABLED:
+            return None, False
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(SongStory.story, SongStory.created_at).where(
+                        SongStory.song_id == song_id,
+                        SongStory.target_lang == target_lang,
+                        SongStory.prompt_version == STORY_PROMPT_VERSION,
+                    )
+                )
+                row = result.first()
+        except Exception as e:
+            logger.warning("song_story_db_get_failed", song_id=song_id, error=str(e))
+            return None, False
+        if row is None:
+            return None, False
+        fresh = self._is_fresh(row.created_at)
+        if fresh:
+            await cache_service.set(key, row.story)
+        return row.story, fresh
+
+    async def save(self, song_id: int, target_lang: str, story: str) -> None:
+        await cache_service.set(make_story_key(song_id, target_lang, STORY_PROMPT_VERSION), story)
+        if not settings.LLM_CACHE_DB_ENABLED:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                stmt = insert(SongStory).values(
+                    song_id=song_id,
+                    target_lang=target_lang,
+                    prompt_version=STORY_PROMPT_VERSION,
+                    story=story,
+                    model=MODEL,
+                    created_at=datetime.utcnow(),
+                )
+                stmt = stmt.on_conflict_do_update(
+                    constraint="uix_song_stories_song_lang_version",
+                    set_={"story": stmt.excluded.story, "model": stmt.excluded.model, "created_at": stmt.excluded.created_at},
+                )
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            logger.warning("song_story_db_set_failed", song_id=song_id, error=str(e))
+
+    async def generate(self, song: Song, target_lang: str) -> str:
+        """Generate and store a story (concurrent requests share one call). Returns "" on failure."""
+
+        async def run() -> str:
+            story = await cerebras_service.generate_song_story(song.title, song.artist, target_lang)
+            if story:
+                await self.save(song.id, target_lang, story)
+            return story
+
+        return await story_flight.do(f"{song.id}:{target_lang}", run)
+
+    async def stream(self, song: Song, target_lang: str, stale: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Relay a new story as it is generated and store it once complete. If generation
+        yields nothing, the outdated `stale` story (if any) is sent instead. A failure after
+        some text was sent is re-raised, so callers can tell a cut-off story from a whole one.
+        """
+        parts: List[str] = []
+        try:
+            async for text in cerebras_service.stream_song_story(song.title, song.artist, target_lang):
+                parts.append(text)
+                yield text
+        except Exception:
+            # Already logged; a cut-off story is not stored.
+            if parts:
+                raise
+            if stale:
+                yield stale
+            return
+
+        story = "".join(parts).strip()
+        if story:
+            await self.save(song.id, target_lang, story)
+        elif stale:
+            yield stale
+
+
+song_story_service = SongStoryService()
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Optional, Set, Tuple
+import structlog
+
+from app.core.config import settings
+from app.services.cerebras import cerebras_service
+
+logger = structlog.get_logger()
+
+# Strong references so fire-and-forget tasks are not garbage collected mid-flight.
+_tasks: Set[asyncio.Task] = set()
+_slots: Optional[asyncio.Semaphore] = None
+# (song_id, native_lang, learning_lang) being warmed; importing the same song again schedules nothing.
+_inflight: Set[Tuple[int, str, str]] = set()
+
+
+def _warmup_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, settings.SONG_WARMUP_CONCURRENCY))
+    return _slots
+
+
+def schedule_song_warmup(song_id: int, lyrics: Optional[str], native_lang: str, learning_lang: str) -> None:
+    """
+    Pre-analyze the first lines of a freshly imported song in the background.
+    Never awaited by the request; no-op unless SONG_WARMUP_ENABLED and AI is configured,
+    or while the same song is already being warmed for the same language pair.
+    """
+    if not settings.SONG_WARMUP_ENABLED or not settings.CEREBRAS_API_KEY or not lyrics:
+        return
+    job = (song_id, native_lang or "en", learning_lang or "en")
+    if job in _inflight:
+        return
+    _inflight.add(job)
+    task = asyncio.create_task(_warm_song(song_id, lyrics, job[1], job[2]))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    task.add_done_callback(lambda _: _inflight.discard(job))
+
+
+async def _warm_song(song_id: int, lyrics: str, native_lang: str, learning_lang: str) -> None:
+    lines = [line for line in lyrics.split("\n") if line.strip()][: max(0, settings.SONG_WARMUP_LINES)]
+    if not lines:
+        return
+    slots = _warmup_slots()
+
+    async def analyses() -> None:
+        async with slots:
+            async for _ in cerebras_service.analyze_song(song_id, lines, native_lang, learning_lang):
+                pass
+
+    async def interlinear(idx: int, line: str) -> None:
+        async with slots:
+            await cerebras_service.interlinear_line(
+                line=line,
+                native_lang=native_lang,
+                learning_lang=learning_lang,
+                song_id=song_id,
+                line_index=idx,
+            )
+
+    results = await asyncio.gather(
+        analyses(),
+        *(interlinear(idx, line) for idx, line in enumerate(lines)),
+        return_exceptions=True,
+    )
+    errors = [r for r in results if isinstance(r, Exception)]
+    for e in errors:
+        logger.warning("song_warmup_failed", song_id=song_id, error=str(e))
+    logger.info("song_warmup_done", song_id=song_id, lines=len(lines), errors=len(errors))
@@ -0,0 +1,90 @@
+import re
+import unicodedata
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.cache_service import cache_service, make_analysis_key
+from app.services.cerebras import MAX_LINE_LENGTH, cerebras_service
+from app.services.persistent_cache import persistent_cache
+
+_PUNCT = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """Casefold, drop accents' combining marks and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", (text or "").casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_PUNCT.sub(" ", text).split())
+
+
+# Articles per answer language; adding or dropping one doesn't change what a learner's
+# translation means. Languages not listed compare every word.
+ARTICLES: Dict[str, FrozenSet[str]] = {
+    "en": frozenset({"a", "an", "the"}),
+    "es": frozenset({"el", "la", "los", "las", "un", "una", "unos", "unas"}),
+    "fr": frozenset({"le", "la", "les", "l", "un", "une", "des"}),
+    "de": frozenset({"der", "die", "das", "den", "dem", "des", "ein", "eine", "einen", "einem", "einer", "eines"}),
+    "it": frozenset({"il", "lo", "la", "i", "gli", "le", "l", "un", "uno", "una"}),
+    "pt": frozenset({"o", "a", "os", "as", "um", "uma", "uns", "umas"}),
+}
+
+
+def content_tokens(text: str, lang: str) -> List[str]:
+    """Normalized words in order, without the language's articles."""
+    articles = ARTICLES.get(lang, frozenset())
+    return [token for token in normalize(text).split() if token not in articles]
+
+
+def grade_locally(reference: str, answer: str, lang: str = "en") -> Optional[dict]:
+    """
+    Accept an answer that is the known-good translation up to case, accents, punctuation and
+    articles. Anything else (a dropped "not", one word swapped, a paraphrase) returns None and
+    is graded by the LLM: surface similarity says nothing about meaning.
+    """
+    tokens = content_tokens(answer, lang)
+    if not tokens or tokens != content_tokens(reference, lang):
+        return None
+    return {
+        "is_correct": True,
+        "score": 1.0,
+        "correct_translation": reference,
+        "feedback": "Correct! Your translation matches the expected meaning.",
+    }
+
+
+async def _reference_translation(
+    song_id: int, line_index: int, original: str, native_lang: str, learning_lang: str
+) -> Optional[str]:
+    """The line's translation from an earlier analyze_line call, if one is cached."""
+    key = make_analysis_key(song_id, line_index, (original or "")[:MAX_LINE_LENGTH], native_lang, learning_lang)
+    analysis = await cache_service.get(key) or await persistent_cache.get(key)
+    if not isinstance(analysis, dict):
+        return None
+    return analysis.get("translation") or None
+
+
+async def grade_translation(
+    song_id: int,
+    line_index: int,
+    original: str,
+    user_translation: str,
+    native_lang: str = "en",
+    learning_lang: str = "en",
+) -> Tuple[dict, str]:
+    """
+    Grade locally against the cached line analysis when the answer is clear-cut; otherwise ask
+    the LLM (whose verdicts are cached per normalized pair). Returns (result, graded_by).
+    """
+    if settings.TRANSLATION_CHECK_LOCAL_GRADER:
+        reference = await _reference_translation(song_id, line_index, original, native_lang, learning_lang)
+        if reference:
+            result = grade_locally(reference, user_translation, native_lang)
+            if result is not None:
+                return result, "local"
+    result = await cerebras_service.check_translation(
+        original=original,
+        user_translation=user_translation,
+        native_lang=native_lang,
+        learning_lang=learning_lang,
+    )
+    return result, "llm"
@@ -0,0 +1,197 @@
+import asyncio
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+import structlog
+from cachetools import LRUCache
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.vocabulary import Vocabulary
+from app.models.word_translation import WordTranslation
+from app.services.cerebras import cerebras_service
+from app.services.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+WordKey = Tuple[str, str, str]  # (normalized word, source_lang, target_lang)
+
+MAX_WORD_LENGTH = 120
+
+
+def normalize_word(word: str) -> str:
+    return " ".join((word or "").casefold().split())[:MAX_WORD_LENGTH]
+
+
+class WordMemory:
+    """
+    Word translations shared by every user: in-process LRU -> word_translations table -> LLM.
+    Seeded from existing vocabulary rows. Database errors are logged and treated as misses.
+    """
+
+    def __init__(self):
+        self._lru: LRUCache = LRUCache(maxsize=settings.WORD_MEMORY_LRU_SIZE)
+        self._flight = SingleFlight("word_translation")
+
+    @staticmethod
+    def key(word: str, source_lang: str, target_lang: str) -> WordKey:
+        return normalize_word(word), source_lang, target_lang
+
+    async def get_many(self, keys: Iterable[WordKey]) -> Dict[WordKey, str]:
+        found: Dict[WordKey, str] = {}
+        missing: List[WordKey] = []
+        for key in dict.fromkeys(keys):
+            hit = self._lru.get(key)
+            if hit:
+                found[key] = hit
+            else:
+                missing.append(key)
+        if not missing or not settings.LLM_CACHE_DB_ENABLED:
+            return found
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(
+                        WordTranslation.word,
+                        WordTranslation.source_lang,
+                        WordTranslation.target_lang,
+                        WordTranslation.translation,
+                    ).where(
+                        tuple_(WordTranslation.word, WordTranslation.source_lang, WordTranslation.target_lang).in_(missing)
+                    )
+                )
+                rows = result.all()
+        except Exception as e:
+            logger.warning("word_memory_db_get_failed", error=str(e))
+            return found
+        for word, source_lang, target_lang, translation in rows:
+            key = (word, source_lang, target_lang)
+            self._lru[key] = translation
+            found[key] = translation
+        return found
+
+    async def put_many(self, entries: Dict[WordKey, str], origin: str) -> None:
+        entries = {k: v.strip()[:255] for k, v in entries.items() if k[0] and v and v.strip()}
+        for key, translation in entries.items():
+            self._lru[key] = translation
+        if not entries or not settings.LLM_CACHE_DB_ENABLED:
+            return
+        now = datetime.utcnow()
+        try:
+            async with AsyncSessionLocal() as db:
+                stmt = insert(WordTranslation).values(
+                    [
+                        {
+                            "word": word,
+                            "source_lang": source_lang,
+                            "target_lang": target_lang,
+                            "translation": translation,
+                            "origin": origin,
+                            "created_at": now,
+                        }
+                        for (word, source_lang, target_lang), translation in entries.items()
+                    ]
+                )
+                # First translation wins; the memory never flip-flops between phrasings.
+                await db.execute(stmt.on_conflict_do_nothing())
+                await db.commit()
+        except Exception as e:
+            logger.warning("word_memory_db_set_failed", error=str(e))
+
+    async def translate(self, word: str, source_lang: str, target_lang: str) -> str:
+        """Translation from memory, else from the LLM (stored for everyone). "" on failure."""
+        key = self.key(word, source_lang, target_lang)
+        if not key[0]:
+            return ""
+        hit = self._lru.get(key)
+        if hit:
+            return hit
+
+        async def lookup() -> str:
+            found = await self.get_many([key])
+            if key in found:
+                return found[key]
+            translation = await cerebras_service.translate_word(word, source_lang, target_lang)
+            if translation:
+                await self.put_many({key: translation}, origin="llm")
+            return translation
+
+        return await self._flight.do("|".join(key), lookup)
+
+    async def translate_many(self, words: List[str], source_lang: str, target_lang: str) -> Dict[str, str]:
+        """
+        Translate a word list: memory first, then the remaining distinct words packed
+        WORD_BATCH_SIZE per prompt. Returns requested word -> translation (failures omitted).
+        """
+        keys = {word: self.key(word, source_lang, target_lang) for word in words}
+        found = await self.get_many(k for k in keys.values() if k[0])
+        # Translate the first spelling seen for each normalized word.
+        missing: Dict[WordKey, str] = {}
+        for word, key in keys.items():
+            if key[0] and key not in found:
+                missing.setdefault(key, word)
+
+        if missing:
+            pending = list(missing.items())
+            size = max(1, settings.WORD_BATCH_SIZE)
+            chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+            slots = asyncio.Semaphore(max(1, settings.WORD_BATCH_CONCURRENCY))
+
+            async def run(chunk: List[Tuple[WordKey, str]]) -> Dict[WordKey, str]:
+                async with slots:
+                    results = await cerebras_service.translate_words([w for _, w in chunk], source_lang, target_lang)
+                return {key: t for (key, _), t in zip(chunk, results) if t}
+
+            translated: Dict[WordKey, str] = {}
+            for part in await asyncio.gather(*(run(chunk) for chunk in chunks)):
+                translated.update(part)
+            await self.put_many(translated, origin="llm")
+            found.update(translated)
+
+        return {word: found[key] for word, key in keys.items() if key in found}
+
+    async def seed_from_vocabulary(self, batch_size: int = 500) -> int:
+        """
+        Copy the most common translation of every (word, language pair) in users' vocabulary
+        into the memory. Existing entries are kept. Returns the number of pairs offered.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(
+                        Vocabulary.word,
+                        Vocabulary.source_lang,
+                        Vocabulary.target_lang,
+                        Vocabulary.translation,
+                        func.count(),
+                    )
+                    .where(Vocabulary.source_lang.isnot(None), Vocabulary.target_lang.isnot(None))
+                    .group_by(Vocabulary.word, Vocabulary.source_lang, Vocabulary.target_lang, Vocabulary.translation)
+                )
+                rows = result.all()
+        except Exception as e:
+            logger.warning("word_memory_seed_failed", error=str(e))
+            return 0
+
+        votes: Dict[WordKey, Counter] = {}
+        for word, source_lang, target_lang, translation, count in rows:
+            key = self.key(word, source_lang, target_lang)
+            if key[0] and (translation or "").strip():
+                votes.setdefault(key, Counter())[translation.strip()] += count
+        best = {key: counter.most_common(1)[0][0] for key, counter in votes.items()}
+
+        items = list(best.items())
+        for i in range(0, len(items), batch_size):
+            await self.put_many(dict(items[i:i + batch_size]), origin="vocabulary")
+        logger.info("word_memory_seeded", pairs=len(best))
+        return len(best)
+
+
+word_memory = WordMemory()
+
+
+if __name__ == "__main__":
+    # python -m app.services.word_memory  (seed from vocabulary rows)
+    asyncio.run(word_memory.seed_from_vocabulary())
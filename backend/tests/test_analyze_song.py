@@ -0,0 +1,52 @@
+import pytest
+
+from app.core.config import settings
+from app.services import cerebras
+from app.services.cache_backends import memory_backend
+from app.services.cache_service import CacheService, cache_service, make_analysis_key
+from app.services.cerebras import cerebras_service
+from app.services.negative_cache import UPSTREAM_ERROR, NegativeCache
+
+
+@pytest.mark.asyncio
+async def test_analyze_song_dedupes_lines_and_fills_per_line_cache(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(settings, "ANALYZE_SONG_BATCH_LINES", 2)
+    prompts = []
+
+    async def fake_upstream(lines, native_lang, learning_lang):
+        prompts.append(list(lines))
+        return [{"translation": f"t:{line}", "grammar": "", "vocabulary": []} for line in lines]
+
+    monkeypatch.setattr(cerebras_service, "_analyze_lines_upstream", fake_upstream)
+
+    lines = ["Chorus line", "Verse one", "chorus line ", "Verse two", "Chorus line"]
+    items = [item async for item in cerebras_service.analyze_song(9901, lines, "en", "es")]
+
+    assert sorted(item["line_index"] for item in items) == [0, 1, 2, 3, 4]
+    # 3 distinct lines, 2 per prompt
+    assert sorted(len(p) for p in prompts) == [1, 2]
+    for idx, line in enumerate(lines):
+        assert await cache_service.get(make_analysis_key(9901, idx, line, "en", "es")) is not None
+
+    again = [item async for item in cerebras_service.analyze_song(9901, lines, "en", "es")]
+    assert len(prompts) == 2
+    assert all(item["cached"] for item in again)
+
+
+@pytest.mark.asyncio
+async def test_stale_lines_that_failed_recently_are_not_refreshed(monkeypatch):
+    cache = CacheService(memory_backend())
+    failures = NegativeCache(ttls={UPSTREAM_ERROR: 60}, maxsize=10)
+    monkeypatch.setattr(cerebras, "cache_service", cache)
+    monkeypatch.setattr(cerebras, "negative_cache", failures)
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr("app.services.cache_service._soft_deadline", lambda: 0.0)  # stored already stale
+    key = make_analysis_key(9902, 0, "Stale line", "en", "es")
+    await cache.set(key, {"translation": "old", "grammar": "", "vocabulary": []})
+    failures.add(key, UPSTREAM_ERROR)
+
+    items = [item async for item in cerebras.CerebrasService().analyze_song(9902, ["Stale line"], "en", "es")]
+
+    assert items[0]["translation"] == "old"
+    assert not cache._tasks
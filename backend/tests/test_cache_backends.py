@@ -0,0 +1,99 @@
+import os
+import time
+
+import pytest
+import pytest_asyncio
+
+from app.core.config import settings
+from app.services.cache_backends import RedisBackend, SQLiteBackend
+from app.services.cache_service import CacheService
+
+ANALYSIS = {"translation": "my love", "grammar": "", "vocabulary": [{"word": "amor", "meaning": "love"}]}
+
+
+@pytest.mark.asyncio
+async def test_sqlite_backend_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker_a, worker_b = CacheService(SQLiteBackend(path, 1 << 20)), CacheService(SQLiteBackend(path, 1 << 20))
+
+    await worker_a.set("analysis:abc", ANALYSIS)
+    assert await worker_b.get("analysis:abc") == ANALYSIS
+    assert await worker_b.get_many(["analysis:abc", "analysis:missing"]) == {"analysis:abc": ANALYSIS}
+
+    worker_b.backend.set("analysis:old", ANALYSIS, time.time(), ttl=-1)  # already past its hard expiry
+    assert await worker_a.get("analysis:old") is None
+    await worker_a.delete("analysis:abc")
+    assert await worker_b.get("analysis:abc") is None
+
+
+def test_sqlite_backend_treats_corrupt_entries_as_misses(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), 1 << 20)
+    backend.set("analysis:good", ANALYSIS, time.time() + 60, ttl=60)
+    with backend._conn:
+        backend._conn.execute(
+            "INSERT INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+            ("analysis:bad", "analysis", b"Znot zlib", time.time() + 60, time.time() + 60),
+        )
+    assert set(backend.get_many(["analysis:good", "analysis:bad"])) == {"analysis:good"}
+
+
+def test_sqlite_backend_prunes_to_its_byte_budget(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_bytes=2000)
+    backend.PRUNE_EVERY = 1
+    for i in range(50):
+        backend.set(f"analysis:{i}", "x" * 100, time.time() + 60, ttl=600 + i)
+    stats = backend.stats()
+    assert stats["bytes"] <= 2000
+    assert backend.get("analysis:49") is not None  # latest-expiring entries are kept
+    assert backend.namespace_stats()["analysis"]["evictions"] > 0
+
+
+# A real server for the Redis tests: CACHE_TEST_REDIS_URL, else a local default (db 15).
+REDIS_URL = os.environ.get("CACHE_TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+@pytest_asyncio.fixture
+async def redis_backend():
+    redis_asyncio = pytest.importorskip("redis.asyncio")
+    client = redis_asyncio.from_url(REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    try:
+        await client.ping()
+    except Exception:
+        await client.aclose()
+        pytest.skip(f"no Redis server at {REDIS_URL}")
+    backend = RedisBackend(client, prefix=f"song2learn-test-{os.getpid()}:")
+    yield backend
+    keys = [key async for key in client.scan_iter(match=backend.prefix + "*")]
+    if keys:
+        await client.delete(*keys)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_round_trips_and_skips_corrupt_entries(redis_backend):
+    cache = CacheService(redis_backend)
+
+    await cache.set_many({"analysis:a": ANALYSIS, "interlinear:b": {"tokens": [{"orig": "amor", "trans": "love"}]}})
+    assert await cache.lookup("analysis:a") == (ANALYSIS, False)
+    assert set(await cache.get_many(["analysis:a", "interlinear:b", "analysis:c"])) == {"analysis:a", "interlinear:b"}
+    assert 0 < await redis_backend.client.pttl(redis_backend.prefix + "analysis:a") <= settings.CACHE_TTL_SECONDS * 1000
+
+    await redis_backend.client.set(redis_backend.prefix + "analysis:c", b"\x00")  # shorter than the deadline header
+    assert await cache.get("analysis:c") is None
+
+    await cache.delete("analysis:a")
+    assert await cache.get("analysis:a") is None
+    assert redis_backend.stats()["errors"] == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_degrades_to_misses_when_down():
+    redis_asyncio = pytest.importorskip("redis.asyncio")
+    client = redis_asyncio.from_url("redis://127.0.0.1:1/0", socket_timeout=0.1, socket_connect_timeout=0.1)
+    backend = RedisBackend(client)
+    cache = CacheService(backend)
+    await cache.set("analysis:a", ANALYSIS)
+    assert await cache.get("analysis:a") is None
+    assert backend.errors == 1  # skipped, not retried, while backing off
+    assert backend.stats()["available"] is False
+    await client.aclose()
@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.services import cache_reanalysis
+from app.services.cache_service import fingerprint, make_analysis_key
+
+
+class _Result:
+    def __init__(self, rows, rowcount=0):
+        self._rows, self.rowcount = rows, rowcount
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    """Stands in for AsyncSessionLocal: records statements, answers with canned rows."""
+
+    def __init__(self, rows=(), rowcount=0):
+        self.rows, self.rowcount, self.statements = list(rows), rowcount, []
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        self.statements.append(statement.compile(dialect=postgresql.dialect()))
+        return _Result(self.rows, self.rowcount)
+
+    async def commit(self):
+        pass
+
+
+def _params(line, song_id=0, line_index=0):
+    return {"line": line, "native_lang": "en", "learning_lang": "es", "song_id": song_id, "line_index": line_index}
+
+
+@pytest.mark.asyncio
+async def test_hot_inputs_reads_other_fingerprints_and_rebuilds_current_keys(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_CONTENT_ADDRESSED", True)
+    session = _Session(rows=[_params("Hola amor", 1, 2), _params("Hola amor", 3, 4), {"native_lang": "en"}])
+    monkeypatch.setattr(cache_reanalysis, "AsyncSessionLocal", session)
+
+    inputs = await cache_reanalysis._hot_inputs("analysis", 10)
+
+    # Content-addressed keys: both rows map to one current key, the first (hottest) one wins;
+    # the row without a line can't be rebuilt and is skipped.
+    assert inputs == {make_analysis_key(1, 2, "Hola amor", "en", "es"): _params("Hola amor", 1, 2)}
+    sql = str(session.statements[0])
+    assert "llm_cache.fingerprint != " in sql and "llm_cache.params IS NOT NULL" in sql
+    assert fingerprint("analysis") in session.statements[0].params.values()
+
+
+@pytest.mark.asyncio
+async def test_reanalyze_reports_candidates_current_and_written(monkeypatch):
+    keys = [make_analysis_key(0, 0, line, "en", "es") for line in ("uno", "dos", "tres")]
+    inputs = {key: _params(line) for key, line in zip(keys, ("uno", "dos", "tres"))}
+    stored = {keys[0]: {"translation": "one"}}
+    recomputed = []
+
+    async def hot_inputs(namespace, limit):
+        return inputs if namespace == "analysis" else {}
+
+    async def get_many(wanted):
+        return {key: stored[key] for key in wanted if key in stored}
+
+    async def recompute(items):
+        recomputed.extend(key for key, _ in items)
+        stored[items[0][0]] = {"translation": "two"}  # the other one failed upstream
+
+    monkeypatch.setattr(cache_reanalysis, "_hot_inputs", hot_inputs)
+    monkeypatch.setattr(cache_reanalysis.persistent_cache, "get_many", get_many)
+    monkeypatch.setattr(cache_reanalysis, "_recompute_analyses", recompute)
+
+    report = await cache_reanalysis.reanalyze_hot_keys(limit=10)
+
+    assert recomputed == keys[1:]
+    assert report["analysis"] == {"candidates": 3, "current": 1, "written": 1}
+    assert report["interlinear"] == {"candidates": 0, "current": 0, "written": 0}
+
+
+@pytest.mark.asyncio
+async def test_prune_deletes_only_old_entries_of_other_fingerprints(monkeypatch):
+    session = _Session(rowcount=2)
+    monkeypatch.setattr(cache_reanalysis, "AsyncSessionLocal", session)
+    monkeypatch.setattr(settings, "LLM_CACHE_PRUNE_AFTER_DAYS", 14)
+
+    pruned = await cache_reanalysis.prune_stale_fingerprints()
+
+    assert pruned == {"analysis": 2, "interlinear": 2, "check": 2}
+    sql = str(session.statements[0])
+    assert sql.startswith("DELETE FROM llm_cache")
+    assert "llm_cache.fingerprint IS NULL OR llm_cache.fingerprint != " in sql
+    assert "coalesce(llm_cache.last_hit_at, llm_cache.created_at) < " in sql
+    assert await cache_reanalysis.prune_stale_fingerprints(days=0) == {}
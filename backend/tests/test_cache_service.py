@@ -0,0 +1,162 @@
+import asyncio
+import json
+import random
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import cache_service as cache_module
+from app.services.cache_service import cache_service, make_analysis_key, make_check_key, make_interlinear_key
+from app.services.cache_store import TinyLFUCache, decode_value, encode_value
+from app.services.cerebras import CerebrasService, LLMOperation, _text_field
+
+
+def test_content_addressed_keys_ignore_song_and_position(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_CONTENT_ADDRESSED", True)
+    a = make_analysis_key(1, 3, "Hola mi amor", "en", "es")
+    b = make_analysis_key(42, 17, "  hola mi amor", "en", "es")
+    assert a == b
+    assert a != make_analysis_key(1, 3, "Hola mi amor", "fr", "es")
+    assert a != make_interlinear_key(1, 3, "Hola mi amor", "en", "es")
+
+
+def test_positional_keys_when_content_addressing_is_off(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_CONTENT_ADDRESSED", False)
+    assert make_analysis_key(1, 3, "Hola", "en", "es") != make_analysis_key(1, 4, "Hola", "en", "es")
+
+
+def test_keys_change_with_prompt_version_and_model(monkeypatch):
+    before = (make_analysis_key(1, 3, "Hola", "en", "es"), make_check_key("Hola", "Hello", "en", "es"))
+    monkeypatch.setattr(settings, "CEREBRAS_MODEL", "other-model")
+    after_model = (make_analysis_key(1, 3, "Hola", "en", "es"), make_check_key("Hola", "Hello", "en", "es"))
+    assert before[0] != after_model[0] and before[1] != after_model[1]
+
+    monkeypatch.setitem(cache_module.PROMPT_VERSIONS, "analysis", "v2")
+    assert make_analysis_key(1, 3, "Hola", "en", "es") not in (before[0], after_model[0])
+    assert make_check_key("Hola", "Hello", "en", "es") == after_model[1]  # other namespaces keep their keys
+
+
+def test_namespace_budgets_track_evictions_expirations_and_bytes():
+    now = [0.0]
+    quotas = {"analysis": 0.5, "interlinear": 0.5}
+    cache = TinyLFUCache(max_bytes=400, ttl=10, quotas=quotas, admission=False, timer=lambda: now[0])
+    cache.put("analysis:a", "x", 100)
+    cache.put("interlinear:b", "y", 40)
+    cache.put("analysis:c", "z", 60)
+    cache.put("analysis:d", "w", 50)  # analysis budget is 200 bytes: evicts analysis:a only
+    cache.put("analysis:e", "v", 500)  # larger than the whole budget: rejected
+
+    analysis = cache.namespaces["analysis"]
+    assert (analysis.sets, analysis.evictions, analysis.rejections) == (4, 1, 1)
+    assert (analysis.entries, analysis.bytes) == (2, 110)
+    assert cache.get("interlinear:b") == "y"
+
+    now[0] = 11.0
+    cache.expire()
+    interlinear = cache.namespaces["interlinear"]
+    assert (analysis.expirations, interlinear.expirations) == (2, 1)
+    assert analysis.entries == interlinear.entries == 0
+    assert analysis.bytes == interlinear.bytes == 0
+
+
+def test_encoded_values_round_trip_and_compress():
+    analysis = {
+        "translation": "I love you more than yesterday",
+        "grammar": "Present tense, comparative with más que.",
+        "vocabulary": [{"word": f"palabra{i}", "meaning": "word", "part_of_speech": "noun"} for i in range(20)],
+    }
+    blob = encode_value(analysis, compress_min_bytes=256)
+    assert blob[:1] == b"J"
+    assert len(blob) < len(json.dumps(analysis)) / 2
+    assert decode_value(blob) == analysis
+    assert decode_value(encode_value("short", compress_min_bytes=256)) == "short"
+
+
+def _zipf_hit_rate(admission: bool) -> float:
+    rng = random.Random(7)
+    weights = [1 / (i + 1) for i in range(5000)]
+    requests = rng.choices(range(5000), weights=weights, k=30000)
+    cache = TinyLFUCache(max_bytes=200, ttl=3600, quotas={"analysis": 1.0}, admission=admission)
+    hits = 0
+    for line in requests:
+        key = f"analysis:{line}"
+        if cache.get(key) is not None:
+            hits += 1
+        else:
+            cache.put(key, {}, 1)
+    return hits / len(requests)
+
+
+def test_tinylfu_admission_beats_lru_on_zipf_traffic():
+    assert _zipf_hit_rate(admission=True) > _zipf_hit_rate(admission=False) + 0.03
+
+
+@pytest.mark.asyncio
+async def test_stale_hit_is_served_while_one_refresh_runs(monkeypatch):
+    op = LLMOperation(
+        name="test_swr",
+        system="Test. Valid JSON only.",
+        max_tokens=20,
+        temperature=0.0,
+        parse=_text_field("answer", 50),
+        cached=True,
+    )
+    service = CerebrasService()
+    posts = 0
+
+    async def fake_post(op, payload, timeout=None):
+        nonlocal posts
+        posts += 1
+        await asyncio.sleep(0.01)
+        body = {"choices": [{"message": {"content": json.dumps({"answer": "new"})}}]}
+        return httpx.Response(200, json=body, request=httpx.Request("POST", "https://llm.test"))
+
+    async def no_durable(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(service, "_post", fake_post)
+    monkeypatch.setattr("app.services.cerebras.persistent_cache.get", no_durable)
+    monkeypatch.setattr("app.services.cerebras.persistent_cache.set", no_durable)
+    # Stored already past its soft deadline.
+    monkeypatch.setattr("app.services.cache_service._soft_deadline", lambda: 0.0)
+    await cache_service.set("check:test-swr-1", "old")
+
+    results = await asyncio.gather(*(service._run(op, "q", cache_key="check:test-swr-1") for _ in range(3)))
+    assert results == [("old", True)] * 3
+
+    await asyncio.gather(*cache_service._tasks)
+    assert posts == 1
+    assert await cache_service.get("check:test-swr-1") == "new"
+
+
+@pytest.mark.asyncio
+async def test_stale_hit_with_a_current_durable_row_is_reloaded_without_the_llm(monkeypatch):
+    op = LLMOperation(
+        name="test_swr_durable",
+        system="Test. Valid JSON only.",
+        max_tokens=20,
+        temperature=0.0,
+        parse=_text_field("answer", 50),
+        cached=True,
+    )
+    service = CerebrasService()
+    lookups = []
+
+    async def fake_post(op, payload, timeout=None):
+        raise AssertionError("a durable row must not be regenerated")
+
+    async def durable_get(key, fingerprint=None):
+        lookups.append((key, fingerprint))
+        return "stored" if fingerprint == cache_module.fingerprint("check") else None
+
+    monkeypatch.setattr(service, "_post", fake_post)
+    monkeypatch.setattr("app.services.cerebras.persistent_cache.get", durable_get)
+    monkeypatch.setattr("app.services.cache_service._soft_deadline", lambda: 0.0)
+    await cache_service.set("check:test-swr-2", "old")
+
+    assert await service._run(op, "q", cache_key="check:test-swr-2") == ("old", True)
+    await asyncio.gather(*cache_service._tasks)
+
+    assert lookups == [("check:test-swr-2", cache_module.fingerprint("check"))]
+    assert await cache_service.get("check:test-swr-2") == "stored"
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.api.endpoints import discover
+from app.services import lrclib
+from app.services.iconic_songs import ICONIC_SONGS
+from app.services.negative_cache import NOT_FOUND, UPSTREAM_ERROR, NegativeCache
+
+
+@pytest.mark.asyncio
+async def test_first_lyrics_takes_first_hit_and_cancels_the_rest(monkeypatch):
+    slow, miss, down, broken, hit = ICONIC_SONGS["en"][:5]
+    delays = {slow.title: 1.0, miss.title: 0.0, down.title: 0.0, broken.title: 0.0, hit.title: 0.01}
+    cancelled = []
+
+    async def fake_lookup_lyrics(track_name, artist_name):
+        try:
+            await asyncio.sleep(delays[track_name])
+        except asyncio.CancelledError:
+            cancelled.append(track_name)
+            raise
+        if track_name == broken.title:
+            raise RuntimeError("boom")
+        if track_name == miss.title:
+            return None, NOT_FOUND
+        if track_name == down.title:
+            return None, UPSTREAM_ERROR
+        return {"trackName": track_name}, None
+
+    monkeypatch.setattr(discover.lrclib_service, "lookup_lyrics", fake_lookup_lyrics)
+
+    winner, data, misses = await discover._first_lyrics([slow, miss, down, broken, hit])
+    await asyncio.sleep(0)
+
+    assert winner == hit
+    assert data == {"trackName": hit.title}
+    assert misses == [miss]  # transient failures are not recorded as missing
+    assert cancelled == [slow.title]
+
+
+
+@pytest.mark.asyncio
+async def test_losing_lrclib_gets_are_cancelled(monkeypatch):
+    slow, hit = ICONIC_SONGS["en"][:2]
+    cancelled = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"trackName": hit.title}
+
+    async def fake_request(method, url, **kwargs):
+        track = kwargs["params"]["track_name"]
+        try:
+            await asyncio.sleep(1.0 if track == slow.title else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(track)
+            raise
+        return FakeResponse()
+
+    monkeypatch.setattr(lrclib, "negative_cache", NegativeCache(ttls={}, maxsize=10))
+    monkeypatch.setattr(lrclib.lrclib_upstream, "request", fake_request)
+
+    winner, _, _ = await discover._first_lyrics([slow, hit])
+    await asyncio.sleep(0.01)
+
+    assert winner == hit
+    assert cancelled == [slow.title]
+    assert lrclib.lyrics_flight.stats()["inflight"] == 0
+
+@pytest.mark.asyncio
+async def test_pick_keeps_importing_unchecked_entries_after_the_first_seed(monkeypatch):
+    catalog = ICONIC_SONGS["en"]
+    seeded = catalog[0]
+    imports, picks = [], []
+
+    async def fake_seeds(db, lang):
+        return {(seeded.title, seeded.artist): 1}
+
+    async def fake_import(db, lang, native_lang, unchecked):
+        imports.append(len(unchecked))
+        return "imported", unchecked[0], ("reason", "cerebras")
+
+    async def fake_pick(db, lang):
+        picks.append(lang)
+        return "seeded", seeded
+
+    monkeypatch.setattr(discover.iconic_pool, "seeds", fake_seeds)
+    monkeypatch.setattr(discover.iconic_pool, "pick", fake_pick)
+    monkeypatch.setattr(discover, "_import_unseeded", fake_import)
+
+    results = [await discover._pick(None, "en", "en") for _ in range(200)]
+
+    assert imports and all(n == len(catalog) - 1 for n in imports)
+    # One seeded entry out of the whole catalog: most picks import a new song.
+    assert results.count(("seeded", seeded, None)) < 50 and len(picks) == results.count(("seeded", seeded, None))
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.iconic_reasons import IconicReasonStore
+from app.services.iconic_songs import ICONIC_SONGS
+
+
+@pytest.mark.asyncio
+async def test_reason_served_from_store_else_fallback_without_waiting(monkeypatch):
+    monkeypatch.setattr(settings, "CEREBRAS_API_KEY", "")
+    song = ICONIC_SONGS["en"][0]
+    store = IconicReasonStore()
+    store._loaded = True
+    store._reasons[(song.title, song.artist, "de")] = "Ein Klassiker."
+
+    assert await store.get(song, "de") == ("Ein Klassiker.", "cerebras")
+    assert await store.get(song, "fr") == (song.fallback_reason, "static")
+    assert not store._tasks
+
+
+@pytest.mark.asyncio
+async def test_unknown_languages_get_the_fallback_without_a_fill(monkeypatch):
+    monkeypatch.setattr(settings, "CEREBRAS_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "ICONIC_REASONS_LAZY_FILL", True)
+    song = ICONIC_SONGS["en"][0]
+    store = IconicReasonStore()
+    store._loaded = True
+    filled = []
+
+    async def fake_fill(song, native_lang):
+        filled.append(native_lang)
+        return True
+
+    monkeypatch.setattr(store, "_fill", fake_fill)
+
+    assert await store.get(song, "zz1") == (song.fallback_reason, "static")
+    assert not store._tasks and not store._pending
+
+    await store.get(song, "es")
+    await asyncio.gather(*store._tasks)
+    assert filled == ["es"]
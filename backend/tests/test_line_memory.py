@@ -0,0 +1,94 @@
+import pytest
+
+from app.core.config import settings
+from app.services import cerebras, line_memory as line_memory_module
+from app.services.cache_backends import memory_backend
+from app.services.cache_service import CacheService
+from app.services.line_memory import LineMemory, canonical_line
+from app.services.negative_cache import NegativeCache
+
+ANALYSIS = {
+    "translation": "we will dance all night",
+    "grammar": "",
+    "vocabulary": [{"word": "noche", "meaning": "night"}],
+}
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    """A service, line memory, cache and negative cache of its own, so tests don't share state."""
+    cache = CacheService(memory_backend())
+    memory = LineMemory(maxsize=100)
+    monkeypatch.setattr(cerebras, "cache_service", cache)
+    monkeypatch.setattr(line_memory_module, "cache_service", cache)
+    monkeypatch.setattr(cerebras, "line_memory", memory)
+    monkeypatch.setattr(cerebras, "negative_cache", NegativeCache(ttls={}, maxsize=100))
+    return cerebras.CerebrasService(), memory, cache
+
+
+def test_line_memory_matches_variants_and_near_duplicates():
+    assert canonical_line("Oh, Y bailaremos toda la noche!") == canonical_line("y bailaremos  toda la noche")
+    memory = LineMemory(maxsize=2)
+    memory.add("Y bailaremos toda la noche", "es", "en", "analysis:noche")
+
+    assert memory.match("¡Oh yeah, y bailaremos toda la noche!", "es", "en", 0.6) == (
+        1.0, "Y bailaremos toda la noche", "analysis:noche",
+    )
+    score, line, key = memory.match("Y bailaremos toda la mañana", "es", "en", 0.6)
+    assert 0.6 <= score < 1.0 and (line, key) == ("Y bailaremos toda la noche", "analysis:noche")
+    assert memory.match("Y bailaremos toda la mañana", "es", "en", 1.0) is None
+    assert memory.match("Y bailaremos toda la noche", "es", "fr", 0.6) is None  # other language pair
+
+    memory.add("Primera", "es", "en", "analysis:1")
+    memory.add("Segunda", "es", "en", "analysis:2")  # evicts the least recently used line
+    assert memory.match("Y bailaremos toda la noche", "es", "en", 0.6) is None
+    assert len(memory) == 2
+
+
+@pytest.mark.asyncio
+async def test_lookup_reads_the_analysis_and_forgets_lines_no_tier_holds(monkeypatch, fresh_state):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    _, memory, cache = fresh_state
+    memory.add("Y bailaremos toda la noche", "es", "en", "analysis:noche")
+    memory.add("Otra cosa", "es", "en", "analysis:gone")
+    await cache.set("analysis:noche", ANALYSIS)
+
+    assert await memory.lookup("y bailaremos toda la noche", "es", "en", 0.6) == (
+        1.0, "Y bailaremos toda la noche", ANALYSIS,
+    )
+    assert await memory.lookup("Otra cosa", "es", "en", 0.6) is None
+    assert len(memory) == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_song_reuses_variants_and_adapts_near_duplicates(monkeypatch, fresh_state):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(settings, "LINE_MEMORY_ENABLED", True)
+    monkeypatch.setattr(settings, "LINE_MEMORY_ADAPT_SIMILARITY", 0.55)
+    service, memory, _ = fresh_state
+    full, adapted = [], []
+
+    async def fake_upstream(lines, native_lang, learning_lang):
+        full.extend(lines)
+        return [{"translation": f"t:{line}", "grammar": "", "vocabulary": [{"word": "noche"}]} for line in lines]
+
+    async def fake_adapt(items, native_lang, learning_lang):
+        adapted.extend(line for line, _, _ in items)
+        return [{"translation": f"a:{line}", "grammar": "", "vocabulary": []} for line, _, _ in items]
+
+    monkeypatch.setattr(service, "_analyze_lines_upstream", fake_upstream)
+    monkeypatch.setattr(service, "_adapt_lines_upstream", fake_adapt)
+
+    lines = ["Cantaremos toda la noche", "Oh, cantaremos toda la noche!", "Cantaremos toda la mañana", "Otra cosa"]
+    items = {item["line_index"]: item async for item in service.analyze_song(9931, lines, "en", "es")}
+
+    assert sorted(full) == ["Cantaremos toda la noche", "Otra cosa"]
+    assert adapted == ["Cantaremos toda la mañana"]
+    assert items[1]["translation"] == "t:Cantaremos toda la noche"
+    assert items[2]["translation"] == "a:Cantaremos toda la mañana"
+
+    # Another song with a variant of a remembered line reuses its analysis without a prompt.
+    again = [item async for item in service.analyze_song(9932, ["Cantaremos, toda la noche"], "en", "es")]
+    assert again[0]["translation"] == "t:Cantaremos toda la noche"
+    assert sorted(full) == ["Cantaremos toda la noche", "Otra cosa"]
+    assert len(memory) == 3
@@ -0,0 +1,55 @@
+import json
+
+import httpx
+import pytest
+
+from app.services.cerebras import CerebrasService, LLMOperation, _parse_check, _text_field
+from app.services.llm_metrics import llm_metrics
+
+
+def _completion(content: str) -> httpx.Response:
+    body = {
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 5},
+    }
+    return httpx.Response(200, json=body, request=httpx.Request("POST", "https://llm.test"))
+
+
+@pytest.mark.asyncio
+async def test_run_parses_counts_and_falls_back(monkeypatch):
+    op = LLMOperation(
+        name="test_engine",
+        system="Test. Valid JSON only.",
+        max_tokens=20,
+        temperature=0.0,
+        parse=_text_field("answer", 50),
+        fallback="fallback",
+    )
+    replies = iter([json.dumps({"answer": "  yes "}), "not json"])
+    service = CerebrasService()
+
+    async def fake_post(op, payload, timeout=None):
+        return _completion(next(replies))
+
+    monkeypatch.setattr(service, "_post", fake_post)
+
+    assert await service._run(op, "q1") == ("yes", False)
+    assert await service._run(op, "q2") == ("fallback", False)
+
+    stats = llm_metrics.snapshot()["test_engine"]
+    assert stats["calls"] == 2
+    assert stats["upstream_calls"] == 2
+    assert stats["parse_failures"] == 1
+    assert stats["fallbacks"] == 1
+    assert stats["prompt_tokens"] == 24
+    assert stats["latency_ms"]["count"] == 2
+
+
+def test_check_verdicts_need_a_boolean_verdict_and_feedback():
+    assert _parse_check({"is_correct": True, "score": 3, "feedback": " Good "}) == (
+        {"is_correct": True, "score": 1.0, "correct_translation": "", "feedback": "Good"},
+        True,
+    )
+    assert _parse_check({"is_correct": "yes", "feedback": "Good"}) == (None, False)
+    assert _parse_check({"is_correct": False}) == (None, False)
+    assert _parse_check({"verdict": "ok"}) == (None, False)
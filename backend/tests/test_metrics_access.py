@@ -0,0 +1,20 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import metrics
+from app.core.config import settings
+
+
+def test_metrics_need_the_operator_token(monkeypatch):
+    app = FastAPI()
+    app.include_router(metrics.router)
+    client = TestClient(app)
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert client.get("/metrics/llm", headers={"X-Metrics-Token": ""}).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics/llm").status_code == 403
+    assert client.get("/metrics/llm", headers={"X-Metrics-Token": "wrong"}).status_code == 403
+    response = client.get("/metrics/llm", headers={"X-Metrics-Token": "s3cret"})
+    assert response.status_code == 200 and "operations" in response.json()
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.cerebras import cerebras_service
+from app.services.microbatch import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_batches_by_group_and_flushes_on_size_or_window():
+    runs = []
+
+    async def run(group, items):
+        runs.append((group, list(items)))
+        return [f"{group}:{item}" for item in items]
+
+    batcher = MicroBatcher("test", run, window=0.01, max_items=2)
+    results = await asyncio.gather(
+        batcher.submit("a", 1), batcher.submit("a", 2), batcher.submit("a", 3), batcher.submit("b", 4)
+    )
+
+    assert results == ["a:1", "a:2", "a:3", "b:4"]
+    assert sorted(runs) == [("a", [1, 2]), ("a", [3]), ("b", [4])]
+    assert batcher.stats()["batches"] == 3
+
+
+@pytest.mark.asyncio
+async def test_short_results_and_cancelled_batches_resolve_every_caller():
+    async def short(group, items):
+        return items[:1]
+
+    batcher = MicroBatcher("short", short, window=0.01, max_items=3)
+    results = await asyncio.gather(*(batcher.submit("a", i) for i in range(3)), return_exceptions=True)
+    assert results[0] == 0
+    assert all(isinstance(r, RuntimeError) for r in results[1:])
+
+    started = asyncio.Event()
+
+    async def hang(group, items):
+        started.set()
+        await asyncio.sleep(60)
+
+    batcher = MicroBatcher("hang", hang, window=0.01, max_items=2)
+    waiters = asyncio.gather(batcher.submit("a", 1), batcher.submit("a", 2), return_exceptions=True)
+    await started.wait()
+    for task in list(batcher._tasks):
+        task.cancel()
+    results = await asyncio.wait_for(waiters, 1)
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_analyze_line_misses_share_one_prompt(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(settings, "ANALYZE_MICROBATCH_ENABLED", True)
+    prompts = []
+
+    async def fake_upstream(lines, native_lang, learning_lang):
+        prompts.append(list(lines))
+        return [{"translation": f"t:{line}", "grammar": "", "vocabulary": []} for line in lines]
+
+    monkeypatch.setattr(cerebras_service, "_analyze_lines_upstream", fake_upstream)
+
+    lines = ["Batch line one", "Batch line two", "Batch line three"]
+    results = await asyncio.gather(*(cerebras_service.analyze_line(line, "en", "it") for line in lines))
+
+    assert [r["translation"] for r in results] == [f"t:{line}" for line in lines]
+    assert prompts == [lines]
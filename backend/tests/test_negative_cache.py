@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import lrclib
+from app.services.cerebras import CerebrasService, LLMOperation, _text_field
+from app.services.llm_metrics import llm_metrics
+from app.services.negative_cache import NOT_FOUND, PARSE_FAILURE, negative_cache
+
+
+@pytest.mark.asyncio
+async def test_unparseable_response_is_not_prompted_again(monkeypatch):
+    op = LLMOperation(
+        name="test_negative",
+        system="Test. Valid JSON only.",
+        max_tokens=20,
+        temperature=0.0,
+        parse=_text_field("answer", 50),
+        fallback="fallback",
+        cached=True,
+    )
+    service = CerebrasService()
+    posts = 0
+
+    async def fake_post(op, payload, timeout=None):
+        nonlocal posts
+        posts += 1
+        body = {"choices": [{"message": {"content": "not json"}}]}
+        return httpx.Response(200, json=body, request=httpx.Request("POST", "https://llm.test"))
+
+    monkeypatch.setattr(service, "_post", fake_post)
+    monkeypatch.setattr("app.services.cerebras.persistent_cache.get", _none)
+
+    assert await service._run(op, "q", cache_key="test-negative:1") == ("fallback", False)
+    assert await service._run(op, "q", cache_key="test-negative:1") == ("fallback", False)
+
+    assert posts == 1
+    assert negative_cache.get("test-negative:1") == PARSE_FAILURE
+    assert llm_metrics.snapshot()["test_negative"]["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_song_is_fetched_once(monkeypatch):
+    gets = 0
+
+    async def fake_request(method, url, **kwargs):
+        nonlocal gets
+        gets += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(404, request=httpx.Request(method, url))
+
+    monkeypatch.setattr(lrclib.lrclib_upstream, "request", fake_request)
+    service = lrclib.LRCLibService()
+
+    # A burst of identical lookups shares one GET, and the 404 is remembered afterwards.
+    results = await asyncio.gather(*(service.get_lyrics("No Such Song", "Nobody") for _ in range(5)))
+    assert results == [None] * 5
+    assert await service.get_lyrics("no such song", "NOBODY") is None
+
+    assert gets == 1
+    assert negative_cache.get(lrclib._lookup_key("get", "No Such Song", "Nobody", None, None)) == NOT_FOUND
+
+
+async def _none(key):
+    return None
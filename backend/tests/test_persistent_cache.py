@@ -0,0 +1,86 @@
+import pytest
+
+from app.core.config import settings
+from app.services import cerebras, persistent_cache as persistent_cache_module
+from app.services.cache_backends import memory_backend
+from app.services.cache_service import CacheService
+from app.services.persistent_cache import PersistentCache
+
+ANALYSIS = {"translation": "my love", "grammar": "", "vocabulary": []}
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalar_one_or_none(self):
+        return self._rows[0][1] if self._rows else None
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    """Stands in for AsyncSessionLocal over a {key: value} table; `broken` fails every query."""
+
+    def __init__(self, table, broken=False):
+        self.table, self.broken = table, broken
+
+    def __call__(self):
+        return self
+
+    async def __aenter__(self):
+        if self.broken:
+            raise ConnectionRefusedError("database is down")
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        keys = []
+        for value in statement.compile().params.values():  # key = :k or key IN (:keys)
+            keys += value if isinstance(value, list) else [value]
+        return _Result([(key, self.table[key]) for key in keys if key in self.table])
+
+
+@pytest.fixture
+def durable(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", True)
+    session = _Session({"analysis:stored": ANALYSIS})
+    monkeypatch.setattr(persistent_cache_module, "AsyncSessionLocal", session)
+    return PersistentCache(), session
+
+
+@pytest.mark.asyncio
+async def test_get_hits_and_misses(durable):
+    cache, _ = durable
+    assert await cache.get("analysis:stored") == ANALYSIS
+    assert await cache.get("analysis:missing") is None
+    assert await cache.get_many(["analysis:stored", "analysis:missing"]) == {"analysis:stored": ANALYSIS}
+
+
+@pytest.mark.asyncio
+async def test_database_errors_are_misses(durable):
+    cache, session = durable
+    session.broken = True
+    assert await cache.get("analysis:stored") is None
+    assert await cache.get_many(["analysis:stored"]) == {}
+    await cache.set("analysis:new", ANALYSIS)  # logged, not raised
+
+
+@pytest.mark.asyncio
+async def test_durable_hits_are_promoted_to_the_memory_cache(monkeypatch, durable):
+    cache, _ = durable
+    memory = CacheService(memory_backend())
+    monkeypatch.setattr(cerebras, "persistent_cache", cache)
+    monkeypatch.setattr(cerebras, "cache_service", memory)
+
+    async def upstream():
+        raise AssertionError("a durable hit must not reach the LLM")
+
+    service = cerebras.CerebrasService()
+    result = await service._durable_or_upstream(cerebras.ANALYZE, "analysis:stored", upstream)
+
+    assert result == (ANALYSIS, True)
+    assert await memory.get("analysis:stored") == ANALYSIS
@@ -0,0 +1,172 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.resilience import (
+    AIMDLimiter,
+    CircuitBreaker,
+    LatencyTracker,
+    RetryPolicy,
+    TimeoutPolicy,
+    Upstream,
+    UpstreamUnavailable,
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_then_half_opens_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 11
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    clock = FakeClock()
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=5, clock=clock)
+    breaker.record_failure()
+    clock.now = 6
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_limiter_backs_off_multiplicatively_and_recovers_additively():
+    clock = FakeClock()
+    limiter = AIMDLimiter("test", max_limit=8, clock=clock)
+    limiter.on_overload()
+    assert int(limiter.limit) == 4
+    limiter.on_overload()  # within cooldown: ignored
+    assert int(limiter.limit) == 4
+    for _ in range(5):  # +1/limit each
+        limiter.on_success()
+    assert int(limiter.limit) == 5
+
+
+@pytest.mark.asyncio
+async def test_limiter_rejects_when_saturated():
+    limiter = AIMDLimiter("test", max_limit=1, max_wait=0.01)
+    await limiter.acquire()
+    with pytest.raises(UpstreamUnavailable):
+        await limiter.acquire()
+    limiter.release()
+    await limiter.acquire()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_without_calling_upstream():
+    upstream = Upstream(
+        "test-upstream",
+        breaker=CircuitBreaker("test-upstream", failure_threshold=1, reset_timeout=60),
+        limiter=AIMDLimiter("test-upstream", max_limit=4),
+    )
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    await upstream.call(failing)
+    with pytest.raises(UpstreamUnavailable):
+        await upstream.call(failing)
+    assert calls == 1
+    assert upstream.snapshot()["breaker"]["state"] == OPEN
+
+
+def _upstream(name, transport, monkeypatch, **kwargs):
+    client = httpx.AsyncClient(transport=transport)
+    monkeypatch.setattr("app.services.resilience.get_http_client", lambda: client)
+    return Upstream(
+        name,
+        breaker=CircuitBreaker(name, failure_threshold=10),
+        limiter=AIMDLimiter(name, max_limit=8),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_request_retries_after_429_honoring_retry_after(monkeypatch):
+    statuses = [429, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), headers={"Retry-After": "0"})
+
+    upstream = _upstream(
+        "test-retry", httpx.MockTransport(handler), monkeypatch, retry=RetryPolicy(max_attempts=3)
+    )
+    resp = await upstream.request("POST", "http://upstream/x", json={})
+    assert resp.status_code == 200
+    assert upstream.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_request_gives_up_when_retry_after_is_too_long(monkeypatch):
+    def handler(request):
+        return httpx.Response(503, headers={"Retry-After": "120"})
+
+    upstream = _upstream(
+        "test-retry-after", httpx.MockTransport(handler), monkeypatch, retry=RetryPolicy(max_attempts=3)
+    )
+    resp = await upstream.request("GET", "http://upstream/x")
+    assert resp.status_code == 503
+    assert upstream.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_idempotent_request_is_hedged(monkeypatch):
+    calls = 0
+
+    async def handler(request):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+        return httpx.Response(200)
+
+    upstream = _upstream(
+        "test-hedge",
+        httpx.MockTransport(handler),
+        monkeypatch,
+        timeouts=TimeoutPolicy(min_samples=1),
+        hedge=True,
+    )
+    upstream.latency("default").record(0.01)
+
+    resp = await upstream.request("GET", "http://upstream/x")
+    assert resp.status_code == 200
+    assert upstream.hedges == 1
+    assert upstream.hedge_wins == 1
+
+
+def test_timeout_adapts_to_observed_latency():
+    policy = TimeoutPolicy(maximum=5.0, minimum=1.0, multiplier=3.0, min_samples=3)
+    tracker = LatencyTracker()
+    assert policy.compute(tracker) == 5.0
+    for seconds in (0.4, 0.5, 0.6):
+        tracker.record(seconds)
+    assert policy.compute(tracker) == pytest.approx(1.8)
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"translation": "hola"}
+
+    results = await asyncio.gather(*[flight.do("k", upstream) for _ in range(5)])
+
+    assert calls == 1
+    assert all(r == {"translation": "hola"} for r in results)
+    assert flight.stats() == {"originated": 1, "coalesced": 4, "inflight": 0}
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_key_is_released():
+    flight = SingleFlight("test")
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(*[flight.do("k", failing) for _ in range(3)], return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return "ok"
+
+    assert await flight.do("k", ok) == "ok"
+    assert flight.originated == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    flight = SingleFlight("test")
+
+    async def upstream():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+
+
+@pytest.mark.asyncio
+async def test_abandoned_call_is_cancelled_once_its_last_waiter_leaves():
+    flight = SingleFlight("test", cancel_abandoned=True)
+    cancelled = []
+
+    async def upstream():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append("k")
+            raise
+
+    first = asyncio.create_task(flight.do("k", upstream))
+    second = asyncio.create_task(flight.do("k", upstream))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    assert cancelled == []  # the second caller still wants the result
+
+    second.cancel()
+    await asyncio.sleep(0.01)
+    assert cancelled == ["k"]
+    assert flight.stats()["inflight"] == 0
@@ -0,0 +1,84 @@
+import json
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.models.song import Song
+from app.services.cerebras import cerebras_service
+from app.services.song_story import song_story_service
+
+
+def _sse(*texts: str) -> bytes:
+    events = [f"data: {json.dumps({'choices': [{'delta': {'content': t}}]})}\n\n" for t in texts]
+    return ("".join(events) + "data: [DONE]\n\n").encode()
+
+
+@pytest.mark.asyncio
+async def test_story_stream_relays_chunks_and_caches_full_story(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(cerebras_service, "api_key", "test-key")
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, content=_sse("Written in ", "1971", " by ..."))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("app.services.resilience.get_http_client", lambda: client)
+
+    song = Song(id=9911, title="Imagine", artist="John Lennon")
+    chunks = [c async for c in song_story_service.stream(song, "en")]
+
+    assert chunks == ["Written in ", "1971", " by ..."]
+    assert requests[0]["stream"] is True
+    assert await song_story_service.lookup(9911, "en") == ("Written in 1971 by ...", True)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_story_stream_serves_stale_story_and_stores_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(cerebras_service, "api_key", "test-key")
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    monkeypatch.setattr("app.services.resilience.get_http_client", lambda: client)
+
+    song = Song(id=9912, title="Imagine", artist="John Lennon")
+    chunks = [c async for c in song_story_service.stream(song, "de", stale="Old story")]
+
+    assert chunks == ["Old story"]
+    assert await song_story_service.lookup(9912, "de") == (None, False)
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_story_stream_cut_off_midway_ends_with_partial_error(monkeypatch):
+    from app.api.endpoints import songs
+
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(cerebras_service, "api_key", "test-key")
+
+    async def cut_off():
+        yield f"data: {json.dumps({'choices': [{'delta': {'content': 'Written in '}}]})}\n\n".encode()
+        raise httpx.ReadError("connection reset")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=cut_off())))
+    monkeypatch.setattr("app.services.resilience.get_http_client", lambda: client)
+    song = Song(id=9913, title="Imagine", artist="John Lennon")
+
+    class _Result:
+        def scalar_one_or_none(self):
+            return song
+
+    class _Db:
+        async def execute(self, statement):
+            return _Result()
+
+    response = await songs.stream_song_story(9913, "en", db=_Db(), _=1)
+    body = "".join([part async for part in response.body_iterator])
+
+    assert "event: chunk" in body and "Written in " in body
+    assert "event: done" not in body
+    assert 'event: error\ndata: {"detail": "Story generation was interrupted.", "partial": true}' in body
+    assert await song_story_service.lookup(9913, "en") == (None, False)  # a cut-off story is not stored
+    await client.aclose()
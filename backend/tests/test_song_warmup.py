@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import song_warmup
+
+
+@pytest.fixture
+def warmup(monkeypatch):
+    monkeypatch.setattr(settings, "SONG_WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings, "CEREBRAS_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "SONG_WARMUP_LINES", 2)
+    monkeypatch.setattr(song_warmup, "_slots", None)  # bound to this test's event loop
+    calls = {"songs": [], "lines": []}
+
+    async def analyze_song(song_id, lines, native_lang, learning_lang):
+        calls["songs"].append((song_id, list(lines), native_lang, learning_lang))
+        await asyncio.sleep(0)
+        yield {"line_index": 0}
+
+    async def interlinear_line(line, native_lang, learning_lang, song_id, line_index):
+        calls["lines"].append((song_id, line_index, line))
+        if line == "broken":
+            raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(song_warmup.cerebras_service, "analyze_song", analyze_song)
+    monkeypatch.setattr(song_warmup.cerebras_service, "interlinear_line", interlinear_line)
+    return calls
+
+
+async def _drain():
+    await asyncio.gather(*song_warmup._tasks)
+
+
+@pytest.mark.asyncio
+async def test_warms_the_first_lines_once_per_song_and_language_pair(warmup):
+    lyrics = "Hola amor\n\nTe quiero\nAdiós"
+    song_warmup.schedule_song_warmup(1, lyrics, "en", "es")
+    song_warmup.schedule_song_warmup(1, lyrics, "en", "es")  # already running: skipped
+    song_warmup.schedule_song_warmup(1, lyrics, "fr", "es")
+    await _drain()
+
+    assert warmup["songs"] == [(1, ["Hola amor", "Te quiero"], "en", "es"), (1, ["Hola amor", "Te quiero"], "fr", "es")]
+    assert len(warmup["lines"]) == 4
+    assert not song_warmup._inflight
+
+    song_warmup.schedule_song_warmup(1, lyrics, "en", "es")  # finished, so it may run again
+    await _drain()
+    assert len(warmup["songs"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_disabled_or_empty_warmups_are_not_scheduled(monkeypatch, warmup):
+    song_warmup.schedule_song_warmup(2, "", "en", "es")
+    monkeypatch.setattr(settings, "SONG_WARMUP_ENABLED", False)
+    song_warmup.schedule_song_warmup(2, "Hola", "en", "es")
+    assert not song_warmup._tasks and warmup["songs"] == []
+
+
+@pytest.mark.asyncio
+async def test_failing_lines_do_not_stop_the_rest(warmup):
+    song_warmup.schedule_song_warmup(3, "broken\nTe quiero", "en", "es")
+    await _drain()
+
+    assert [line for _, _, line in warmup["lines"]] == ["broken", "Te quiero"]
+    assert len(warmup["songs"]) == 1
+    assert not song_warmup._inflight
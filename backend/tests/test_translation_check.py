@@ -0,0 +1,45 @@
+import pytest
+
+from app.core.config import settings
+from app.services.cache_service import cache_service, make_analysis_key
+from app.services.cerebras import cerebras_service
+from app.services.translation_check import grade_locally, grade_translation
+
+
+def test_only_the_reference_up_to_case_punctuation_and_articles_is_accepted_locally():
+    assert grade_locally("The dog bites the man", "dog bites man!")["is_correct"]
+    assert grade_locally("I love you, my darling!", "i love you my darling")["is_correct"]
+    assert grade_locally("Te quiero, mi amor", "te quiero mi amor", "es")["is_correct"]
+    assert grade_locally("I regret nothing", "regret nothing") is None  # "I" is no article in English
+
+    assert grade_locally("She is not coming back tonight", "She is coming back tonight") is None  # negation
+    assert grade_locally("the dog bites the man", "the dog bites the woman") is None  # one word swapped
+    assert grade_locally("the dog bites the man", "the man bites the dog") is None  # reordered
+    assert grade_locally("Leave me alone", "Go away") is None  # paraphrase: not rejected locally
+
+
+@pytest.mark.asyncio
+async def test_exact_answers_are_graded_locally_and_the_rest_by_the_llm(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    original = "Je ne regrette rien"
+    await cache_service.set(
+        make_analysis_key(9921, 0, original, "en", "fr"),
+        {"translation": "I regret nothing", "grammar": "", "vocabulary": []},
+    )
+    llm_calls = []
+
+    async def fake_check(**kwargs):
+        llm_calls.append(kwargs)
+        return {"is_correct": True, "score": 0.8, "correct_translation": "I regret nothing", "feedback": "ok"}
+
+    monkeypatch.setattr(cerebras_service, "check_translation", fake_check)
+
+    result, graded_by = await grade_translation(9921, 0, original, "I regret nothing.", "en", "fr")
+    assert graded_by == "local" and result["is_correct"]
+
+    _, graded_by = await grade_translation(9921, 0, original, "cheese sandwich", "en", "fr")
+    assert graded_by == "llm"
+
+    _, graded_by = await grade_translation(9921, 0, original, "I have no regrets at all", "en", "fr")
+    assert graded_by == "llm"
+    assert len(llm_calls) == 2
@@ -0,0 +1,46 @@
+import pytest
+
+from app.core.config import settings
+from app.services.cerebras import cerebras_service
+from app.services.word_memory import WordMemory
+
+
+@pytest.mark.asyncio
+async def test_word_translations_are_remembered_per_casefolded_word(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    calls = []
+
+    async def fake_translate_word(word, source_lang, target_lang):
+        calls.append(word)
+        return "Herz"
+
+    monkeypatch.setattr(cerebras_service, "translate_word", fake_translate_word)
+    memory = WordMemory()
+
+    assert await memory.translate("Heart", "en", "de") == "Herz"
+    assert await memory.translate("  heart ", "en", "de") == "Herz"
+    assert calls == ["Heart"]
+
+    await memory.put_many({memory.key("Amour", "fr", "en"): "love"}, origin="vocabulary")
+    assert await memory.translate("amour", "fr", "en") == "love"
+    assert calls == ["Heart"]
+
+
+@pytest.mark.asyncio
+async def test_batch_translation_packs_unknown_words_into_few_prompts(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_DB_ENABLED", False)
+    monkeypatch.setattr(settings, "WORD_BATCH_SIZE", 2)
+    prompts = []
+
+    async def fake_translate_words(words, source_lang, target_lang):
+        prompts.append(list(words))
+        return ["" if w == "xyzzy" else w.upper() for w in words]
+
+    monkeypatch.setattr(cerebras_service, "translate_words", fake_translate_words)
+    memory = WordMemory()
+    await memory.put_many({memory.key("sun", "en", "de"): "Sonne"}, origin="vocabulary")
+
+    result = await memory.translate_many(["sun", "moon", "Moon", "star", "xyzzy"], "en", "de")
+
+    assert result == {"sun": "Sonne", "moon": "MOON", "Moon": "MOON", "star": "STAR"}
+    assert sorted(len(p) for p in prompts) == [1, 2]
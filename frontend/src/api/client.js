@@ -70,6 +70,40 @@ const processQueue = (error, accessToken = null) => {
   refreshQueue = []
 }
 
+// Exchange the refresh token for a new access token. Concurrent callers share one
+// refresh; on failure the session is cleared and the user is sent to the login page.
+const refreshAccessToken = async () => {
+  const refreshToken = tokenStore.getRefresh()
+  if (!refreshToken) {
+    tokenStore.clear()
+    window.location.href = '/login'
+    throw new Error('No refresh token')
+  }
+
+  if (isRefreshing) {
+    return new Promise((resolve, reject) => {
+      refreshQueue.push({ resolve, reject })
+    })
+  }
+
+  isRefreshing = true
+  try {
+    const resp = await axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken })
+    const { access_token, refresh_token } = resp.data || {}
+    if (!access_token || !refresh_token) throw new Error('Invalid refresh response')
+    tokenStore.set(access_token, refresh_token)
+    processQueue(null, access_token)
+    return access_token
+  } catch (refreshError) {
+    processQueue(refreshError, null)
+    tokenStore.clear()
+    window.location.href = '/login'
+    throw refreshError
+  } finally {
+    isRefreshing = false
+  }
+}
+
 // Handle auth errors with refresh flow
 client.interceptors.response.use(
   (response) => response,
@@ -82,55 +116,53 @@ client.interceptors.response.use(
       return Promise.reject(error)
     }
 
-    const refreshToken = tokenStore.getRefresh()
-    if (!refreshToken) {
-      tokenStore.clear()
-      window.location.href = '/login'
-      return Promise.reject(error)
-    }
-
-    if (isRefreshing) {
-      return new Promise((resolve, reject) => {
-        refreshQueue.push({ resolve, reject })
-      }).then((accessToken) => {
-        original.__isRetryRequest = true
-        if (!original.headers) original.headers = {}
-        if (typeof original.headers.set === 'function') {
-          original.headers.set('Authorization', `Bearer ${accessToken}`)
-        } else {
-          original.headers.Authorization = `Bearer ${accessToken}`
-        }
-        return client(original)
-      })
-    }
-
-    isRefreshing = true
     original.__isRetryRequest = true
+    const accessToken = await refreshAccessToken()
+    if (!original.headers) original.headers = {}
+    if (typeof original.headers.set === 'function') {
+      original.headers.set('Authorization', `Bearer ${accessToken}`)
+    } else {
+      original.headers.Authorization = `Bearer ${accessToken}`
+    }
+    return client(original)
+  }
+)
 
-    try {
-      const resp = await axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken })
-      const { access_token, refresh_token } = resp.data || {}
-      if (!access_token || !refresh_token) throw new Error('Invalid refresh response')
-      tokenStore.set(access_token, refresh_token)
-      processQueue(null, access_token)
-
-      if (!original.headers) original.headers = {}
-      if (typeof original.headers.set === 'function') {
-        original.headers.set('Authorization', `Bearer ${access_token}`)
-      } else {
-        original.headers.Authorization = `Bearer ${access_token}`
+// Read a Server-Sent Events response, calling onEvent(event, data) per event.
+// fetch is used instead of EventSource so the Authorization header can be sent.
+// An expired access token is refreshed (same flow as the axios interceptor) and the request retried once.
+const readEventStream = async (path, onEvent) => {
+  const open = (token) =>
+    fetch(`${API_BASE_URL}${path}`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+    })
+  let resp = await open(tokenStore.getAccess())
+  if (resp.status === 401) {
+    resp = await open(await refreshAccessToken())
+  }
+  if (!resp.ok || !resp.body) throw new Error(`Stream failed (${resp.status})`)
+
+  const reader = resp.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+    let sep
+    while ((sep = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, sep)
+      buffer = buffer.slice(sep + 2)
+      let event = 'message'
+      let data = ''
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
       }
-      return client(original)
-    } catch (refreshError) {
-      processQueue(refreshError, null)
-      tokenStore.clear()
-      window.location.href = '/login'
-      return Promise.reject(refreshError)
-    } finally {
-      isRefreshing = false
+      if (data) onEvent(event, JSON.parse(data))
     }
   }
-)
+}
 
 // Auth API
 export const authApi = {
@@ -149,6 +181,8 @@ export const songsApi = {
   import: (data) => client.post('/songs/import', data),
   get: (id) => client.get(`/songs/${id}`),
   getStory: (id, targetLang) => client.get(`/songs/${id}/story`, { params: { target_lang: targetLang } }),
+  streamStory: (id, targetLang, onEvent) =>
+    readEventStream(`/songs/${id}/story/stream?target_lang=${encodeURIComponent(targetLang)}`, onEvent),
 }
 
 // User Songs API
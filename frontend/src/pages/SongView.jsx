@@ -309,8 +309,24 @@ function SongView() {
             setStoryLoading(true)
             setShowStory(true)
             try {
-              const res = await songsApi.getStory(id, uiLang)
-              setStory(res.data.story)
+              let text = ''
+              let failed = null
+              await songsApi.streamStory(id, uiLang, (event, data) => {
+                if (event === 'chunk') {
+                  text += data.text
+                  setStory(text)
+                  setStoryLoading(false)
+                } else if (event === 'error') {
+                  failed = data.detail
+                }
+              })
+              if (!text) {
+                toast.error(failed || 'Could not load story')
+                setShowStory(false)
+              } else if (failed) {
+                // Cut off midway: keep what arrived, but say it is incomplete.
+                toast.error(failed)
+              }
             } catch (error) {
               const detail = error?.response?.data?.detail
               toast.error(detail || 'Could not load story')